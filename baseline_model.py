@@ -0,0 +1,160 @@
+"""
+Lightweight NumPy forecasting baseline.
+
+Damped-trend exponential smoothing (ETS(A,Ad,N)) behind the same ``fit`` /
+``make_future_dataframe`` / ``predict`` interface as Prophet, so it can be
+used wherever a Prophet model is. Fitting takes milliseconds: the smoothing
+weights are chosen by a grid search that runs the recursion for all grid
+points at once, and prediction intervals are analytic.
+"""
+from statistics import NormalDist
+from typing import Any, Dict, Optional
+import numpy as np
+import pandas as pd
+
+# Level smoothing weights searched; trend weights are fractions of them
+ALPHA_GRID = np.linspace(0.05, 1.0, 20)
+BETA_FRACTIONS = np.array([0.0, 0.01, 0.05, 0.1, 0.2])
+
+# Bars used to estimate the initial trend
+INITIAL_TREND_ROWS = 10
+
+class ExponentialSmoothingModel:
+    """
+    Damped-trend exponential smoothing with a Prophet-compatible interface.
+
+    Steps are trading days: future calendar days map to the number of
+    business days after the last observation.
+    """
+
+    def __init__(self, damping: float = 0.98, interval_width: float = 0.8):
+        """
+        Args:
+            damping: Trend damping factor per step (1.0 disables damping)
+            interval_width: Coverage of yhat_lower/yhat_upper
+        """
+        self.damping = damping
+        self.interval_width = interval_width
+        self.params: Dict[str, Any] = {}
+        self.history: Optional[pd.DataFrame] = None
+        self.fitted: Optional[np.ndarray] = None
+
+    def _filter(self, y: np.ndarray, alpha: np.ndarray, beta: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Run the smoothing recursion for several weight pairs at once.
+
+        Args:
+            y: Observations
+            alpha: Level weights, one per candidate
+            beta: Trend weights, one per candidate
+
+        Returns:
+            Dictionary with one-step forecasts (rows x candidates) and the
+            final level and trend per candidate
+        """
+        level = np.full(len(alpha), y[0])
+        trend = np.full(len(alpha), np.diff(y[:INITIAL_TREND_ROWS + 1]).mean())
+        forecasts = np.empty((len(y), len(alpha)))
+        for t, observed in enumerate(y):
+            forecast = level + self.damping * trend
+            forecasts[t] = forecast
+            error = observed - forecast
+            level = forecast + alpha * error
+            trend = self.damping * trend + beta * error
+        return {'forecasts': forecasts, 'level': level, 'trend': trend}
+
+    def fit(self, df: pd.DataFrame) -> 'ExponentialSmoothingModel':
+        """
+        Fit the model, choosing the weights with the smallest one-step error.
+
+        Args:
+            df: DataFrame with ds and y columns
+
+        Returns:
+            The fitted model
+        """
+        y = df['y'].to_numpy(dtype='float64')
+        if len(y) < 3:
+            raise ValueError("Exponential smoothing needs at least 3 observations")
+
+        alpha = np.repeat(ALPHA_GRID, len(BETA_FRACTIONS))
+        beta = alpha * np.tile(BETA_FRACTIONS, len(ALPHA_GRID))
+        result = self._filter(y, alpha, beta)
+        # The first forecast only reflects the initialization
+        errors = y[1:, None] - result['forecasts'][1:]
+        best = int(np.argmin((errors ** 2).sum(axis=0)))
+
+        self.params = {
+            'alpha': float(alpha[best]),
+            'beta': float(beta[best]),
+            'level': float(result['level'][best]),
+            'trend': float(result['trend'][best]),
+            'sigma': float(np.sqrt(np.mean(errors[:, best] ** 2)))
+        }
+        self.history = df[['ds', 'y']].reset_index(drop=True)
+        self.fitted = result['forecasts'][:, best]
+        return self
+
+    def make_future_dataframe(self, periods: int, include_history: bool = True) -> pd.DataFrame:
+        """
+        Build the dates to predict, like Prophet's daily future frame.
+
+        Args:
+            periods: Number of future calendar days
+            include_history: Whether to include the training dates
+
+        Returns:
+            DataFrame with a ds column
+        """
+        last = self.history['ds'].max()
+        dates = pd.date_range(start=last, periods=periods + 1, freq='D')[1:]
+        if include_history:
+            dates = pd.concat([self.history['ds'], pd.Series(dates)], ignore_index=True)
+        return pd.DataFrame({'ds': dates})
+
+    def predict(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Predict the given dates with analytic prediction intervals.
+
+        Training dates get the one-step forecasts, later dates the damped
+        trend forecast for their number of business days ahead.
+
+        Args:
+            df: DataFrame with a ds column
+
+        Returns:
+            DataFrame with ds, trend, yhat, yhat_lower and yhat_upper
+        """
+        ds = pd.to_datetime(df['ds']).reset_index(drop=True)
+        last = self.history['ds'].max()
+        future = (ds > last).to_numpy()
+
+        # Business days in (last, ds]; weekend days share the next trading day's step
+        steps = np.busday_count(
+            np.datetime64((last + pd.Timedelta(days=1)).date()),
+            (ds[future] + pd.Timedelta(days=1)).to_numpy().astype('datetime64[D]')
+        )
+        steps = np.maximum(steps, 1)
+        max_steps = int(steps.max()) if len(steps) else 1
+
+        # Cumulative damping weights phi + phi^2 + ... + phi^h
+        weights = np.cumsum(self.damping ** np.arange(1, max_steps + 1))
+        # Forecast variance grows with the accumulated effect of past errors
+        effects = self.params['alpha'] + self.params['beta'] * weights[:-1]
+        variance = self.params['sigma'] ** 2 * (1 + np.concatenate([[0.0], np.cumsum(effects ** 2)]))
+
+        yhat = np.full(len(ds), np.nan)
+        std = np.full(len(ds), self.params['sigma'])
+        fitted = pd.Series(self.fitted, index=self.history['ds'])
+        yhat[~future] = fitted.reindex(ds[~future]).to_numpy()
+        yhat[future] = self.params['level'] + self.params['trend'] * weights[steps - 1]
+        std[future] = np.sqrt(variance[steps - 1])
+
+        z = NormalDist().inv_cdf(0.5 + self.interval_width / 2)
+        return pd.DataFrame({
+            'ds': ds,
+            'trend': yhat,
+            'yhat': yhat,
+            'yhat_lower': yhat - z * std,
+            'yhat_upper': yhat + z * std
+        })
@@ -0,0 +1,125 @@
+"""
+Batch forecasting and ranking across many symbols.
+
+Each symbol goes through the same cached pipeline as the Forecast page
+(history, ``prepare_prophet_data``, ``train_model``, max-horizon
+forecast), so models already fitted by any session or replica are reused.
+Symbols are driven by a thread pool; the Prophet fits themselves run on the
+training service's process pool, whose worker count and per-worker thread
+limit come from TRAINING_CONFIG; the baseline mode fits in the batch threads
+in milliseconds. Rows are yielded as each symbol finishes.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+from typing import Any, Dict, Iterator, List, Tuple
+import pandas as pd
+from config import get_config
+from forecasting import generate_forecast_cached, prepare_prophet_data, train_model
+from utils import MIN_DATA_POINTS, generate_data_hash, get_stock_data_cached, logger
+
+batch_config = get_config('batch')
+training_config = get_config('training')
+
+def load_forecast(symbol: str, start_date: date, end_date: date, forecast_days: int,
+                  mode: str = 'accurate') -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Run one symbol through the cached forecast pipeline.
+
+    Args:
+        symbol: Upper-case stock ticker symbol
+        start_date: Start of the training history
+        end_date: End of the training history
+        forecast_days: Forecast horizon in days
+        mode: Forecast mode from FORECAST_MODES
+
+    Returns:
+        Tuple of (history, forecast frame for the horizon)
+
+    Raises:
+        ValueError: If the symbol has no or too little data
+    """
+    data = get_stock_data_cached(symbol, start_date, end_date)
+    if data is None:
+        raise ValueError("No data found")
+    if len(data) < MIN_DATA_POINTS:
+        raise ValueError(f"Only {len(data)} data points (need {MIN_DATA_POINTS})")
+
+    df_prophet = prepare_prophet_data(data)
+    data_hash = generate_data_hash(data)
+    model = train_model(symbol, data_hash, df_prophet, mode)
+    return data, generate_forecast_cached(symbol, data_hash, model, forecast_days, mode)
+
+def forecast_symbol(symbol: str, start_date: date, end_date: date, forecast_days: int,
+                    mode: str = 'accurate') -> Dict[str, Any]:
+    """
+    Forecast one symbol and summarize the prediction.
+
+    Args:
+        symbol: Upper-case stock ticker symbol
+        start_date: Start of the training history
+        end_date: End of the training history
+        forecast_days: Forecast horizon in days
+        mode: Forecast mode from FORECAST_MODES
+
+    Returns:
+        Row with price, forecast, predicted change and interval width, or a row
+        with an 'Error' message if the symbol could not be forecast
+    """
+    started = time.perf_counter()
+    try:
+        data, forecast = load_forecast(symbol, start_date, end_date, forecast_days, mode)
+    except ValueError as e:
+        return {'Symbol': symbol, 'Error': str(e)}
+    last = forecast.iloc[-1]
+
+    price = float(data['Close'].iloc[-1])
+    predicted = float(last['yhat'])
+    return {
+        'Symbol': symbol,
+        'Price': price,
+        'Forecast': predicted,
+        'Lower': float(last['yhat_lower']),
+        'Upper': float(last['yhat_upper']),
+        'Change %': (predicted - price) / price * 100,
+        'Interval Width %': (last['yhat_upper'] - last['yhat_lower']) / abs(predicted) * 100 if predicted else None,
+        'Seconds': time.perf_counter() - started
+    }
+
+def run_batch(symbols: List[str], start_date: date, end_date: date, forecast_days: int,
+              mode: str = 'accurate') -> Iterator[Dict[str, Any]]:
+    """
+    Forecast many symbols concurrently, yielding rows as they finish.
+
+    At most BATCH_MAX_CONCURRENCY symbols (and never more than the training
+    queue depth) are in progress at once, so a batch cannot fill the training
+    queue on its own.
+
+    Args:
+        symbols: Upper-case ticker symbols
+        start_date: Start of the training history
+        end_date: End of the training history
+        forecast_days: Forecast horizon in days
+        mode: Forecast mode from FORECAST_MODES
+
+    Yields:
+        One forecast_symbol row per symbol, in completion order
+    """
+    concurrency = max(1, min(batch_config['max_concurrency'], training_config['max_queue_depth'] - 1))
+    logger.info(f"Batch forecasting {len(symbols)} symbols, {forecast_days} days, {mode} mode, {concurrency} at a time")
+
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='batch')
+    futures = {
+        executor.submit(forecast_symbol, symbol, start_date, end_date, forecast_days, mode): symbol
+        for symbol in symbols
+    }
+    try:
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                logger.error(f"Batch forecast failed for {futures[future]}: {e}")
+                yield {'Symbol': futures[future], 'Error': str(e)}
+    finally:
+        # An abandoned batch (e.g. the page reran) drops the symbols not started yet
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,142 @@
+"""
+Offline stand-in for the parts of yfinance the app uses.
+
+``install()`` replaces ``yfinance.Ticker`` and ``yfinance.download`` so every
+module that does ``import yfinance as yf`` is served from recorded fixtures in
+``benchmarks/fixtures/<SYMBOL>.csv`` (see record_fixtures.py). Symbols without
+a fixture get a deterministic synthetic random walk, so benchmarks always run
+without network access.
+"""
+import os
+import time
+import zlib
+from typing import Dict, List, Optional, Union
+import numpy as np
+import pandas as pd
+import yfinance
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+# Synthetic series cover this many years of business days up to today
+SYNTHETIC_YEARS = 25
+
+_frames: Dict[str, pd.DataFrame] = {}
+
+# Simulated network round-trip per request, in seconds
+_latency = 0.0
+
+def _synthetic_history(symbol: str) -> pd.DataFrame:
+    """
+    Generate a deterministic daily OHLCV random walk for a symbol.
+
+    Args:
+        symbol: Upper-case ticker symbol
+
+    Returns:
+        DataFrame shaped like yfinance's Ticker.history output
+    """
+    rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+    end = pd.Timestamp.today().normalize()
+    index = pd.bdate_range(end - pd.DateOffset(years=SYNTHETIC_YEARS), end, tz='America/New_York', name='Date')
+    close = 50 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, len(index))))
+    spread = close * rng.uniform(0.002, 0.02, len(index))
+    open_ = close + rng.normal(0, 0.5, len(index)) * spread
+    return pd.DataFrame({
+        'Open': open_,
+        'High': np.maximum(open_, close) + spread,
+        'Low': np.minimum(open_, close) - spread,
+        'Close': close,
+        'Volume': rng.integers(1_000_000, 50_000_000, len(index)),
+        'Dividends': 0.0,
+        'Stock Splits': 0.0
+    }, index=index)
+
+def load_history(symbol: str) -> pd.DataFrame:
+    """
+    Get the full recorded (or synthetic) history for a symbol.
+
+    Args:
+        symbol: Ticker symbol
+
+    Returns:
+        Full daily history DataFrame
+    """
+    symbol = symbol.upper()
+    if symbol not in _frames:
+        path = os.path.join(FIXTURE_DIR, f"{symbol}.csv")
+        if os.path.exists(path):
+            frame = pd.read_csv(path, index_col='Date')
+            frame.index = pd.to_datetime(frame.index, utc=True).tz_convert('America/New_York')
+            _frames[symbol] = frame
+        else:
+            _frames[symbol] = _synthetic_history(symbol)
+    return _frames[symbol]
+
+def _slice(frame: pd.DataFrame, start, end) -> pd.DataFrame:
+    """
+    Select [start, end) like yfinance does.
+
+    Args:
+        frame: Full history
+        start: First date to include
+        end: First date to exclude
+
+    Returns:
+        Sliced copy of the history
+    """
+    tz = frame.index.tz
+    lower = frame.index.searchsorted(pd.Timestamp(start).tz_localize(None).tz_localize(tz))
+    upper = frame.index.searchsorted(pd.Timestamp(end).tz_localize(None).tz_localize(tz))
+    return frame.iloc[lower:upper].copy()
+
+class FakeTicker:
+    """Replacement for yfinance.Ticker backed by fixtures."""
+
+    def __init__(self, symbol: str, session=None):
+        self.ticker = symbol.upper()
+
+    def history(self, start=None, end=None, **kwargs) -> pd.DataFrame:
+        time.sleep(_latency)
+        frame = load_history(self.ticker)
+        return _slice(frame, start or frame.index[0].date(), end or pd.Timestamp.today() + pd.Timedelta(days=1))
+
+    @property
+    def info(self) -> dict:
+        time.sleep(_latency)
+        return {'longName': f"{self.ticker} Holdings Inc.", 'shortName': self.ticker, 'sector': 'Technology'}
+
+    @property
+    def fast_info(self) -> dict:
+        time.sleep(_latency)
+        close = float(load_history(self.ticker)['Close'].iloc[-1])
+        return {'lastPrice': close, 'previousClose': close, 'marketCap': close * 1e9}
+
+def fake_download(tickers: Union[str, List[str]], start=None, end=None, **kwargs) -> pd.DataFrame:
+    """
+    Replacement for yfinance.download returning (symbol, field) columns.
+
+    Args:
+        tickers: Symbol or list of symbols
+        start: First date to include
+        end: First date to exclude
+
+    Returns:
+        DataFrame with a column MultiIndex grouped by ticker
+    """
+    time.sleep(_latency)
+    symbols = tickers.split() if isinstance(tickers, str) else list(tickers)
+    frames = {symbol.upper(): FakeTicker(symbol).history(start, end).drop(columns=['Dividends', 'Stock Splits'])
+              for symbol in symbols}
+    return pd.concat(frames, axis=1)
+
+def install(latency_seconds: Optional[float] = None) -> None:
+    """
+    Route yfinance.Ticker and yfinance.download to the stand-in.
+
+    Args:
+        latency_seconds: Optional simulated round-trip per request
+    """
+    global _latency
+    _latency = latency_seconds or 0.0
+    yfinance.Ticker = FakeTicker
+    yfinance.download = fake_download
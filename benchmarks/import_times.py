@@ -0,0 +1,210 @@
+"""
+Cold-start import time report.
+
+Every target runs in a fresh interpreter, so each number is what a first page
+load after a container start pays, dependencies included:
+
+- heavy third-party modules and every app module,
+- each page's import set (the imports at the top of its script, without
+  running the page),
+- the first Prophet fit in a process (loading the Stan backend).
+
+The heaviest packages over all page imports (from ``python -X importtime``)
+are listed to show where a regression comes from. Results are written as JSON
+like run_benchmarks and can be compared against a baseline.
+
+Usage:
+    python -m benchmarks.import_times
+    python -m benchmarks.import_times --baseline benchmarks/results/imports-old.json
+"""
+import argparse
+import ast
+import glob
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.run_benchmarks import RESULTS_DIR, _git_revision
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    'pandas',
+    'streamlit',
+    'plotly.graph_objects',
+    'yfinance',
+    'prophet',
+    'prophet.diagnostics',
+    'utils',
+    'forecasting',
+    'charts',
+    'indicators',
+    'batch_forecast',
+    'tuning',
+    'exports'
+]
+
+# Timed snippet template; the setup is not part of the measurement
+SNIPPET = """import time
+{setup}
+started = time.perf_counter()
+{timed}
+print(time.perf_counter() - started)
+"""
+
+def page_imports(path: str) -> str:
+    """
+    Extract the top-level import statements of a page script.
+
+    Args:
+        path: Page script path
+
+    Returns:
+        Source of the import statements, one per line
+    """
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+    statements = [
+        ast.get_source_segment(source, node)
+        for node in ast.parse(source).body
+        if isinstance(node, (ast.Import, ast.ImportFrom))
+    ]
+    return '\n'.join(statements)
+
+def _run(code: str, env: Dict[str, str], importtime: bool = False) -> Tuple[float, str]:
+    """
+    Run a timed snippet in a fresh interpreter.
+
+    Args:
+        code: Snippet built from SNIPPET
+        env: Environment for the interpreter
+        importtime: Run with -X importtime
+
+    Returns:
+        Tuple of (seconds printed by the snippet, stderr)
+    """
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', code]
+    completed = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return float(completed.stdout.strip().splitlines()[-1]), completed.stderr
+
+def heaviest_packages(stderr: str, top: int) -> List[Dict[str, Any]]:
+    """
+    Sum -X importtime self times per top-level package.
+
+    Args:
+        stderr: Output of an interpreter run with -X importtime
+        top: Number of packages to return
+
+    Returns:
+        Packages with their total self time, slowest first
+    """
+    totals: Dict[str, int] = defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        totals[name.split('.')[0]] += int(self_us)
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [{'package': package, 'seconds': micros / 1e6} for package, micros in ranked]
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Measure every target.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        Results document
+    """
+    env = dict(os.environ)
+    env['DATA_DIR'] = tempfile.mkdtemp(prefix='stock-imports-')
+    env['TRAINING_MAX_WORKERS'] = '0'
+
+    pages = [os.path.join(ROOT, '🏠_Home.py')] + sorted(glob.glob(os.path.join(ROOT, 'pages', '*.py')))
+    targets = [(f"import {module}", '', f"import {module}") for module in MODULES]
+    targets += [(f"page {os.path.basename(page)}", '', page_imports(page)) for page in pages]
+    targets.append(('stan backend (first fit)', 'import warmup, forecasting', 'warmup.load_stan_backend()'))
+
+    results: List[Dict[str, Any]] = []
+    for name, setup, timed in targets:
+        code = SNIPPET.format(setup=setup, timed=timed)
+        runs = [_run(code, env)[0] for _ in range(args.repeat)]
+        results.append({'target': name, 'runs': runs, 'median': statistics.median(runs), 'min': min(runs)})
+        print(f"{name:<40} median {statistics.median(runs) * 1000:9.1f} ms")
+
+    all_pages = '\n'.join(sorted({line for page in pages for line in page_imports(page).splitlines()}))
+    _, stderr = _run(SNIPPET.format(setup='', timed=all_pages), env, importtime=True)
+    packages = heaviest_packages(stderr, args.top)
+    print("Heaviest packages over all page imports:")
+    for package in packages:
+        print(f"  {package['package']:<30} {package['seconds'] * 1000:9.1f} ms")
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'revision': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'args': {key: value for key, value in vars(args).items() if key != 'baseline'}
+        },
+        'results': results,
+        'packages': packages
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Compare a run against a baseline run.
+
+    Args:
+        current: Results document of this run
+        baseline: Results document to compare against
+        threshold: Slowdown ratio that counts as a regression
+
+    Returns:
+        List of regression descriptions
+    """
+    previous = {r['target']: r['median'] for r in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        if previous.get(result['target'], 0) <= 0:
+            continue
+        ratio = result['median'] / previous[result['target']]
+        if ratio > threshold:
+            regressions.append(f"{result['target']}: {ratio:.2f}x slower")
+    return regressions
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure cold-start import times")
+    parser.add_argument('--repeat', type=int, default=3, help="Fresh interpreters per target")
+    parser.add_argument('--top', type=int, default=15, help="Heaviest packages to list")
+    parser.add_argument('--output', help="Results file (default: benchmarks/results/imports-<timestamp>.json)")
+    parser.add_argument('--baseline', help="Results file to compare against")
+    parser.add_argument('--threshold', type=float, default=1.25, help="Slowdown ratio reported as a regression")
+    args = parser.parse_args()
+
+    current = run(args)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"imports-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(current, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(current, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        sys.exit(1 if regressions else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+"""
+Concurrent-session load test for the Streamlit pages.
+
+N simulated sessions run the real page scripts headlessly with Streamlit's
+AppTest, all in one process, so they share st.cache_data/st.cache_resource,
+the training service and the GIL exactly like sessions of one server. Each
+session enters a symbol on Home, opens the Dashboard, opens the Forecast page
+and moves the forecast slider. Market data comes from the local provider,
+backed by files generated from the benchmark fixtures.
+
+Peak RSS covers the app process only; Prophet fits run in the training
+service's worker processes unless TRAINING_MAX_WORKERS=0.
+
+Usage:
+    python -m benchmarks.load_test --sessions 1,5,10,25
+    python -m benchmarks.load_test --sessions 10 --distinct-symbols 1 --warm
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from benchmarks.run_benchmarks import RESULTS_DIR, _git_revision
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HOME_PAGE = os.path.join(ROOT_DIR, '🏠_Home.py')
+DASHBOARD_PAGE = 'pages/1_📊_Dashboard.py'
+FORECAST_PAGE = 'pages/2_🔮_Forecast.py'
+
+# Slider values a session moves through on the Forecast page
+SLIDER_VALUES = (60, 90)
+
+# Seconds between RSS samples
+RSS_SAMPLE_INTERVAL = 0.05
+
+def _prepare_environment(symbols: List[str], with_cv: bool) -> None:
+    """
+    Point the app at a temporary data directory and local market data.
+
+    Must run before any app module is imported, since they read config at import.
+
+    Args:
+        symbols: Symbols to generate local history files for
+        with_cv: Whether the Forecast page runs cross validation
+    """
+    from benchmarks import fake_yfinance
+
+    work_dir = tempfile.mkdtemp(prefix='stock-load-')
+    market_dir = os.path.join(work_dir, 'market_data')
+    os.makedirs(market_dir)
+    for symbol in symbols:
+        fake_yfinance.load_history(symbol).to_parquet(os.path.join(market_dir, f"{symbol}.parquet"))
+
+    os.environ['MARKET_DATA_PROVIDER'] = 'local'
+    os.environ['LOCAL_DATA_DIR'] = market_dir
+    os.environ['DATA_DIR'] = os.path.join(work_dir, 'cache')
+    if not with_cv:
+        os.environ['MIN_CV_DATA_POINTS'] = str(sys.maxsize)
+
+def _clear_caches() -> None:
+    """Drop every in-memory and on-disk cache so a level starts cold."""
+    import streamlit as st
+    from history_store import HISTORY_DIR
+    from memory_cache import clear_all
+    from model_registry import MODEL_DIR
+    from shared_cache import shared_cache
+
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    clear_all()
+    shared_cache.clear()
+    shutil.rmtree(HISTORY_DIR, ignore_errors=True)
+    shutil.rmtree(MODEL_DIR, ignore_errors=True)
+
+def _run_session(symbol: str, timeout: float) -> List[Tuple[str, float, bool]]:
+    """
+    Drive one simulated user through Home, Dashboard and Forecast.
+
+    Args:
+        symbol: Ticker symbol the user enters
+        timeout: Seconds a single page run may take
+
+    Returns:
+        List of (step, seconds, ok) per page run
+    """
+    from streamlit.testing.v1 import AppTest
+
+    steps = []
+
+    def step(name: str, action) -> Any:
+        started = time.perf_counter()
+        try:
+            app = action()
+            ok = not app.exception
+        except Exception:
+            app, ok = None, False
+        steps.append((name, time.perf_counter() - started, ok))
+        return app
+
+    app = AppTest.from_file(HOME_PAGE, default_timeout=timeout)
+    app = step('home', app.run)
+    if app is None:
+        return steps
+    app = step('enter symbol', lambda: app.text_input[0].input(symbol).run())
+    if app is None:
+        return steps
+    app = step('dashboard', lambda: app.switch_page(DASHBOARD_PAGE).run())
+    if app is None:
+        return steps
+    app = step('forecast', lambda: app.switch_page(FORECAST_PAGE).run())
+    for value in SLIDER_VALUES:
+        if app is None or not app.slider:
+            break
+        app = step('forecast slider', lambda: app.slider[0].set_value(value).run())
+    return steps
+
+def _sample_rss(stop: threading.Event, peak: List[int]) -> None:
+    """
+    Track the peak resident memory of this process until stopped.
+
+    Args:
+        stop: Event ending the sampling
+        peak: Single-element list updated with the peak RSS in bytes
+    """
+    from instrumentation import _rss_bytes
+
+    while not stop.is_set():
+        rss = _rss_bytes()
+        if rss is not None:
+            peak[0] = max(peak[0], rss)
+        stop.wait(RSS_SAMPLE_INTERVAL)
+
+def run_level(sessions: int, symbols: List[str], timeout: float) -> Dict[str, Any]:
+    """
+    Run one concurrency level.
+
+    Args:
+        sessions: Number of concurrent sessions
+        symbols: Symbols assigned to sessions round-robin
+        timeout: Seconds a single page run may take
+
+    Returns:
+        Result dictionary for the level
+    """
+    stop = threading.Event()
+    peak = [0]
+    sampler = threading.Thread(target=_sample_rss, args=(stop, peak), daemon=True)
+    sampler.start()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as executor:
+        futures = [executor.submit(_run_session, symbols[i % len(symbols)], timeout) for i in range(sessions)]
+        runs = [step for future in futures for step in future.result()]
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    sampler.join()
+
+    latencies = np.array([seconds for _, seconds, _ in runs])
+    by_step = {}
+    for name in dict.fromkeys(name for name, _, _ in runs):
+        step_latencies = [seconds for step_name, seconds, _ in runs if step_name == name]
+        by_step[name] = {'median': statistics.median(step_latencies), 'max': max(step_latencies)}
+
+    return {
+        'sessions': sessions,
+        'seconds': elapsed,
+        'page_runs': len(runs),
+        'errors': sum(not ok for _, _, ok in runs),
+        'sessions_per_second': sessions / elapsed,
+        'page_runs_per_second': len(runs) / elapsed,
+        'p50': float(np.percentile(latencies, 50)),
+        'p95': float(np.percentile(latencies, 95)),
+        'p99': float(np.percentile(latencies, 99)),
+        'peak_rss_bytes': peak[0],
+        'steps': by_step
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the Streamlit pages with concurrent sessions")
+    parser.add_argument('--sessions', default='1,5,10,25', help="Concurrent session counts, comma-separated")
+    parser.add_argument('--distinct-symbols', type=int, default=5, help="Symbols shared by the sessions")
+    parser.add_argument('--warm', action='store_true', help="Keep caches between levels instead of starting cold")
+    parser.add_argument('--with-cv', action='store_true', help="Let the Forecast page start cross validation")
+    parser.add_argument('--timeout', type=float, default=600, help="Seconds a single page run may take")
+    parser.add_argument('--output', help="Results file (default: benchmarks/results/load-<timestamp>.json)")
+    args = parser.parse_args()
+    levels = [int(count) for count in args.sessions.split(',')]
+    symbols = [f"LT{i:03d}" for i in range(args.distinct_symbols)]
+
+    _prepare_environment(symbols, args.with_cv)
+    os.chdir(ROOT_DIR)
+
+    results = []
+    for sessions in levels:
+        if not args.warm:
+            _clear_caches()
+        result = run_level(sessions, symbols, args.timeout)
+        results.append(result)
+        print(
+            f"{sessions:>4} sessions  {result['sessions_per_second']:6.2f} sessions/s  "
+            f"p50 {result['p50'] * 1000:8.1f} ms  p95 {result['p95'] * 1000:8.1f} ms  "
+            f"p99 {result['p99'] * 1000:8.1f} ms  peak RSS {result['peak_rss_bytes'] / 1024 / 1024:7.1f} MB  "
+            f"errors {result['errors']}"
+        )
+
+    document = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'revision': _git_revision(),
+            'cpu_count': os.cpu_count(),
+            'args': vars(args)
+        },
+        'results': results
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"load-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(document, f, indent=2)
+    print(f"Results written to {output}")
+
+if __name__ == '__main__':
+    main()
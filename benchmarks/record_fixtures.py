@@ -0,0 +1,29 @@
+"""
+Record daily history from Yahoo Finance as benchmark fixtures.
+
+Usage:
+    python -m benchmarks.record_fixtures AAPL MSFT GOOGL
+"""
+import argparse
+import os
+import yfinance as yf
+from benchmarks.fake_yfinance import FIXTURE_DIR
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Record benchmark fixtures from Yahoo Finance")
+    parser.add_argument('symbols', nargs='+', help="Ticker symbols to record")
+    parser.add_argument('--period', default='max', help="yfinance period to record (default: max)")
+    args = parser.parse_args()
+
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    for symbol in args.symbols:
+        data = yf.Ticker(symbol.upper()).history(period=args.period)
+        if data.empty:
+            print(f"{symbol.upper()}: no data, skipped")
+            continue
+        path = os.path.join(FIXTURE_DIR, f"{symbol.upper()}.csv")
+        data.to_csv(path)
+        print(f"{symbol.upper()}: {len(data)} bars -> {path}")
+
+if __name__ == '__main__':
+    main()
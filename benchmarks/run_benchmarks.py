@@ -0,0 +1,238 @@
+"""
+Offline benchmark suite for the app's hot paths.
+
+Every stage runs against the fixture-backed yfinance stand-in, at several
+history lengths and symbol counts, and results are written as JSON so runs can
+be compared.
+
+Usage:
+    python -m benchmarks.run_benchmarks --lengths 1y,5y,20y --symbols 1,10,50
+    python -m benchmarks.run_benchmarks --baseline benchmarks/results/old.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+HISTORY_LENGTHS = {'1y': 365, '5y': 1825, '20y': 7300}
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+def _timed(func: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """
+    Time a callable several times.
+
+    Args:
+        func: Zero-argument callable to time
+        repeat: Number of runs
+
+    Returns:
+        Dictionary with per-run seconds, median and min
+    """
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - started)
+    return {'runs': runs, 'median': statistics.median(runs), 'min': min(runs)}
+
+def _git_revision() -> str:
+    """
+    Get the current git revision, if available.
+
+    Returns:
+        Short commit hash or 'unknown'
+    """
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+    except Exception:
+        return 'unknown'
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Run all benchmark stages.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        Results document
+    """
+    # Imported after the environment is prepared; modules read config at import time
+    from benchmarks import fake_yfinance
+    fake_yfinance.install(args.latency_ms / 1000)
+
+    import utils
+    import forecasting
+    import charts
+    from history_store import HISTORY_DIR, history_cache
+    from model_registry import MODEL_DIR
+
+    results: List[Dict[str, Any]] = []
+
+    def record(stage: str, length: str, symbols: int, timing: Dict[str, Any]) -> None:
+        results.append({'stage': stage, 'length': length, 'symbols': symbols, **timing})
+        print(f"{stage:<32} {length:>4} {symbols:>4} symbols  median {timing['median'] * 1000:9.1f} ms")
+
+    end_date = date.today()
+    for length in args.lengths:
+        start_date = end_date - timedelta(days=HISTORY_LENGTHS[length])
+
+        for count in args.symbols:
+            symbols = [f"BM{i:03d}" for i in range(count)]
+
+            def fetch_cold():
+                history_cache.clear()
+                shutil.rmtree(HISTORY_DIR, ignore_errors=True)
+                for symbol in symbols:
+                    utils.get_stock_data_cached(symbol, start_date, end_date)
+
+            def fetch_disk():
+                history_cache.clear()
+                for symbol in symbols:
+                    utils.get_stock_data_cached(symbol, start_date, end_date)
+
+            def fetch_memory():
+                for symbol in symbols:
+                    utils.get_stock_data_cached(symbol, start_date, end_date)
+
+            def fetch_watchlist():
+                utils.get_watchlist_data_cached.clear()
+                utils.get_quote_cached.clear()
+                utils.get_watchlist_data_cached(tuple(symbols), end_date)
+
+            record('get_stock_data_cached (cold)', length, count, _timed(fetch_cold, args.repeat))
+            record('get_stock_data_cached (disk)', length, count, _timed(fetch_disk, args.repeat))
+            record('get_stock_data_cached (memory)', length, count, _timed(fetch_memory, args.repeat))
+            record('get_watchlist_data_cached', length, count, _timed(fetch_watchlist, args.repeat))
+
+        # Model stages are per symbol, so they run once per history length
+        data = utils.get_stock_data_cached('BM000', start_date, end_date)
+        record('generate_data_hash', length, 1, _timed(lambda: utils.generate_data_hash(data), args.repeat))
+        record('prepare_prophet_data', length, 1, _timed(lambda: forecasting.prepare_prophet_data(data), args.repeat))
+
+        df_prophet = forecasting.prepare_prophet_data(data)
+        data_hash = utils.generate_data_hash(data)
+
+        def train():
+            forecasting._train_prophet_model.clear()
+            shutil.rmtree(MODEL_DIR, ignore_errors=True)
+            return forecasting.train_prophet_model('BM000', data_hash, df_prophet)
+
+        record('train_prophet_model', length, 1, _timed(train, args.fit_repeat))
+        model = forecasting.train_prophet_model('BM000', data_hash, df_prophet)
+
+        future = model.make_future_dataframe(periods=utils.MAX_FORECAST_DAYS)
+        record('predict', length, 1, _timed(lambda: model.predict(future), args.fit_repeat))
+        record('predict (fast mode)', length, 1, _timed(lambda: forecasting.predict_fast(model, future), args.fit_repeat))
+
+        def baseline():
+            forecasting.train_baseline_model.clear()
+            baseline_model = forecasting.train_baseline_model('BM000', data_hash, df_prophet)
+            return baseline_model.predict(baseline_model.make_future_dataframe(periods=utils.MAX_FORECAST_DAYS))
+
+        record('baseline fit + predict', length, 1, _timed(baseline, args.repeat))
+        forecast = model.predict(future)
+
+        record('build_forecast_figures', length, 1, _timed(
+            lambda: (charts.build_forecast_figure('BM000', df_prophet, forecast).to_json(),
+                     charts.build_components_figure(forecast).to_json()),
+            args.repeat
+        ))
+        record('resample_ohlcv', length, 1, _timed(
+            lambda: charts.resample_ohlcv(data, charts.choose_resolution(len(data))), args.repeat
+        ))
+
+        if not args.skip_cv and len(df_prophet) >= utils.MIN_CV_DATA_POINTS:
+            cv = {}
+            record('perform_cross_validation', length, 1, _timed(
+                lambda: cv.update(result=forecasting.perform_cross_validation(model, df_prophet)), 1
+            ))
+            if cv.get('result') is not None:
+                record('build_cv_figure', length, 1, _timed(
+                    lambda: charts.build_cv_residual_figure(cv['result'][0]).to_json(), args.repeat
+                ))
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'revision': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'args': {key: value for key, value in vars(args).items() if key != 'baseline'}
+        },
+        'results': results
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Compare a run against a baseline run.
+
+    Args:
+        current: Results document of this run
+        baseline: Results document to compare against
+        threshold: Slowdown ratio that counts as a regression
+
+    Returns:
+        List of regression descriptions
+    """
+    previous = {(r['stage'], r['length'], r['symbols']): r['median'] for r in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        key = (result['stage'], result['length'], result['symbols'])
+        if key not in previous or previous[key] <= 0:
+            continue
+        ratio = result['median'] / previous[key]
+        if ratio > threshold:
+            regressions.append(f"{key[0]} ({key[1]}, {key[2]} symbols): {ratio:.2f}x slower")
+    return regressions
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite")
+    parser.add_argument('--lengths', default='1y,5y,20y', help="History lengths: comma-separated from 1y,5y,20y")
+    parser.add_argument('--symbols', default='1,10,50', help="Symbol counts for the data stages")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per fast stage")
+    parser.add_argument('--fit-repeat', type=int, default=2, help="Runs per model fit/predict stage")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Simulated network latency per request")
+    parser.add_argument('--skip-cv', action='store_true', help="Skip cross validation (slowest stage)")
+    parser.add_argument('--output', help="Results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument('--baseline', help="Results file to compare against")
+    parser.add_argument('--threshold', type=float, default=1.25, help="Slowdown ratio reported as a regression")
+    args = parser.parse_args()
+    args.lengths = [length.strip() for length in args.lengths.split(',')]
+    args.symbols = [int(count) for count in args.symbols.split(',')]
+
+    unknown = [length for length in args.lengths if length not in HISTORY_LENGTHS]
+    if unknown:
+        parser.error(f"Unknown history lengths: {', '.join(unknown)}")
+
+    # Isolated on-disk caches; fits run in this process unless configured otherwise
+    os.environ['DATA_DIR'] = tempfile.mkdtemp(prefix='stock-bench-')
+    os.environ.setdefault('TRAINING_MAX_WORKERS', '0')
+
+    current = run(args)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(current, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(current, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        sys.exit(1 if regressions else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,285 @@
+"""
+Plotly figure builders and chart data preparation for the app pages.
+
+Figures are cached in their serialized JSON form, so reruns skip figure
+construction and the browser receives compact, zoomable charts. Long OHLCV
+ranges are aggregated to weekly or monthly bars to stay within a point budget.
+"""
+from typing import Optional
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.subplots import make_subplots
+from config import get_config
+from instrumentation import mark_miss, traced
+from utils import logger
+
+# Load configuration
+cache_config = get_config('cache')
+chart_config = get_config('chart')
+
+# Seasonal components Prophet may add to a forecast frame
+SEASONAL_COMPONENTS = ('yearly', 'weekly', 'daily')
+
+# OHLCV resolutions, finest first: (pandas resample rule, approximate trading days per bar)
+RESOLUTIONS = {
+    'Daily': (None, 1),
+    'Weekly': ('W-FRI', 5),
+    'Monthly': ('ME', 21)
+}
+
+# Price columns charts draw at float32 precision
+CHART_PRICE_COLUMNS = ('Open', 'High', 'Low', 'Close')
+
+# How each OHLCV column aggregates into a coarser bar
+OHLCV_AGGREGATION = {
+    'Open': 'first',
+    'High': 'max',
+    'Low': 'min',
+    'Close': 'last',
+    'Volume': 'sum'
+}
+
+def choose_resolution(n_bars: int, max_points: Optional[int] = None) -> str:
+    """
+    Pick the finest resolution that keeps a chart within its point budget.
+
+    Args:
+        n_bars: Number of daily bars to display
+        max_points: Point budget; defaults to CHART_CONFIG['max_chart_points']
+
+    Returns:
+        Resolution name from RESOLUTIONS
+    """
+    budget = max_points or chart_config['max_chart_points']
+    for name, (_, days_per_bar) in RESOLUTIONS.items():
+        if n_bars / days_per_bar <= budget:
+            return name
+    return list(RESOLUTIONS)[-1]
+
+def resample_ohlcv(data: pd.DataFrame, resolution: str) -> pd.DataFrame:
+    """
+    Aggregate daily bars into coarser OHLCV bars.
+
+    Open is the first open, High the max high, Low the min low, Close the last
+    close and Volume the summed volume of each period.
+
+    Args:
+        data: Daily OHLCV DataFrame with a DatetimeIndex
+        resolution: Resolution name from RESOLUTIONS
+
+    Returns:
+        Aggregated DataFrame (the input itself for 'Daily')
+    """
+    rule = RESOLUTIONS[resolution][0]
+    if rule is None:
+        return data
+    aggregation = {col: how for col, how in OHLCV_AGGREGATION.items() if col in data.columns}
+    return data.resample(rule).agg(aggregation).dropna(subset=['Close'])
+
+def downcast_prices(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert price columns to float32 for charting.
+
+    float32 is far more precise than a chart can show, and halves the price
+    columns of cached chart data and of the arrays sent to the browser. Only
+    chart data is downcast; history, exports and fits keep float64.
+
+    Args:
+        data: OHLCV DataFrame
+
+    Returns:
+        Copy with float32 price columns
+    """
+    return data.astype({col: 'float32' for col in CHART_PRICE_COLUMNS if col in data.columns})
+
+@traced('resample_ohlcv_cached')
+@st.cache_data(
+    ttl=cache_config['data_ttl_seconds'],
+    max_entries=cache_config['max_data_entries'],
+    show_spinner=cache_config['show_cache_spinner']
+)
+def resample_ohlcv_cached(symbol: str, data_hash: str, resolution: str, _data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cached version of resample_ohlcv, with prices downcast for charting.
+
+    Args:
+        symbol: Stock ticker symbol
+        data_hash: Content hash of the daily data
+        resolution: Resolution name from RESOLUTIONS
+        _data: Daily OHLCV DataFrame (not hashed)
+
+    Returns:
+        Aggregated DataFrame with float32 prices
+    """
+    mark_miss()
+    logger.info(f"Resampling {symbol.upper()} to {resolution.lower()} bars (cache miss)")
+    return downcast_prices(resample_ohlcv(_data, resolution))
+
+def build_forecast_figure(symbol: str, history: pd.DataFrame, forecast: pd.DataFrame) -> go.Figure:
+    """
+    Build the main forecast chart: actuals, prediction and uncertainty band.
+
+    Args:
+        symbol: Stock ticker symbol
+        history: Prophet-formatted training data (ds, y)
+        forecast: Prophet forecast frame
+
+    Returns:
+        Plotly figure
+    """
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=forecast['ds'], y=forecast['yhat_upper'],
+        mode='lines', line=dict(width=0), hoverinfo='skip', showlegend=False
+    ))
+    fig.add_trace(go.Scatter(
+        x=forecast['ds'], y=forecast['yhat_lower'],
+        mode='lines', line=dict(width=0), fill='tonexty',
+        fillcolor=chart_config['forecast_interval_color'], name='Confidence Interval'
+    ))
+    fig.add_trace(go.Scatter(
+        x=forecast['ds'], y=forecast['yhat'],
+        mode='lines', line=dict(color=chart_config['forecast_line_color'], width=2), name='Forecast'
+    ))
+    fig.add_trace(go.Scatter(
+        x=history['ds'], y=history['y'],
+        mode='markers', marker=dict(color=chart_config['actual_marker_color'], size=3), name='Actual'
+    ))
+    fig.update_layout(
+        title=f"{symbol.upper()} Stock Price Forecast",
+        height=chart_config['forecast_height'],
+        hovermode='x unified'
+    )
+    fig.update_yaxes(title_text="Price ($)")
+    return fig
+
+def build_components_figure(forecast: pd.DataFrame) -> go.Figure:
+    """
+    Build the trend and seasonality component chart.
+
+    Args:
+        forecast: Prophet forecast frame
+
+    Returns:
+        Plotly figure with one row per component
+    """
+    components = ['trend'] + [name for name in SEASONAL_COMPONENTS if name in forecast.columns]
+    fig = make_subplots(
+        rows=len(components), cols=1,
+        vertical_spacing=0.1,
+        subplot_titles=[name.capitalize() for name in components]
+    )
+
+    for row, name in enumerate(components, start=1):
+        # Seasonal components repeat, so one year of the series shows the full pattern
+        frame = forecast if name == 'trend' else forecast[forecast['ds'] > forecast['ds'].max() - pd.Timedelta(days=365)]
+        fig.add_trace(go.Scatter(
+            x=frame['ds'], y=frame[name],
+            mode='lines', line=dict(color=chart_config['forecast_line_color']), name=name.capitalize()
+        ), row=row, col=1)
+        if name == 'trend' and 'trend_lower' in frame.columns:
+            fig.add_trace(go.Scatter(
+                x=frame['ds'], y=frame['trend_upper'],
+                mode='lines', line=dict(width=0), hoverinfo='skip', showlegend=False
+            ), row=row, col=1)
+            fig.add_trace(go.Scatter(
+                x=frame['ds'], y=frame['trend_lower'],
+                mode='lines', line=dict(width=0), fill='tonexty', hoverinfo='skip',
+                fillcolor=chart_config['forecast_interval_color'], showlegend=False
+            ), row=row, col=1)
+
+    fig.update_layout(height=chart_config['forecast_height'], showlegend=False)
+    return fig
+
+def build_cv_residual_figure(cv_results: pd.DataFrame) -> go.Figure:
+    """
+    Build the cross validation residual scatter chart.
+
+    Args:
+        cv_results: Prophet cross validation results
+
+    Returns:
+        Plotly figure
+    """
+    residuals = cv_results['y'] - cv_results['yhat']
+    fig = go.Figure(go.Scattergl(
+        x=cv_results['ds'], y=residuals,
+        mode='markers', marker=dict(color=chart_config['forecast_line_color'], size=5, opacity=0.6),
+        name='Residual'
+    ))
+    fig.add_hline(y=0, line=dict(color=chart_config['candlestick_decreasing_color'], dash='dash'))
+    fig.update_layout(
+        title="Cross Validation Residuals",
+        height=chart_config['forecast_height'] * 2 // 3,
+        xaxis_title="Date",
+        yaxis_title="Residual (Actual - Predicted)"
+    )
+    return fig
+
+@traced('forecast_figures_cached')
+@st.cache_data(
+    ttl=cache_config['forecast_ttl_seconds'],
+    max_entries=cache_config['max_forecast_entries'],
+    show_spinner=cache_config['show_cache_spinner']
+)
+def forecast_figures_cached(symbol: str, data_hash: str, forecast_days: int, mode: str, model_key: str,
+                            _history: pd.DataFrame, _forecast: pd.DataFrame) -> tuple:
+    """
+    Build and serialize the forecast and component charts.
+
+    Args:
+        symbol: Stock ticker symbol
+        data_hash: Content hash of the training data
+        forecast_days: Forecast horizon shown
+        mode: Forecast mode that produced the forecast
+        model_key: forecast_model_key of the model, so a retrained (e.g. tuned)
+            model on the same data gets new charts
+        _history: Prophet-formatted training data (not hashed)
+        _forecast: Forecast frame for the horizon (not hashed)
+
+    Returns:
+        Tuple of (forecast_figure_json, components_figure_json)
+    """
+    mark_miss()
+    logger.info(f"Building {mode} forecast charts for {symbol.upper()}, {forecast_days} days (cache miss)")
+    return (
+        build_forecast_figure(symbol, _history, _forecast).to_json(),
+        build_components_figure(_forecast).to_json()
+    )
+
+@traced('cv_residual_figure_cached')
+@st.cache_data(
+    ttl=cache_config['forecast_ttl_seconds'],
+    max_entries=cache_config['max_forecast_entries'],
+    show_spinner=cache_config['show_cache_spinner']
+)
+def cv_residual_figure_cached(symbol: str, data_hash: str, model_key: str, _cv_results: pd.DataFrame) -> str:
+    """
+    Build and serialize the cross validation residual chart.
+
+    Args:
+        symbol: Stock ticker symbol
+        data_hash: Content hash of the training data
+        model_key: forecast_model_key of the validated model
+        _cv_results: Cross validation results (not hashed)
+
+    Returns:
+        Serialized figure JSON
+    """
+    mark_miss()
+    logger.info(f"Building cross validation chart for {symbol.upper()} (cache miss)")
+    return build_cv_residual_figure(_cv_results).to_json()
+
+def figure_from_json(figure_json: str) -> go.Figure:
+    """
+    Restore a serialized figure for st.plotly_chart.
+
+    Args:
+        figure_json: JSON produced by Figure.to_json
+
+    Returns:
+        Plotly figure
+    """
+    return pio.from_json(figure_json)
@@ -9,7 +9,8 @@ APP_CONFIG: Dict[str, Any] = {
     "page_title": "Stock Analysis Hub",
     "page_icon": "📈",
     "layout": "wide",
-    "initial_sidebar_state": "expanded"
+    "initial_sidebar_state": "expanded",
+    "debug_sections": os.getenv("DEBUG_SECTIONS", "false").lower() == "true"  # Or add ?debug=1 to the URL
 }
 
 # Data Configuration
@@ -27,16 +28,44 @@ PROPHET_CONFIG: Dict[str, Any] = {
     "weekly_seasonality": False,
     "daily_seasonality": False,
     "yearly_seasonality": True,
-    "seasonality_mode": "multiplicative",
-    "changepoint_prior_scale": 0.05,
-    "seasonality_prior_scale": 10.0
+    "seasonality_mode": os.getenv("PROPHET_SEASONALITY_MODE", "multiplicative"),
+    "changepoint_prior_scale": float(os.getenv("PROPHET_CHANGEPOINT_PRIOR_SCALE", "0.05")),
+    "seasonality_prior_scale": float(os.getenv("PROPHET_SEASONALITY_PRIOR_SCALE", "10.0")),
+    "warm_start": os.getenv("PROPHET_WARM_START", "true").lower() == "true",  # Reuse previous fit as optimizer init
+    "warm_start_overlap_rows": int(os.getenv("PROPHET_WARM_START_OVERLAP_ROWS", "20")),  # Bars that must match
+    # Hyperparameter search space (comma-separated values per parameter)
+    "tuning_seasonality_modes": os.getenv("PROPHET_TUNING_SEASONALITY_MODES", "additive,multiplicative").split(","),
+    "tuning_changepoint_prior_scales": [float(v) for v in os.getenv("PROPHET_TUNING_CHANGEPOINT_PRIOR_SCALES", "0.001,0.01,0.05,0.1,0.5").split(",")],
+    "tuning_seasonality_prior_scales": [float(v) for v in os.getenv("PROPHET_TUNING_SEASONALITY_PRIOR_SCALES", "0.01,0.1,1.0,10.0").split(",")],
+    "tuning_search": os.getenv("PROPHET_TUNING_SEARCH", "random").lower(),  # grid or random
+    "tuning_max_candidates": int(os.getenv("PROPHET_TUNING_MAX_CANDIDATES", "8")),  # Sampled candidates for random search
+    "tuning_metric": os.getenv("PROPHET_TUNING_METRIC", "rmse").lower(),  # rmse, mae or mape over all CV folds
+    "tuning_workers": int(os.getenv("PROPHET_TUNING_WORKERS", "2"))  # Candidates queued on the training pool at once; 0 runs in-thread
+}
+
+# Forecast Mode Configuration
+FORECAST_CONFIG: Dict[str, Any] = {
+    "default_mode": os.getenv("FORECAST_MODE", "accurate").lower(),  # accurate, fast or baseline
+    "baseline_damping": float(os.getenv("BASELINE_DAMPING", "0.98"))  # Trend damping of the smoothing baseline
 }
 
 # Cross Validation Configuration
 CV_CONFIG: Dict[str, Any] = {
     "initial_days": int(os.getenv("CV_INITIAL_DAYS", "365")),
     "period_days": int(os.getenv("CV_PERIOD_DAYS", "90")),
-    "horizon_days": int(os.getenv("CV_HORIZON_DAYS", "30"))
+    "horizon_days": int(os.getenv("CV_HORIZON_DAYS", "30")),
+    "parallel": os.getenv("CV_PARALLEL", "threads"),  # threads or none
+    "background_workers": int(os.getenv("CV_BACKGROUND_WORKERS", "2")),  # Concurrent CV jobs per process
+    "max_cached_results": int(os.getenv("CV_MAX_CACHED_RESULTS", "50")),
+    "poll_seconds": float(os.getenv("CV_POLL_SECONDS", "2"))  # How often the page checks for results
+}
+
+# Training Service Configuration
+TRAINING_CONFIG: Dict[str, Any] = {
+    "max_workers": int(os.getenv("TRAINING_MAX_WORKERS", "2")),  # Fit processes; 0 fits in the calling thread
+    "threads_per_worker": int(os.getenv("TRAINING_THREADS_PER_WORKER", "1")),  # Native threads per fit process
+    "max_queue_depth": int(os.getenv("TRAINING_MAX_QUEUE_DEPTH", "32")),  # Max distinct fits queued or running
+    "timeout_seconds": float(os.getenv("TRAINING_TIMEOUT_SECONDS", "300"))
 }
 
 # Chart Configuration
@@ -44,8 +73,12 @@ CHART_CONFIG: Dict[str, Any] = {
     "dashboard_height": int(os.getenv("DASHBOARD_CHART_HEIGHT", "700")),
     "forecast_height": int(os.getenv("FORECAST_CHART_HEIGHT", "600")),
     "volume_opacity": float(os.getenv("VOLUME_OPACITY", "0.8")),
+    "max_chart_points": int(os.getenv("MAX_CHART_POINTS", "800")),  # Bars per chart before downsampling
     "candlestick_increasing_color": os.getenv("CANDLESTICK_UP_COLOR", "#00D4AA"),
-    "candlestick_decreasing_color": os.getenv("CANDLESTICK_DOWN_COLOR", "#FF6692")
+    "candlestick_decreasing_color": os.getenv("CANDLESTICK_DOWN_COLOR", "#FF6692"),
+    "forecast_line_color": os.getenv("FORECAST_LINE_COLOR", "#0072B2"),
+    "forecast_interval_color": os.getenv("FORECAST_INTERVAL_COLOR", "rgba(0,114,178,0.2)"),
+    "actual_marker_color": os.getenv("ACTUAL_MARKER_COLOR", "#444444")
 }
 
 # Logging Configuration
@@ -57,9 +90,12 @@ LOGGING_CONFIG: Dict[str, Any] = {
 
 # API Configuration
 API_CONFIG: Dict[str, Any] = {
+    "provider": os.getenv("MARKET_DATA_PROVIDER", "yfinance").lower(),  # yfinance or local
+    "local_data_dir": os.getenv("LOCAL_DATA_DIR", "market_data"),  # Parquet/CSV files for the local provider
     "yfinance_timeout": int(os.getenv("YFINANCE_TIMEOUT", "30")),
     "max_retries": int(os.getenv("API_MAX_RETRIES", "3")),
-    "retry_delay": float(os.getenv("API_RETRY_DELAY", "1.0"))
+    "retry_delay": float(os.getenv("API_RETRY_DELAY", "1.0")),  # Base backoff, doubled per retry and jittered
+    "pool_size": int(os.getenv("API_POOL_SIZE", "16"))  # Pooled connections per host
 }
 
 # Cache Configuration
@@ -68,12 +104,79 @@ CACHE_CONFIG: Dict[str, Any] = {
     "model_ttl_seconds": int(os.getenv("CACHE_MODEL_TTL_SECONDS", "3600")),  # 1 hour for Prophet models
     "forecast_ttl_seconds": int(os.getenv("CACHE_FORECAST_TTL_SECONDS", "3600")),  # 1 hour for forecasts
     "max_data_entries": int(os.getenv("CACHE_MAX_DATA_ENTRIES", "100")),  # Max cached stock data
-    "max_model_entries": int(os.getenv("CACHE_MAX_MODEL_ENTRIES", "20")),  # Max cached models
-    "max_forecast_entries": int(os.getenv("CACHE_MAX_FORECAST_ENTRIES", "50")),  # Max cached forecasts
+    "max_forecast_entries": int(os.getenv("CACHE_MAX_FORECAST_ENTRIES", "50")),  # Max cached forecast charts
+    "history_max_bytes": int(os.getenv("CACHE_HISTORY_MAX_BYTES", str(256 * 1024 * 1024))),  # In-memory OHLCV budget
+    "model_max_bytes": int(os.getenv("CACHE_MODEL_MAX_BYTES", str(512 * 1024 * 1024))),  # In-memory Prophet model budget
+    "forecast_max_bytes": int(os.getenv("CACHE_FORECAST_MAX_BYTES", str(128 * 1024 * 1024))),  # In-memory forecast budget
+    "baseline_model_max_bytes": int(os.getenv("CACHE_BASELINE_MODEL_MAX_BYTES", str(32 * 1024 * 1024))),  # In-memory baseline model budget
+    "indicator_max_bytes": int(os.getenv("CACHE_INDICATOR_MAX_BYTES", str(64 * 1024 * 1024))),  # In-memory technical indicator budget
+    "export_max_bytes": int(os.getenv("CACHE_EXPORT_MAX_BYTES", str(64 * 1024 * 1024))),  # In-memory encoded download budget
+    "quote_ttl_seconds": int(os.getenv("CACHE_QUOTE_TTL_SECONDS", "60")),  # 1 minute for price/market cap
+    "profile_ttl_seconds": int(os.getenv("CACHE_PROFILE_TTL_SECONDS", "604800")),  # 7 days for static company info
+    "negative_ttl_seconds": int(os.getenv("CACHE_NEGATIVE_TTL_SECONDS", "21600")),  # 6 hours for confirmed invalid symbols
     "enabled": os.getenv("CACHE_ENABLED", "true").lower() == "true",
     "show_cache_spinner": os.getenv("CACHE_SHOW_SPINNER", "false").lower() == "true"
 }
 
+# Ticker Index Configuration (local symbol lookup and autocomplete)
+TICKER_INDEX_CONFIG: Dict[str, Any] = {
+    "path": os.getenv("TICKER_INDEX_PATH", os.path.join(os.getenv("DATA_DIR", ".cache"), "tickers.csv")),
+    "reload_check_seconds": float(os.getenv("TICKER_INDEX_RELOAD_SECONDS", "60")),  # How often the file is checked for changes
+    "max_suggestions": int(os.getenv("TICKER_MAX_SUGGESTIONS", "8"))  # Autocomplete matches shown
+}
+
+# Watchlist Configuration
+WATCHLIST_CONFIG: Dict[str, Any] = {
+    "max_symbols": int(os.getenv("WATCHLIST_MAX_SYMBOLS", "500")),
+    "batch_size": int(os.getenv("WATCHLIST_BATCH_SIZE", "100")),  # Tickers per yf.download call
+    "max_workers": int(os.getenv("WATCHLIST_MAX_WORKERS", "8")),  # Concurrent batch downloads
+    "market_cap_workers": int(os.getenv("WATCHLIST_MARKET_CAP_WORKERS", "4")),  # Concurrent market cap lookups
+    "lookback_days": int(os.getenv("WATCHLIST_LOOKBACK_DAYS", "10"))  # Enough bars for a daily change
+}
+
+# Batch Forecast Configuration
+BATCH_CONFIG: Dict[str, Any] = {
+    "max_symbols": int(os.getenv("BATCH_MAX_SYMBOLS", "500")),
+    "max_concurrency": int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))  # Symbols in progress at once
+}
+
+# Storage Configuration
+STORAGE_CONFIG: Dict[str, Any] = {
+    "data_dir": os.getenv("DATA_DIR", ".cache"),  # Root directory for on-disk caches
+    "history_store_enabled": os.getenv("HISTORY_STORE_ENABLED", "true").lower() == "true",
+    "model_registry_enabled": os.getenv("MODEL_REGISTRY_ENABLED", "true").lower() == "true",
+    "model_max_age_seconds": int(os.getenv("MODEL_MAX_AGE_SECONDS", "604800")),  # 7 days
+    "model_max_bytes": int(os.getenv("MODEL_MAX_BYTES", str(500 * 1024 * 1024)))  # 500 MB on disk
+}
+
+# Shared Cache Configuration (second cache tier shared by all replicas)
+SHARED_CACHE_CONFIG: Dict[str, Any] = {
+    "backend": os.getenv("SHARED_CACHE_BACKEND", "sqlite").lower(),  # sqlite, redis or none
+    "sqlite_path": os.getenv("SHARED_CACHE_PATH", os.path.join(os.getenv("DATA_DIR", ".cache"), "shared_cache.sqlite")),
+    "redis_url": os.getenv("SHARED_CACHE_REDIS_URL", "redis://localhost:6379/0")
+}
+
+# Export Configuration (Parquet, Arrow IPC and CSV downloads)
+EXPORT_CONFIG: Dict[str, Any] = {
+    "dir": os.getenv("EXPORT_DIR", os.path.join(os.getenv("DATA_DIR", ".cache"), "exports")),  # Multi-symbol export files
+    "max_age_seconds": int(os.getenv("EXPORT_MAX_AGE_SECONDS", "3600")),  # Export files older than this are deleted
+    "parquet_compression": os.getenv("EXPORT_PARQUET_COMPRESSION", "zstd")  # zstd, snappy, gzip or none
+}
+
+# Metrics Configuration
+METRICS_CONFIG: Dict[str, Any] = {
+    "max_samples": int(os.getenv("METRICS_MAX_SAMPLES", "1000")),  # Recent calls kept per stage for percentiles
+    "port": int(os.getenv("METRICS_PORT", "0")),  # Prometheus /metrics endpoint; 0 disables it
+    "textfile_path": os.getenv("METRICS_TEXTFILE", ""),  # Prometheus text file; empty disables it
+    "textfile_interval_seconds": int(os.getenv("METRICS_TEXTFILE_INTERVAL_SECONDS", "15"))
+}
+
+# Warm-up Configuration (preloading heavy modules and the Stan backend)
+WARMUP_CONFIG: Dict[str, Any] = {
+    "enabled": os.getenv("WARMUP_ENABLED", "true").lower() == "true",  # Background warm-up at server boot or first run
+    "training_workers": os.getenv("WARMUP_TRAINING_WORKERS", "true").lower() == "true"  # Fit a tiny model on each worker
+}
+
 def get_config(section: str = None) -> Dict[str, Any]:
     """
     Get configuration for a specific section or all configurations.
@@ -89,11 +192,21 @@ def get_config(section: str = None) -> Dict[str, Any]:
         "app": APP_CONFIG,
         "data": DATA_CONFIG,
         "prophet": PROPHET_CONFIG,
+        "forecast": FORECAST_CONFIG,
         "cv": CV_CONFIG,
+        "training": TRAINING_CONFIG,
         "chart": CHART_CONFIG,
         "logging": LOGGING_CONFIG,
         "api": API_CONFIG,
-        "cache": CACHE_CONFIG
+        "cache": CACHE_CONFIG,
+        "ticker_index": TICKER_INDEX_CONFIG,
+        "watchlist": WATCHLIST_CONFIG,
+        "batch": BATCH_CONFIG,
+        "storage": STORAGE_CONFIG,
+        "shared_cache": SHARED_CACHE_CONFIG,
+        "export": EXPORT_CONFIG,
+        "metrics": METRICS_CONFIG,
+        "warmup": WARMUP_CONFIG
     }
     
     if section is None:
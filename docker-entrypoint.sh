@@ -0,0 +1,15 @@
+#!/bin/sh
+# Heavy modules and the Stan backend are warmed up inside the server process
+# at boot (python warmup.py serve ...), where the loaded modules are reused.
+
+# Build the local ticker index on first start, in the background so the server
+# does not wait for the download; running apps load the file once it appears.
+# Until then (or if the build fails) autocomplete is off and symbols are
+# resolved through the provider. Rerun ticker_index.py to refresh it.
+INDEX_SOURCE=""
+if [ "${MARKET_DATA_PROVIDER:-yfinance}" = "local" ]; then
+    INDEX_SOURCE="--local"
+fi
+(python ticker_index.py --if-missing $INDEX_SOURCE || echo "Ticker index build failed; running without it" >&2) &
+
+exec "$@"
@@ -0,0 +1,282 @@
+"""
+Parquet, Arrow IPC and CSV exports of history, forecasts and CV results.
+
+Frames are exported straight from the caches (``get_stock_data_cached``,
+``generate_forecast_cached``, cross validation results): each is converted to
+an Arrow table without intermediate pandas copies (numeric columns are
+wrapped rather than copied where their layout allows) and encoded once per
+dataset and format into a byte-budgeted cache, so download buttons do not
+re-encode on every rerun.
+
+Multi-symbol exports are streamed into a file under EXPORT_DIR: symbols are
+fetched and written one at a time (a Parquet row group, Arrow record batch or
+CSV chunk each), so a 500-symbol export holds one symbol's frame in memory,
+not all of them. pyarrow is imported on first use.
+"""
+import glob
+import os
+import tempfile
+import time
+from typing import TYPE_CHECKING, Any, Callable, Iterator, List, Optional, Tuple
+import pandas as pd
+from config import get_config
+from instrumentation import mark_miss, traced
+from memory_cache import budgeted_cache
+from utils import logger
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+cache_config = get_config('cache')
+export_config = get_config('export')
+
+EXPORT_FORMATS = {
+    'parquet': {'label': 'Parquet', 'extension': 'parquet', 'mime': 'application/vnd.apache.parquet'},
+    'arrow': {'label': 'Arrow IPC', 'extension': 'arrow', 'mime': 'application/vnd.apache.arrow.file'},
+    'csv': {'label': 'CSV', 'extension': 'csv', 'mime': 'text/csv'}
+}
+
+def to_table(frame: pd.DataFrame, symbol: Optional[str] = None) -> 'pa.Table':
+    """
+    Convert a frame to an Arrow table without copying it in pandas first.
+
+    A named or non-default index (e.g. the history's Date index) becomes a
+    column; a default RangeIndex is dropped.
+
+    Args:
+        frame: DataFrame to convert
+        symbol: Symbol to add as a leading column, for multi-symbol exports
+
+    Returns:
+        Arrow table
+    """
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(frame, preserve_index=None)
+    # pandas metadata would make readers restore the index; exports are plain tables
+    table = table.replace_schema_metadata(None)
+    if symbol is not None:
+        table = table.add_column(0, 'Symbol', pa.array([symbol] * table.num_rows, pa.string()))
+    return table
+
+class ExportWriter:
+    """
+    Incremental writer appending tables to one Parquet, Arrow IPC or CSV file.
+
+    The schema is taken from the first table; later tables are conformed to
+    it (missing columns become nulls, extra columns are dropped).
+    """
+
+    def __init__(self, sink: Any, fmt: str):
+        """
+        Args:
+            sink: Path, file object or pyarrow output stream
+            fmt: Key of EXPORT_FORMATS
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        self.sink = sink
+        self.fmt = fmt
+        self.rows = 0
+        self._schema: Optional['pa.Schema'] = None
+        self._writer = None
+
+    def _open(self, schema: 'pa.Schema') -> None:
+        import pyarrow as pa
+
+        if self.fmt == 'parquet':
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(self.sink, schema, compression=export_config['parquet_compression'])
+        elif self.fmt == 'arrow':
+            self._writer = pa.ipc.new_file(self.sink, schema)
+        else:
+            import pyarrow.csv as pa_csv
+            self._writer = pa_csv.CSVWriter(self.sink, schema)
+        self._schema = schema
+
+    def _conform(self, table: 'pa.Table') -> 'pa.Table':
+        import pyarrow as pa
+
+        columns = [
+            table.column(field.name).cast(field.type) if field.name in table.column_names
+            else pa.nulls(table.num_rows, field.type)
+            for field in self._schema
+        ]
+        return pa.Table.from_arrays(columns, schema=self._schema)
+
+    def write(self, table: 'pa.Table') -> None:
+        """
+        Append a table.
+
+        Args:
+            table: Table to write
+        """
+        if self._writer is None:
+            self._open(table.schema)
+        elif not table.schema.equals(self._schema):
+            table = self._conform(table)
+        self._writer.write_table(table)
+        self.rows += table.num_rows
+
+    def close(self) -> None:
+        """Finish the file (Parquet and Arrow IPC write a footer)."""
+        if self._writer is not None:
+            self._writer.close()
+
+    def __enter__(self) -> 'ExportWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+def encode_frame(frame: pd.DataFrame, fmt: str) -> bytes:
+    """
+    Encode one frame in an export format.
+
+    Args:
+        frame: DataFrame to export
+        fmt: Key of EXPORT_FORMATS
+
+    Returns:
+        File contents
+    """
+    import pyarrow as pa
+
+    sink = pa.BufferOutputStream()
+    with ExportWriter(sink, fmt) as writer:
+        writer.write(to_table(frame))
+    return sink.getvalue().to_pybytes()
+
+@traced('export_frame_cached')
+@budgeted_cache('exports', cache_config['export_max_bytes'], cache_config['forecast_ttl_seconds'])
+def export_frame_cached(symbol: str, dataset: str, fmt: str, _frame: pd.DataFrame) -> bytes:
+    """
+    Encode a cached frame for download, once per dataset and format.
+
+    Args:
+        symbol: Stock ticker symbol
+        dataset: Key identifying the frame's contents, e.g. the data hash,
+            forecast mode and model hash
+        fmt: Key of EXPORT_FORMATS
+        _frame: Frame to export (not hashed)
+
+    Returns:
+        File contents
+    """
+    mark_miss()
+    logger.info(f"Encoding {dataset} export of {symbol.upper()} as {fmt} (cache miss)")
+    return encode_frame(_frame, fmt)
+
+def export_file_name(name: str, fmt: str) -> str:
+    """
+    Build a download file name.
+
+    Args:
+        name: File name without extension
+        fmt: Key of EXPORT_FORMATS
+
+    Returns:
+        File name with the format's extension
+    """
+    return f"{name}.{EXPORT_FORMATS[fmt]['extension']}"
+
+def _remove_stale_exports() -> None:
+    """Delete exports older than EXPORT_MAX_AGE_SECONDS."""
+    cutoff = time.time() - export_config['max_age_seconds']
+    for path in glob.glob(os.path.join(export_config['dir'], '*')):
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+def new_export_path(name: str, fmt: str) -> str:
+    """
+    Reserve a file for a multi-symbol export, deleting stale exports first.
+
+    Args:
+        name: File name prefix
+        fmt: Key of EXPORT_FORMATS
+
+    Returns:
+        Path of a new empty file under EXPORT_DIR
+    """
+    os.makedirs(export_config['dir'], exist_ok=True)
+    _remove_stale_exports()
+    handle, path = tempfile.mkstemp(prefix=f"{name}-", suffix=f".{EXPORT_FORMATS[fmt]['extension']}", dir=export_config['dir'])
+    os.close(handle)
+    return path
+
+def stream_symbols(symbols: List[str], fetch: Callable[[str], Optional[pd.DataFrame]],
+                   fmt: str, path: str) -> Iterator[Tuple[str, Optional[str]]]:
+    """
+    Write frames for many symbols into one export file, one symbol at a time.
+
+    Each frame is written and released before the next symbol is fetched. The
+    file is complete once the iterator is exhausted; an abandoned export
+    (e.g. the page reran) is deleted, and so is an export in which no symbol
+    had data, since without a first table there is no schema to write.
+
+    Args:
+        symbols: Ticker symbols to export
+        fetch: Returns a symbol's frame (from the caches), or None if unavailable
+        fmt: Key of EXPORT_FORMATS
+        path: File from new_export_path
+
+    Yields:
+        (symbol, error message or None) per symbol, in order
+    """
+    started = time.perf_counter()
+    try:
+        with ExportWriter(path, fmt) as writer:
+            for symbol in symbols:
+                try:
+                    frame = fetch(symbol)
+                    if frame is None or frame.empty:
+                        yield symbol, "No data found"
+                        continue
+                    writer.write(to_table(frame, symbol))
+                    yield symbol, None
+                except Exception as e:
+                    logger.error(f"Export of {symbol} failed: {e}")
+                    yield symbol, str(e)
+    except BaseException:
+        os.remove(path)
+        raise
+    if writer.rows == 0:
+        os.remove(path)
+        logger.warning(f"No data to export for {len(symbols)} symbols; removed {path}")
+        return
+    logger.info(f"Exported {writer.rows} rows for {len(symbols)} symbols to {path} in {time.perf_counter() - started:.1f}s")
+
+@traced('read_export')
+def read_export(path: str) -> Optional[bytes]:
+    """
+    Read a finished export file for a download button.
+
+    Streamlit serves downloads from memory, so the file is read once and its
+    contents kept in the exports cache (and its byte budget), keyed by path;
+    reruns that render the button again reuse them. Paths are never reused,
+    so a cached entry cannot go stale.
+
+    Args:
+        path: Path written by stream_symbols
+
+    Returns:
+        File contents, or None if the file was removed as stale
+    """
+    cache = export_frame_cached.cache
+    key = ('file', path)
+    contents = cache.get(key)
+    if contents is not None:
+        return contents
+
+    try:
+        with open(path, 'rb') as f:
+            contents = f.read()
+    except OSError:
+        return None
+    mark_miss()
+    logger.info(f"Read export {os.path.basename(path)} ({len(contents)} bytes, cache miss)")
+    cache.put(key, contents)
+    return contents
@@ -0,0 +1,596 @@
+"""
+Prophet model preparation and training shared by the forecasting pages.
+"""
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from statistics import NormalDist
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from baseline_model import ExponentialSmoothingModel
+from config import get_config
+from instrumentation import mark_miss, traced
+from memory_cache import budgeted_cache
+from model_registry import config_hash, find_models, load_model, load_model_file, save_model
+from shared_cache import dumps_frame, dumps_json, loads_frame, loads_json, shared_cache
+from training_service import training_service
+from utils import MAX_FORECAST_DAYS, MIN_CV_DATA_POINTS, logger
+
+# Prophet (and cmdstanpy) is imported on first use; importing it costs seconds
+if TYPE_CHECKING:
+    from prophet import Prophet
+
+# Load configuration
+cache_config = get_config('cache')
+prophet_config = get_config('prophet')
+forecast_config = get_config('forecast')
+cv_config = get_config('cv')
+
+# Default Prophet constructor parameters; a hyperparameter search may replace
+# the tunable ones per symbol and data (see tuning.py)
+MODEL_PARAMS: Dict[str, Any] = {
+    "weekly_seasonality": prophet_config['weekly_seasonality'],
+    "daily_seasonality": prophet_config['daily_seasonality'],
+    "yearly_seasonality": prophet_config['yearly_seasonality'],
+    "seasonality_mode": prophet_config['seasonality_mode'],
+    "changepoint_prior_scale": prophet_config['changepoint_prior_scale'],
+    "seasonality_prior_scale": prophet_config['seasonality_prior_scale']
+}
+
+# Baseline engine parameters; part of its forecast cache keys
+BASELINE_PARAMS: Dict[str, Any] = {
+    "damping": forecast_config['baseline_damping']
+}
+
+# Forecast modes: Prophet with sampled intervals, Prophet with analytic
+# intervals (same fitted model), and the exponential smoothing baseline
+FORECAST_MODES: Dict[str, str] = {
+    "accurate": "Prophet, Monte Carlo intervals",
+    "fast": "Prophet, analytic intervals",
+    "baseline": "Exponential smoothing"
+}
+
+# Recent fit reports, newest last, for comparing warm and cold fits
+_fit_reports: Deque[Dict[str, Any]] = deque(maxlen=100)
+_fit_reports_lock = threading.Lock()
+
+# Background cross validation jobs keyed by data, model config and CV settings
+_cv_executor = ThreadPoolExecutor(max_workers=cv_config['background_workers'], thread_name_prefix='cv')
+_cv_jobs: "OrderedDict[Tuple, Future]" = OrderedDict()
+_cv_jobs_lock = threading.Lock()
+
+@traced('prepare_prophet_data', cached=False)
+def prepare_prophet_data(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Prepare data for Prophet model by converting to required format.
+
+    Args:
+        data: Raw stock data DataFrame
+
+    Returns:
+        DataFrame formatted for Prophet (ds, y columns)
+    """
+    df = data.reset_index()
+    return pd.DataFrame({
+        'ds': df['Date'].dt.tz_localize(None),
+        'y': df['Close'].astype('float64')
+    })
+
+def fingerprint_rows(prophet_data: pd.DataFrame) -> str:
+    """
+    Hash the full contents of Prophet-formatted rows.
+
+    Args:
+        prophet_data: DataFrame with ds and y columns
+
+    Returns:
+        SHA-256 hex digest of the rows
+    """
+    row_hashes = pd.util.hash_pandas_object(prophet_data[['ds', 'y']], index=False).values
+    return hashlib.sha256(row_hashes.tobytes()).hexdigest()
+
+def _training_metadata(prophet_data: pd.DataFrame, report: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Describe a training run for the model registry.
+
+    Args:
+        prophet_data: Training data
+        report: Fit report from fit_prophet_model
+
+    Returns:
+        JSON-serializable metadata
+    """
+    overlap = prophet_config['warm_start_overlap_rows']
+    return {
+        'rows': len(prophet_data),
+        'first_ds': prophet_data['ds'].iloc[0].isoformat(),
+        'last_ds': prophet_data['ds'].iloc[-1].isoformat(),
+        'tail_fingerprint': fingerprint_rows(prophet_data.tail(overlap)),
+        **report
+    }
+
+def warm_start_params(model: 'Prophet') -> Dict[str, Any]:
+    """
+    Extract fitted parameters to initialize the Stan optimizer.
+
+    Args:
+        model: Fitted Prophet model
+
+    Returns:
+        Dictionary of initial values for k, m, sigma_obs, delta and beta
+    """
+    init = {}
+    for name in ['k', 'm', 'sigma_obs']:
+        init[name] = float(np.mean(model.params[name]))
+    for name in ['delta', 'beta']:
+        init[name] = np.mean(model.params[name], axis=0)
+    return init
+
+def find_warm_start_model(symbol: str, prophet_data: pd.DataFrame, params: Dict[str, Any]) -> Optional['Prophet']:
+    """
+    Find a registry model whose training data the new data extends.
+
+    A candidate qualifies when its training data ends inside the new data and
+    its last bars are unchanged, i.e. only new bars were appended (the window
+    start may have moved forward). Re-adjusted prices change the tail and rule
+    the candidate out.
+
+    Args:
+        symbol: Stock ticker symbol
+        prophet_data: New training data
+        params: Prophet constructor parameters
+
+    Returns:
+        Previous fitted model or None if there is no suitable candidate
+    """
+    overlap = prophet_config['warm_start_overlap_rows']
+    ds_index = pd.Index(prophet_data['ds'])
+
+    for path, meta in find_models(symbol, params):
+        last_ds = pd.Timestamp(meta['last_ds'])
+        if last_ds >= prophet_data['ds'].iloc[-1] or last_ds not in ds_index:
+            continue
+        end = ds_index.get_loc(last_ds) + 1
+        if end < overlap or fingerprint_rows(prophet_data.iloc[end - overlap:end]) != meta['tail_fingerprint']:
+            continue
+
+        model = load_model_file(path)
+        if model is not None:
+            logger.info(f"Warm-starting {symbol.upper()} from model trained through {last_ds.date()}")
+            return model
+    return None
+
+def _optimizer_iterations(model: 'Prophet') -> Optional[int]:
+    """
+    Read the optimizer iteration count from the CmdStan console output.
+
+    Args:
+        model: Model fitted with the cmdstanpy backend
+
+    Returns:
+        Number of L-BFGS iterations or None if unavailable
+    """
+    try:
+        with open(model.stan_backend.stan_fit.runset.stdout_files[0]) as f:
+            rows = [line.split() for line in f]
+        iterations = [int(row[0]) for row in rows if row and row[0].isdigit()]
+        return iterations[-1] if iterations else None
+    except Exception:
+        return None
+
+def fit_prophet_model(prophet_data: pd.DataFrame, params: Dict[str, Any],
+                      init: Optional[Dict[str, Any]] = None) -> Tuple['Prophet', Dict[str, Any]]:
+    """
+    Fit a Prophet model and measure the fit.
+
+    Args:
+        prophet_data: DataFrame formatted for Prophet
+        params: Prophet constructor parameters
+        init: Optional Stan initialization from warm_start_params
+
+    Returns:
+        Tuple of (fitted_model, report) where report has fit_seconds,
+        iterations and warm_start
+    """
+    from prophet import Prophet
+
+    model = Prophet(**params)
+    started = time.perf_counter()
+    if init is not None:
+        model.fit(prophet_data, init=init)
+    else:
+        model.fit(prophet_data)
+    report = {
+        'fit_seconds': round(time.perf_counter() - started, 3),
+        'iterations': _optimizer_iterations(model),
+        'warm_start': init is not None
+    }
+    return model, report
+
+def get_fit_reports() -> list:
+    """
+    Get reports of recent fits in this process.
+
+    Returns:
+        List of report dictionaries, newest last
+    """
+    with _fit_reports_lock:
+        return list(_fit_reports)
+
+def model_config(model: 'Prophet') -> Dict[str, Any]:
+    """
+    Get the constructor parameters a fitted model was built with.
+
+    Args:
+        model: Fitted Prophet model
+
+    Returns:
+        Parameters with the same keys as MODEL_PARAMS
+    """
+    return {name: getattr(model, name) for name in MODEL_PARAMS}
+
+@traced('train_prophet_model')
+def train_prophet_model(symbol: str, data_hash: str, _prophet_data: pd.DataFrame) -> 'Prophet':
+    """
+    Train and cache Prophet model for stock forecasting.
+
+    Uses the hyperparameters a tuning run selected for this symbol and data
+    if there are any, otherwise MODEL_PARAMS.
+
+    Args:
+        symbol: Stock ticker symbol
+        data_hash: Hash of the training data for cache key
+        _prophet_data: DataFrame formatted for Prophet (not hashed)
+
+    Returns:
+        Trained Prophet model
+    """
+    # Imported here to avoid a circular import with tuning
+    from tuning import get_tuned_params
+
+    params = get_tuned_params(symbol, data_hash) or MODEL_PARAMS
+    return _train_prophet_model(symbol, data_hash, config_hash(params), params, _prophet_data)
+
+@budgeted_cache('models', max_bytes=cache_config['model_max_bytes'], ttl_seconds=cache_config['model_ttl_seconds'])
+def _train_prophet_model(symbol: str, data_hash: str, params_key: str, _params: Dict[str, Any],
+                         _prophet_data: pd.DataFrame) -> 'Prophet':
+    """
+    Train and cache a Prophet model with given parameters.
+
+    Models are kept in a byte-budgeted memory cache. On a miss they are looked
+    up in the on-disk model registry and then in the cross-replica shared cache
+    before training, and newly trained models are added to both, so fits
+    survive restarts and are trained once per cluster. When only new bars were
+    appended since a previous fit, the optimizer is initialized from that fit's
+    parameters (warm start). Fits run on the training service's process pool.
+
+    Args:
+        symbol: Stock ticker symbol
+        data_hash: Hash of the training data for cache key
+        params_key: config_hash of the parameters
+        _params: Prophet constructor parameters (not hashed; identified by params_key)
+        _prophet_data: DataFrame formatted for Prophet (not hashed)
+
+    Returns:
+        Trained Prophet model
+    """
+    from prophet.serialize import model_from_json, model_to_json
+
+    mark_miss()
+    prophet_data, params = _prophet_data, _params
+    model = load_model(symbol, data_hash, params)
+    if model is not None:
+        return model
+
+    shared_key = f"{symbol.upper()}:{data_hash}:{params_key}"
+    entry = shared_cache.get('model', shared_key)
+    if entry is not None:
+        try:
+            payload = loads_json(entry[0])
+            model = model_from_json(payload['model'])
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable shared cache model for {symbol.upper()}: {e}")
+        else:
+            logger.info(f"Loaded Prophet model for {symbol.upper()} from shared cache")
+            # With its metadata, the registry copy can seed warm starts on this replica too
+            save_model(symbol, data_hash, params, model, metadata=payload.get('metadata'))
+            return model
+
+    logger.info(f"Training Prophet model for {symbol.upper()} (cache miss)")
+
+    init = None
+    if prophet_config['warm_start']:
+        previous = find_warm_start_model(symbol, prophet_data, params)
+        if previous is not None:
+            init = warm_start_params(previous)
+
+    # Fitted out of process; identical concurrent requests share one fit
+    key = (symbol.upper(), data_hash, params_key)
+    model, report = training_service.fit(key, prophet_data, params, init)
+
+    with _fit_reports_lock:
+        _fit_reports.append({'symbol': symbol.upper(), 'data_hash': data_hash, 'rows': len(prophet_data), **report})
+    logger.info(
+        f"Prophet model training completed for {symbol.upper()} in {report['fit_seconds']}s "
+        f"({'warm' if report['warm_start'] else 'cold'} start, {report['iterations']} iterations)"
+    )
+    metadata = _training_metadata(prophet_data, report)
+    save_model(symbol, data_hash, params, model, metadata=metadata)
+    shared_cache.set(
+        'model', shared_key,
+        dumps_json({'model': model_to_json(model), 'metadata': metadata}),
+        cache_config['model_ttl_seconds']
+    )
+    return model
+
+@traced('train_baseline_model')
+@budgeted_cache('baseline_models', max_bytes=cache_config['baseline_model_max_bytes'], ttl_seconds=cache_config['model_ttl_seconds'])
+def train_baseline_model(symbol: str, data_hash: str, _prophet_data: pd.DataFrame) -> ExponentialSmoothingModel:
+    """
+    Fit and cache the exponential smoothing baseline.
+
+    Fits take milliseconds, so they run in the calling thread and are only
+    cached in memory.
+
+    Args:
+        symbol: Stock ticker symbol
+        data_hash: Hash of the training data for cache key
+        _prophet_data: DataFrame formatted for Prophet (not hashed)
+
+    Returns:
+        Fitted baseline model
+    """
+    mark_miss()
+    logger.info(f"Fitting exponential smoothing baseline for {symbol.upper()} (cache miss)")
+    return ExponentialSmoothingModel(**BASELINE_PARAMS).fit(_prophet_data)
+
+def train_model(symbol: str, data_hash: str, prophet_data: pd.DataFrame, mode: str = 'accurate') -> Any:
+    """
+    Get the fitted model a forecast mode predicts with.
+
+    The accurate and fast modes share one Prophet fit; they only differ in
+    how prediction intervals are computed.
+
+    Args:
+        symbol: Stock ticker symbol
+        data_hash: Hash of the training data for cache key
+        prophet_data: DataFrame formatted for Prophet
+        mode: Forecast mode from FORECAST_MODES
+
+    Returns:
+        Fitted Prophet or baseline model
+
+    Raises:
+        ValueError: If the mode is unknown
+    """
+    if mode not in FORECAST_MODES:
+        raise ValueError(f"Unknown forecast mode: {mode}")
+    if mode == 'baseline':
+        return train_baseline_model(symbol, data_hash, prophet_data)
+    return train_prophet_model(symbol, data_hash, prophet_data)
+
+def predict_fast(model: 'Prophet', future: pd.DataFrame) -> pd.DataFrame:
+    """
+    Predict without Monte Carlo sampling and add analytic intervals.
+
+    The point forecast is Prophet's own. The intervals combine the in-sample
+    residual variance with the variance Prophet's trend sampling would give:
+    future changepoints arrive at the fitted changepoint rate with
+    Laplace-distributed rate changes of the fitted average size, so the trend
+    deviation h (scaled) time units ahead has variance 2 * rate * scale^2 * h^3 / 3.
+
+    Args:
+        model: Fitted Prophet model (not modified)
+        future: Dates to predict
+
+    Returns:
+        Prophet forecast frame with yhat_lower and yhat_upper
+    """
+    quick = copy.copy(model)
+    quick.uncertainty_samples = 0
+    forecast = quick.predict(future)
+
+    history_rows = len(model.history)
+    residuals = model.history['y'].to_numpy() - forecast['yhat'].to_numpy()[:history_rows]
+
+    t = ((forecast['ds'] - model.start) / model.t_scale).to_numpy()
+    horizon = np.clip(t - model.history['t'].max(), 0, None)
+    scale = np.mean(np.abs(model.params['delta'])) + 1e-8
+    trend_variance = 2 * len(model.changepoints_t) * scale ** 2 * horizon ** 3 / 3
+    # Trend deviations are in scaled units and are amplified by multiplicative terms
+    trend_std = np.sqrt(trend_variance) * model.y_scale * (1 + np.asarray(forecast.get('multiplicative_terms', 0.0)))
+
+    std = np.sqrt(np.mean(residuals ** 2) + trend_std ** 2)
+    z = NormalDist().inv_cdf(0.5 + model.interval_width / 2)
+    forecast['yhat_lower'] = forecast['yhat'] - z * std
+    forecast['yhat_upper'] = forecast['yhat'] + z * std
+    return forecast
+
+@budgeted_cache('forecasts', max_bytes=cache_config['forecast_max_bytes'], ttl_seconds=cache_config['forecast_ttl_seconds'])
+def _predict_max_horizon(symbol: str, data_hash: str, model_key: str, mode: str, _model: Any) -> pd.DataFrame:
+    """
+    Predict history plus the longest supported forecast horizon.
+
+    Args:
+        symbol: Stock ticker symbol
+        data_hash: Content hash of the training data
+        model_key: Hash of the model configuration
+        mode: Forecast mode from FORECAST_MODES
+        _model: Fitted model (not hashed; identified by the keys above)
+
+    Returns:
+        DataFrame with predictions for MAX_FORECAST_DAYS future days
+    """
+    mark_miss()
+    shared_key = f"{symbol.upper()}:{data_hash}:{model_key}:{mode}:{MAX_FORECAST_DAYS}"
+    entry = shared_cache.get('forecast', shared_key)
+    if entry is not None:
+        logger.info(f"Loaded {mode} forecast for {symbol.upper()} from shared cache")
+        return loads_frame(entry[0])
+
+    logger.info(f"Generating {mode} forecast for {symbol.upper()}, {MAX_FORECAST_DAYS} days (cache miss)")
+    future = _model.make_future_dataframe(periods=MAX_FORECAST_DAYS)
+    forecast = predict_fast(_model, future) if mode == 'fast' else _model.predict(future)
+    shared_cache.set('forecast', shared_key, dumps_frame(forecast), cache_config['forecast_ttl_seconds'])
+    return forecast
+
+def forecast_model_key(model: Any, mode: str) -> str:
+    """
+    Get the hash identifying a model's forecasts in cache keys.
+
+    Args:
+        model: Model from train_model for this mode
+        mode: Forecast mode from FORECAST_MODES
+
+    Returns:
+        config_hash of the parameters that determine the model's predictions
+    """
+    return config_hash(BASELINE_PARAMS if mode == 'baseline' else model_config(model))
+
+@traced('generate_forecast_cached')
+def generate_forecast_cached(symbol: str, data_hash: str, model: Any, forecast_days: int,
+                             mode: str = 'accurate') -> pd.DataFrame:
+    """
+    Generate cached forecast predictions.
+
+    The model is asked to predict once at MAX_FORECAST_DAYS; shorter horizons
+    are a positional slice of that frame, so changing the horizon costs nothing.
+
+    Args:
+        symbol: Stock ticker symbol
+        data_hash: Content hash of the training data
+        model: Model from train_model for this mode, trained on that data
+        forecast_days: Number of days to forecast (at most MAX_FORECAST_DAYS)
+        mode: Forecast mode from FORECAST_MODES
+
+    Returns:
+        DataFrame with forecast predictions (read-only view)
+    """
+    forecast = _predict_max_horizon(symbol, data_hash, forecast_model_key(model, mode), mode, model)
+    history_rows = len(forecast) - MAX_FORECAST_DAYS
+    return forecast.iloc[:history_rows + min(forecast_days, MAX_FORECAST_DAYS)]
+
+def cv_settings(n_rows: int) -> Tuple[str, str, str]:
+    """
+    Build cross validation windows from CV_CONFIG.
+
+    Args:
+        n_rows: Number of training rows
+
+    Returns:
+        Tuple of (initial, period, horizon) Prophet duration strings
+    """
+    initial_days = min(cv_config['initial_days'], n_rows // 2)
+    return f"{initial_days} days", f"{cv_config['period_days']} days", f"{cv_config['horizon_days']} days"
+
+def cv_cutoffs(df: pd.DataFrame) -> List[pd.Timestamp]:
+    """
+    Get the cross validation cutoff dates for a training set.
+
+    Cross validation and hyperparameter tuning both use these, so tuning
+    scores candidates on exactly the folds shown on the Forecast page.
+
+    Args:
+        df: Prophet-formatted DataFrame
+
+    Returns:
+        Cutoff dates, oldest first
+    """
+    from prophet.diagnostics import generate_cutoffs
+
+    initial, period, horizon = (pd.Timedelta(window) for window in cv_settings(len(df)))
+    return sorted(generate_cutoffs(df, horizon, initial, period))
+
+@traced('perform_cross_validation', cached=False)
+def perform_cross_validation(model: 'Prophet', df: pd.DataFrame) -> Optional[Tuple[pd.DataFrame, pd.DataFrame]]:
+    """
+    Perform cross validation on Prophet model to assess performance.
+
+    Folds are fitted in parallel according to CV_CONFIG['parallel']. Threads
+    suffice because each fit runs in a CmdStan subprocess; Prophet's
+    "processes" mode would fork the multi-threaded server, so it falls back
+    to threads.
+
+    Args:
+        model: Fitted Prophet model
+        df: Prophet-formatted DataFrame
+
+    Returns:
+        Tuple of (cross_validation_results, performance_metrics) or None if
+        insufficient data or cross validation failed
+    """
+    from prophet.diagnostics import cross_validation, performance_metrics
+
+    if len(df) < MIN_CV_DATA_POINTS:
+        logger.info(f"Insufficient data for cross validation: {len(df)} < {MIN_CV_DATA_POINTS}")
+        return None
+
+    parallel = cv_config['parallel'].lower()
+    if parallel == 'processes':
+        logger.warning("CV_PARALLEL=processes forks the server process; using threads")
+        parallel = 'threads'
+    try:
+        initial, period, horizon = cv_settings(len(df))
+        logger.info(f"Starting cross validation (initial={initial}, period={period}, horizon={horizon}, parallel={parallel})")
+        cv_results = cross_validation(
+            model,
+            horizon=horizon,
+            cutoffs=cv_cutoffs(df),
+            parallel=None if parallel == 'none' else parallel,
+            disable_tqdm=True
+        )
+        performance = performance_metrics(cv_results)
+        logger.info("Cross validation completed successfully")
+        return cv_results, performance
+    except Exception as e:
+        logger.error(f"Cross validation failed: {str(e)}")
+        return None
+
+@traced('submit_cross_validation')
+def submit_cross_validation(symbol: str, data_hash: str, model: 'Prophet', df: pd.DataFrame,
+                            retry: bool = False) -> Future:
+    """
+    Start cross validation in the background, or reuse a started/finished job.
+
+    Jobs are cached by (symbol, data hash, model config, CV windows), so page
+    reruns never repeat the work and the result is ready as soon as it exists.
+    A failed job (result None) stays cached too, so a CV that fails every
+    time is not resubmitted on each rerun; it only runs again on retry.
+
+    Args:
+        symbol: Stock ticker symbol
+        data_hash: Hash of the training data
+        model: Fitted Prophet model
+        df: Prophet-formatted DataFrame
+        retry: Resubmit the job if it finished without a result
+
+    Returns:
+        Future resolving to the perform_cross_validation result
+    """
+    key = (symbol.upper(), data_hash, config_hash(model_config(model))) + cv_settings(len(df))
+
+    with _cv_jobs_lock:
+        job = _cv_jobs.get(key)
+        if job is not None and not (retry and job.done() and job.result() is None):
+            _cv_jobs.move_to_end(key)
+            return job
+
+        mark_miss()
+        logger.info(f"Scheduling cross validation for {symbol.upper()} ({'retry' if job is not None else 'cache miss'})")
+        job = _cv_executor.submit(perform_cross_validation, model, df)
+        _cv_jobs[key] = job
+        while len(_cv_jobs) > cv_config['max_cached_results']:
+            _cv_jobs.popitem(last=False)
+        return job
+
+        mark_miss()
+        logger.info(f"Scheduling cross validation for {symbol.upper()} (cache miss)")
+        job = _cv_executor.submit(perform_cross_validation, model, df)
+        _cv_jobs[key] = job
+        while len(_cv_jobs) > cv_config['max_cached_results']:
+            _cv_jobs.popitem(last=False)
+        return job
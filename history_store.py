@@ -0,0 +1,458 @@
+"""
+Persistent on-disk OHLCV history store.
+
+Bars are kept in one Parquet file per symbol, next to a small JSON sidecar that
+records the date interval already fetched from the market data provider. A request only
+downloads the dates that are not covered yet (usually just the newest bars) and
+appends them to the stored history.
+
+On top of the disk store, ``HistoryCache`` keeps one merged interval per symbol
+in memory and answers any contained range by slicing it. Ranges it has to load
+are looked up in the cross-replica shared cache first. Cached frames keep only
+the OHLCV columns (float64 prices, integer volumes, no adjustment columns), so
+exports and fits see the provider's prices exactly, and the cache is bounded
+by bytes. Charts downcast their own copy (see ``charts.resample_ohlcv_cached``).
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+import pandas as pd
+from pandas.tseries.holiday import USFederalHolidayCalendar
+from pandas.tseries.offsets import CustomBusinessDay
+from config import get_config
+from instrumentation import mark_miss, traced
+from memory_cache import estimate_bytes, register
+from providers import provider
+from shared_cache import dumps_frame, loads_frame, shared_cache
+
+storage_config = get_config('storage')
+cache_config = get_config('cache')
+
+HISTORY_DIR = os.path.join(storage_config['data_dir'], 'history')
+
+# Columns whose non-zero values mean Yahoo has re-adjusted past prices
+ADJUSTMENT_COLUMNS = ('Dividends', 'Stock Splits')
+
+# Columns kept in cached frames and the dtypes they are stored as
+COMPACT_DTYPES = {
+    'Open': 'float64',
+    'High': 'float64',
+    'Low': 'float64',
+    'Close': 'float64',
+    'Volume': 'int64'
+}
+
+# Approximates the exchange calendar; only used to normalize cache keys
+TRADING_DAY = CustomBusinessDay(calendar=USFederalHolidayCalendar())
+
+logger = logging.getLogger(__name__)
+
+_symbol_locks: Dict[str, threading.Lock] = {}
+_symbol_locks_guard = threading.Lock()
+
+DateLike = Union[date, datetime, str, pd.Timestamp]
+
+def _to_date(value: DateLike) -> date:
+    """
+    Normalize a date-like value to a plain calendar date.
+
+    Args:
+        value: Date, datetime, timestamp or ISO date string
+
+    Returns:
+        Calendar date without time or timezone information
+    """
+    return pd.Timestamp(value).date()
+
+def normalize_range(start_date: DateLike, end_date: DateLike) -> Tuple[date, date]:
+    """
+    Normalize a requested range to trading-day boundaries.
+
+    Both ends are rolled forward to the next trading day, so ranges that select
+    the same trading days (e.g. ending on Saturday or Sunday) map to one key.
+
+    Args:
+        start_date: Start date for data retrieval
+        end_date: End date for data retrieval (exclusive)
+
+    Returns:
+        Tuple of (start, end) trading days with an exclusive end
+    """
+    start = TRADING_DAY.rollforward(pd.Timestamp(_to_date(start_date))).date()
+    end = TRADING_DAY.rollforward(pd.Timestamp(_to_date(end_date))).date()
+    return start, max(start, end)
+
+def _symbol_lock(symbol: str) -> threading.Lock:
+    """
+    Get the lock that serializes store updates for a symbol.
+
+    Args:
+        symbol: Upper-case stock ticker symbol
+
+    Returns:
+        Lock shared by all threads working on the symbol
+    """
+    with _symbol_locks_guard:
+        return _symbol_locks.setdefault(symbol, threading.Lock())
+
+def _symbol_paths(symbol: str) -> Tuple[str, str]:
+    """
+    Get the Parquet and metadata file paths for a symbol.
+
+    Args:
+        symbol: Upper-case stock ticker symbol
+
+    Returns:
+        Tuple of (parquet_path, metadata_path)
+    """
+    base = os.path.join(HISTORY_DIR, symbol)
+    return f"{base}.parquet", f"{base}.json"
+
+def slice_history(data: pd.DataFrame, start: DateLike, end: DateLike) -> pd.DataFrame:
+    """
+    Select the bars in the half-open date interval [start, end).
+
+    Args:
+        data: History DataFrame with a sorted DatetimeIndex
+        start: First date to include
+        end: First date to exclude (matches yfinance's exclusive end)
+
+    Returns:
+        Positional slice of the DataFrame
+    """
+    tz = data.index.tz
+    lower = data.index.searchsorted(pd.Timestamp(_to_date(start)).tz_localize(tz))
+    upper = data.index.searchsorted(pd.Timestamp(_to_date(end)).tz_localize(tz))
+    return data.iloc[lower:upper]
+
+def load_history(symbol: str) -> Tuple[Optional[pd.DataFrame], Optional[Tuple[date, date]]]:
+    """
+    Load the stored history and covered interval for a symbol.
+
+    Args:
+        symbol: Upper-case stock ticker symbol
+
+    Returns:
+        Tuple of (history, (covered_start, covered_end)), or (None, None) if
+        nothing usable is stored
+    """
+    data_path, meta_path = _symbol_paths(symbol)
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None, None
+
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        data = pd.read_parquet(data_path)
+        covered = (date.fromisoformat(meta['start']), date.fromisoformat(meta['end']))
+        return data, covered
+    except Exception as e:
+        logger.warning(f"Discarding unreadable history store for {symbol}: {e}")
+        return None, None
+
+def save_history(symbol: str, data: pd.DataFrame, covered: Tuple[date, date]) -> None:
+    """
+    Atomically write the history and covered interval for a symbol.
+
+    Args:
+        symbol: Upper-case stock ticker symbol
+        data: Full history DataFrame to store
+        covered: Tuple of (covered_start, covered_end) with an exclusive end
+    """
+    os.makedirs(HISTORY_DIR, exist_ok=True)
+    data_path, meta_path = _symbol_paths(symbol)
+
+    # Write to per-process temporary files first so readers never see a partial file
+    tmp_suffix = f"{os.getpid()}.tmp"
+    data.to_parquet(f"{data_path}.{tmp_suffix}")
+    with open(f"{meta_path}.{tmp_suffix}", 'w') as f:
+        json.dump({'start': covered[0].isoformat(), 'end': covered[1].isoformat()}, f)
+    os.replace(f"{data_path}.{tmp_suffix}", data_path)
+    os.replace(f"{meta_path}.{tmp_suffix}", meta_path)
+
+@traced('provider_history', cached=False)
+def _fetch_range(symbol: str, start: date, end: date) -> pd.DataFrame:
+    """
+    Fetch bars for [start, end) from the market data provider.
+
+    Args:
+        symbol: Upper-case stock ticker symbol
+        start: First date to fetch
+        end: First date not to fetch
+
+    Returns:
+        DataFrame with the fetched bars (may be empty)
+    """
+    logger.info(f"Fetching {symbol} bars from {start} to {end}")
+    return provider.history(symbol, start, end)
+
+def _missing_ranges(requested: Tuple[date, date], covered: Optional[Tuple[date, date]]) -> List[Tuple[date, date]]:
+    """
+    Compute the date ranges of a request not covered by the store.
+
+    Args:
+        requested: Tuple of (start, end) being requested
+        covered: Tuple of (start, end) already stored, or None
+
+    Returns:
+        List of (start, end) ranges to fetch
+    """
+    start, end = requested
+    if covered is None:
+        return [(start, end)]
+
+    gaps = []
+    if start < covered[0]:
+        gaps.append((start, covered[0]))
+    if end > covered[1]:
+        gaps.append((covered[1], end))
+    return gaps
+
+def _has_adjustments(data: pd.DataFrame) -> bool:
+    """
+    Check whether fetched bars contain dividends or splits.
+
+    Args:
+        data: Newly fetched bars
+
+    Returns:
+        True if previously stored adjusted prices are now stale
+    """
+    return any(col in data.columns and (data[col] != 0).any() for col in ADJUSTMENT_COLUMNS)
+
+def get_history(symbol: str, start_date: DateLike, end_date: DateLike) -> Optional[pd.DataFrame]:
+    """
+    Get bars for [start_date, end_date), fetching only what is not stored yet.
+
+    Args:
+        symbol: Stock ticker symbol
+        start_date: Start date for data retrieval
+        end_date: End date for data retrieval (exclusive)
+
+    Returns:
+        DataFrame with stock data or None if no data is available
+    """
+    symbol = symbol.upper()
+    start, end = _to_date(start_date), _to_date(end_date)
+
+    if not storage_config['history_store_enabled']:
+        data = _fetch_range(symbol, start, end)
+        return None if data.empty else data
+
+    with _symbol_lock(symbol):
+        stored, covered = load_history(symbol)
+        gaps = _missing_ranges((start, end), covered)
+
+        if gaps:
+            try:
+                fetched = [_fetch_range(symbol, gap_start, gap_end) for gap_start, gap_end in gaps]
+                fetched = [frame for frame in fetched if not frame.empty]
+                new_covered = (
+                    min(start, covered[0]) if covered else start,
+                    max(end, covered[1]) if covered else end
+                )
+
+                if stored is not None and any(_has_adjustments(frame) for frame in fetched):
+                    # A split or dividend re-adjusts all earlier prices, so refresh everything
+                    logger.info(f"Corporate action detected for {symbol}, refetching full history")
+                    merged = _fetch_range(symbol, *new_covered)
+                else:
+                    frames = [frame for frame in [stored] + fetched if frame is not None and not frame.empty]
+                    merged = pd.concat(frames) if frames else pd.DataFrame()
+                    merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+
+                # Today's bar may still change, so never mark it as covered
+                new_covered = (new_covered[0], min(new_covered[1], date.today()))
+                if new_covered[0] < new_covered[1]:
+                    save_history(symbol, merged, new_covered)
+                stored = merged
+            except Exception as e:
+                if stored is None:
+                    raise
+                logger.warning(f"Serving stored history for {symbol} after fetch error: {e}")
+
+        if stored is None or stored.empty:
+            return None
+
+        data = slice_history(stored, start, end)
+        logger.info(f"History store served {len(data)} bars for {symbol} ({len(gaps)} ranges fetched)")
+        return None if data.empty else data
+
+def compact_ohlcv(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert history to its compact cached form.
+
+    Prices stay float64 and volumes become integers; adjustment and any other
+    columns the pages do not use are dropped.
+
+    Args:
+        data: History DataFrame as fetched
+
+    Returns:
+        Compact copy of the history
+    """
+    columns = [col for col in COMPACT_DTYPES if col in data.columns]
+    compact = data[columns]
+    if 'Volume' in compact.columns:
+        compact = compact.assign(Volume=compact['Volume'].fillna(0))
+    return compact.astype({col: COMPACT_DTYPES[col] for col in columns})
+
+def get_shared_history(symbol: str, start: date, end: date) -> Tuple[Optional[pd.DataFrame], float]:
+    """
+    Get compact bars for [start, end) from the shared cache, or load and share them.
+
+    Args:
+        symbol: Upper-case stock ticker symbol
+        start: First date to include
+        end: First date to exclude
+
+    Returns:
+        Tuple of (history or None, timestamp the bars were loaded at)
+    """
+    key = f"{symbol}:{start.isoformat()}:{end.isoformat()}"
+    entry = shared_cache.get('history', key)
+    if entry is not None:
+        logger.info(f"Shared cache served {symbol} bars from {start} to {end}")
+        return compact_ohlcv(loads_frame(entry[0])), entry[1]
+
+    data = get_history(symbol, start, end)
+    if data is not None:
+        data = compact_ohlcv(data)
+        shared_cache.set('history', key, dumps_frame(data), cache_config['data_ttl_seconds'])
+    return data, time.time()
+
+class HistoryCache:
+    """
+    In-memory history cache holding one merged date interval per symbol.
+
+    Requests contained in a symbol's interval are answered with a positional
+    slice of the cached frame (no copy), so callers must treat results as
+    read-only. Requests reaching outside it load the union interval through
+    ``get_history``, which only downloads the uncovered gaps.
+
+    Symbols are evicted least recently used first when either the symbol count
+    or the byte budget is exceeded.
+    """
+
+    name = 'history'
+
+    def __init__(self, max_symbols: int, max_bytes: int, ttl_seconds: int):
+        """
+        Initialize the cache.
+
+        Args:
+            max_symbols: Maximum number of symbols kept in memory (LRU)
+            max_bytes: Maximum total size of the cached frames (LRU)
+            ttl_seconds: Age after which ranges touching recent days are reloaded
+        """
+        self.max_symbols = max_symbols
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[Optional[pd.DataFrame], Tuple[date, date], float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+        register(self)
+
+    def _is_fresh(self, loaded_at: float, end: date) -> bool:
+        """
+        Check whether a cached interval can still answer a request.
+
+        Args:
+            loaded_at: Time the interval was loaded
+            end: Requested exclusive end date
+
+        Returns:
+            True unless the request reaches recent days and the entry has expired
+        """
+        if time.time() - loaded_at <= self.ttl_seconds:
+            return True
+        # Bars before the day the entry was loaded were already final
+        return end <= date.fromtimestamp(loaded_at)
+
+    def get(self, symbol: str, start_date: DateLike, end_date: DateLike) -> Optional[pd.DataFrame]:
+        """
+        Get bars for a range, slicing a cached superset when possible.
+
+        Args:
+            symbol: Stock ticker symbol
+            start_date: Start date for data retrieval
+            end_date: End date for data retrieval (exclusive)
+
+        Returns:
+            DataFrame with stock data or None if no data is available
+        """
+        symbol = symbol.upper()
+        start, end = normalize_range(start_date, end_date)
+
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is not None:
+                self._entries.move_to_end(symbol)
+
+        if entry is not None:
+            data, covered, loaded_at, _ = entry
+            if covered[0] <= start and end <= covered[1] and self._is_fresh(loaded_at, end):
+                if data is None:
+                    return None
+                sliced = slice_history(data, start, end)
+                return None if sliced.empty else sliced
+            # Extend the cached interval instead of replacing it
+            start, end = min(start, covered[0]), max(end, covered[1])
+            requested = normalize_range(start_date, end_date)
+        else:
+            requested = (start, end)
+
+        mark_miss()
+        data, loaded_at = get_shared_history(symbol, start, end)
+        size = estimate_bytes(data) if data is not None else 0
+        with self._lock:
+            previous = self._entries.pop(symbol, None)
+            if previous is not None:
+                self._bytes -= previous[3]
+            self._entries[symbol] = (data, (start, end), loaded_at, size)
+            self._bytes += size
+            # The entry just loaded is always kept
+            while len(self._entries) > 1 and (len(self._entries) > self.max_symbols or self._bytes > self.max_bytes):
+                evicted, (_, _, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+                logger.info(f"Evicted {evicted} from history cache ({evicted_size} bytes)")
+
+        if data is None:
+            return None
+        sliced = slice_history(data, *requested)
+        return None if sliced.empty else sliced
+
+    def clear(self) -> None:
+        """Drop all cached intervals."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the current size of the cache.
+
+        Returns:
+            Dictionary with name, entries, bytes, max_bytes and evictions
+        """
+        with self._lock:
+            return {
+                'name': self.name,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'evictions': self._evictions
+            }
+
+history_cache = HistoryCache(
+    max_symbols=cache_config['max_data_entries'],
+    max_bytes=cache_config['history_max_bytes'],
+    ttl_seconds=cache_config['data_ttl_seconds']
+)
@@ -0,0 +1,236 @@
+"""
+Vectorized technical indicators with incremental updates.
+
+Every indicator is a function ``(bars, params, state) -> (values, state)``.
+Called with ``state=None`` it computes over all bars; called with the state
+returned by a previous call it only processes the bars appended since, using
+the stored tail (rolling windows) or last smoothed values (EMA-based
+indicators). All arithmetic is vectorized with pandas/NumPy.
+
+``compute_indicator`` caches results per (symbol, indicator, params) in a
+byte-budgeted cache, so a Dashboard rerun after new bars arrive only
+processes the new bars.
+"""
+from typing import Any, Callable, Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+from config import get_config
+from instrumentation import mark_miss, traced
+from memory_cache import BudgetedCache
+from utils import logger
+
+cache_config = get_config('cache')
+
+State = Optional[Dict[str, Any]]
+
+def _ewm(values: pd.Series, alpha: float, seed: Optional[float] = None) -> pd.Series:
+    """
+    Exponentially weighted mean (y_t = alpha * x_t + (1 - alpha) * y_t-1).
+
+    Args:
+        values: Input series
+        alpha: Smoothing factor
+        seed: Previous smoothed value to continue from (None starts fresh)
+
+    Returns:
+        Smoothed series aligned with values
+    """
+    if seed is None:
+        return values.ewm(alpha=alpha, adjust=False).mean()
+    seeded = pd.concat([pd.Series([seed], dtype='float64'), values.astype('float64')], ignore_index=True)
+    result = seeded.ewm(alpha=alpha, adjust=False).mean().iloc[1:]
+    result.index = values.index
+    return result
+
+def _mask_warmup(values: pd.Series, window: int, seen: int) -> pd.Series:
+    """
+    Blank values produced before a full window of bars was seen.
+
+    Args:
+        values: Indicator values for the new bars
+        window: Bars needed before values are meaningful
+        seen: Bars processed before these
+
+    Returns:
+        Series with warm-up values set to NaN
+    """
+    positions = seen + np.arange(len(values))
+    return values.where(positions >= window)
+
+def _rolling_input(bars: pd.DataFrame, state: State) -> pd.Series:
+    """
+    Prepend the stored tail of closes to the new closes.
+
+    Args:
+        bars: New bars
+        state: Previous state holding a 'tail' series, or None
+
+    Returns:
+        Close series covering the tail and the new bars
+    """
+    close = bars['Close'].astype('float64')
+    return close if state is None else pd.concat([state['tail'], close])
+
+def _tail(close: pd.Series, window: int) -> pd.Series:
+    """
+    Keep the closes a rolling window needs to continue.
+
+    Args:
+        close: Close series processed so far
+        window: Rolling window length
+
+    Returns:
+        Last window - 1 closes (all of them while fewer have been seen)
+    """
+    return close.iloc[max(0, len(close) - (window - 1)):] if window > 1 else close.iloc[:0]
+
+def sma(bars: pd.DataFrame, params: Dict[str, Any], state: State) -> Tuple[pd.DataFrame, State]:
+    """Simple moving average of the close."""
+    window = params['window']
+    close = _rolling_input(bars, state)
+    values = close.rolling(window).mean().iloc[len(close) - len(bars):]
+    return pd.DataFrame({f"SMA {window}": values}), {'tail': _tail(close, window)}
+
+def ema(bars: pd.DataFrame, params: Dict[str, Any], state: State) -> Tuple[pd.DataFrame, State]:
+    """Exponential moving average of the close."""
+    span = params['span']
+    values = _ewm(bars['Close'].astype('float64'), 2 / (span + 1), state and state['ema'])
+    return pd.DataFrame({f"EMA {span}": values}), {'ema': values.iloc[-1]}
+
+def bollinger(bars: pd.DataFrame, params: Dict[str, Any], state: State) -> Tuple[pd.DataFrame, State]:
+    """Bollinger bands: moving average plus/minus a multiple of the rolling standard deviation."""
+    window, num_std = params['window'], params['num_std']
+    close = _rolling_input(bars, state)
+    rolling = close.rolling(window)
+    middle = rolling.mean().iloc[len(close) - len(bars):]
+    width = num_std * rolling.std(ddof=0).iloc[len(close) - len(bars):]
+    values = pd.DataFrame({
+        f"BB Upper {window}": middle + width,
+        f"BB Middle {window}": middle,
+        f"BB Lower {window}": middle - width
+    })
+    return values, {'tail': _tail(close, window)}
+
+def rsi(bars: pd.DataFrame, params: Dict[str, Any], state: State) -> Tuple[pd.DataFrame, State]:
+    """Relative strength index with Wilder smoothing."""
+    window = params['window']
+    close = bars['Close'].astype('float64')
+    previous = pd.concat([pd.Series([state['close'] if state else np.nan]), close.iloc[:-1]], ignore_index=True)
+    delta = close - previous.values
+    avg_gain = _ewm(delta.clip(lower=0), 1 / window, state and state['avg_gain'])
+    avg_loss = _ewm((-delta).clip(lower=0), 1 / window, state and state['avg_loss'])
+    values = (100 - 100 / (1 + avg_gain / avg_loss)).where(avg_loss != 0, 100.0)
+    seen = state['seen'] if state else 0
+    new_state = {
+        'close': close.iloc[-1],
+        'avg_gain': avg_gain.iloc[-1],
+        'avg_loss': avg_loss.iloc[-1],
+        'seen': seen + len(bars)
+    }
+    return pd.DataFrame({f"RSI {window}": _mask_warmup(values, window + 1, seen)}), new_state
+
+def macd(bars: pd.DataFrame, params: Dict[str, Any], state: State) -> Tuple[pd.DataFrame, State]:
+    """Moving average convergence/divergence with signal line and histogram."""
+    fast, slow, signal = params['fast'], params['slow'], params['signal']
+    close = bars['Close'].astype('float64')
+    fast_ema = _ewm(close, 2 / (fast + 1), state and state['fast'])
+    slow_ema = _ewm(close, 2 / (slow + 1), state and state['slow'])
+    line = fast_ema - slow_ema
+    signal_line = _ewm(line, 2 / (signal + 1), state and state['signal'])
+    values = pd.DataFrame({'MACD': line, 'MACD Signal': signal_line, 'MACD Histogram': line - signal_line})
+    return values, {'fast': fast_ema.iloc[-1], 'slow': slow_ema.iloc[-1], 'signal': signal_line.iloc[-1]}
+
+def atr(bars: pd.DataFrame, params: Dict[str, Any], state: State) -> Tuple[pd.DataFrame, State]:
+    """Average true range with Wilder smoothing."""
+    window = params['window']
+    high, low, close = (bars[col].astype('float64') for col in ('High', 'Low', 'Close'))
+    previous = pd.Series(
+        np.concatenate([[state['close'] if state else np.nan], close.values[:-1]]),
+        index=bars.index
+    )
+    # Without a previous close the true range is just the bar's range
+    true_range = pd.concat([high - low, (high - previous).abs(), (low - previous).abs()], axis=1).max(axis=1)
+    values = _ewm(true_range, 1 / window, state and state['atr'])
+    seen = state['seen'] if state else 0
+    new_state = {'close': close.iloc[-1], 'atr': values.iloc[-1], 'seen': seen + len(bars)}
+    return pd.DataFrame({f"ATR {window}": _mask_warmup(values, window, seen)}), new_state
+
+# Indicator name: (function, default parameters, panel). Indicators on the
+# 'price' panel are drawn over the candlesticks; others get their own panel.
+INDICATORS: Dict[str, Tuple[Callable, Dict[str, Any], str]] = {
+    'SMA': (sma, {'window': 20}, 'price'),
+    'EMA': (ema, {'span': 20}, 'price'),
+    'Bollinger Bands': (bollinger, {'window': 20, 'num_std': 2.0}, 'price'),
+    'RSI': (rsi, {'window': 14}, 'RSI'),
+    'MACD': (macd, {'fast': 12, 'slow': 26, 'signal': 9}, 'MACD'),
+    'ATR': (atr, {'window': 14}, 'ATR')
+}
+
+_indicator_cache = BudgetedCache('indicators', max_bytes=cache_config['indicator_max_bytes'])
+
+def _reusable(entry: Dict[str, Any], data: pd.DataFrame) -> bool:
+    """
+    Check whether a cached result covers a prefix of data or data is a prefix of it.
+
+    Args:
+        entry: Cached indicator entry
+        data: OHLCV bars of the current request
+
+    Returns:
+        True if both start at the same bar and the last bar they share is
+        unchanged (the latest bar keeps moving while the market is open)
+    """
+    values = entry['values']
+    if data.index[0] != entry['start']:
+        return False
+    if len(data) < len(values):
+        return values.index[len(data) - 1] == data.index[-1]
+    return (
+        data.index[len(values) - 1] == entry['end']
+        and float(data['Close'].iloc[len(values) - 1]) == entry['end_close']
+    )
+
+@traced('compute_indicator')
+def compute_indicator(symbol: str, name: str, params: Dict[str, Any], data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute an indicator over OHLCV bars, reusing and extending cached results.
+
+    Results are cached per (symbol, indicator, params). If the bars extend the
+    cached ones (same first bar, unchanged last cached bar), only the appended
+    bars are processed from the stored state; if they are a prefix, the cached
+    values are sliced. Anything else (a different start, re-adjusted prices)
+    is recomputed in full.
+
+    Args:
+        symbol: Stock ticker symbol
+        name: Indicator name from INDICATORS
+        params: Indicator parameters
+        data: Daily OHLCV bars with a sorted DatetimeIndex
+
+    Returns:
+        DataFrame of indicator values aligned with data
+    """
+    func = INDICATORS[name][0]
+    key = (symbol.upper(), name, tuple(sorted(params.items())))
+    entry = _indicator_cache.get(key)
+
+    if entry is not None and _reusable(entry, data):
+        if len(data) <= len(entry['values']):
+            return entry['values'].iloc[:len(data)]
+        new_bars = data.iloc[len(entry['values']):]
+        new_values, state = func(new_bars, params, entry['state'])
+        values = pd.concat([entry['values'], new_values])
+        logger.info(f"Extended {name} for {symbol.upper()} by {len(new_bars)} bars")
+    else:
+        mark_miss()
+        logger.info(f"Computing {name} for {symbol.upper()} over {len(data)} bars (cache miss)")
+        values, state = func(data, params, None)
+
+    _indicator_cache.put(key, {
+        'start': data.index[0],
+        'end': data.index[-1],
+        'end_close': float(data['Close'].iloc[-1]),
+        'values': values,
+        'state': state
+    })
+    return values
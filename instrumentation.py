@@ -0,0 +1,435 @@
+"""
+Lightweight instrumentation for page sections and cached stages.
+
+Pages wrap independently re-executing parts in ``section(...)`` blocks and call
+``begin_run(...)`` at the start of the page and of every fragment function. The debug
+overlay then shows which sections re-executed on each interaction and how long
+each one took.
+
+Cached functions are wrapped with ``@traced(...)`` and call ``mark_miss()`` on
+their slow path. Every call records wall time, an RSS delta and hit/miss into a
+process-wide ``stage_stats`` registry, which the Metrics page shows and which is
+exported in Prometheus text format over HTTP and/or to a file.
+"""
+import functools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import streamlit as st
+import numpy as np
+import pandas as pd
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from config import get_config
+from memory_cache import cache_stats
+from warmup import start_background_warmup
+
+app_config = get_config('app')
+metrics_config = get_config('metrics')
+
+# Session state key and number of runs kept for the overlay
+RUNS_KEY = '_section_runs'
+MAX_RUNS = 20
+
+# Percentiles reported per stage
+PERCENTILES = (50, 90, 95, 99)
+
+# Prefix of every exported Prometheus metric
+METRIC_PREFIX = 'stock_hub'
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+def _rss_bytes() -> Optional[int]:
+    """
+    Get the current resident set size of this process.
+
+    Returns:
+        RSS in bytes, or None where /proc is not available
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+def _rss_delta(before: Optional[int]) -> int:
+    """
+    Get the RSS change since an earlier reading.
+
+    Args:
+        before: Earlier _rss_bytes() reading
+
+    Returns:
+        Change in bytes (0 when RSS is not available)
+    """
+    after = _rss_bytes()
+    return after - before if before is not None and after is not None else 0
+
+class StageStats:
+    """
+    Thread-safe per-stage call statistics.
+
+    Counters (calls, hits, misses, total seconds) are cumulative for the life
+    of the process; percentiles are computed over the most recent samples.
+    RSS deltas are process-wide, so they are approximate when stages overlap.
+    """
+
+    def __init__(self, max_samples: int):
+        """
+        Args:
+            max_samples: Recent samples kept per stage for percentiles
+        """
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, stage: str, seconds: float, memory_delta: int, hit: Optional[bool]) -> None:
+        """
+        Record one call of a stage.
+
+        Args:
+            stage: Stage name
+            seconds: Wall time of the call
+            memory_delta: RSS change during the call, in bytes
+            hit: True/False for cache hits/misses, None for uncached stages
+        """
+        with self._lock:
+            entry = self._stages.get(stage)
+            if entry is None:
+                entry = self._stages[stage] = {
+                    'calls': 0, 'hits': 0, 'misses': 0, 'seconds_total': 0.0,
+                    'samples': deque(maxlen=self.max_samples)
+                }
+            entry['calls'] += 1
+            entry['seconds_total'] += seconds
+            if hit is True:
+                entry['hits'] += 1
+            elif hit is False:
+                entry['misses'] += 1
+            entry['samples'].append((seconds, memory_delta))
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        Aggregate the recorded calls per stage.
+
+        Returns:
+            One dictionary per stage with counters, hit ratio, latency
+            percentiles (seconds) and mean RSS delta (bytes)
+        """
+        with self._lock:
+            snapshot = [(stage, dict(entry, samples=list(entry['samples']))) for stage, entry in self._stages.items()]
+
+        rows = []
+        for stage, entry in sorted(snapshot):
+            samples = np.array(entry['samples'], dtype=float)
+            lookups = entry['hits'] + entry['misses']
+            row = {
+                'stage': stage,
+                'calls': entry['calls'],
+                'hits': entry['hits'],
+                'misses': entry['misses'],
+                'hit_ratio': entry['hits'] / lookups if lookups else None,
+                'seconds_total': entry['seconds_total'],
+                'memory_delta_mean': float(samples[:, 1].mean())
+            }
+            for pct, value in zip(PERCENTILES, np.percentile(samples[:, 0], PERCENTILES)):
+                row[f'p{pct}'] = float(value)
+            rows.append(row)
+        return rows
+
+    def reset(self) -> None:
+        """Drop all recorded calls."""
+        with self._lock:
+            self._stages.clear()
+
+stage_stats = StageStats(max_samples=metrics_config['max_samples'])
+
+# Open traced calls of the current thread, innermost last: [stage, missed]
+_active = threading.local()
+
+def mark_miss() -> None:
+    """Mark the innermost traced call of this thread as a cache miss."""
+    frames = getattr(_active, 'frames', None)
+    if frames:
+        frames[-1][1] = True
+
+def traced(stage: str, cached: bool = True) -> Callable:
+    """
+    Decorator recording wall time, RSS delta and hit/miss of every call.
+
+    Apply it outside ``st.cache_data``/``st.cache_resource`` so hits are timed
+    too; the cached body calls ``mark_miss()`` on its slow path. The wrapper
+    keeps the cached function's ``clear()``.
+
+    Args:
+        stage: Stage name used in metrics
+        cached: Whether calls count as cache hits unless marked as misses
+
+    Returns:
+        Decorator
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            frames = getattr(_active, 'frames', None)
+            if frames is None:
+                frames = _active.frames = []
+            frame = [stage, False]
+            frames.append(frame)
+            rss_before = _rss_bytes()
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                frames.pop()
+                stage_stats.record(stage, elapsed, _rss_delta(rss_before), (not frame[1]) if cached else None)
+
+        if hasattr(func, 'clear'):
+            wrapper.clear = func.clear
+        return wrapper
+    return decorator
+
+def _label(value: str) -> str:
+    """
+    Escape a Prometheus label value.
+
+    Args:
+        value: Raw label value
+
+    Returns:
+        Escaped value
+    """
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def prometheus_text() -> str:
+    """
+    Render the stage statistics in the Prometheus text exposition format.
+
+    Returns:
+        Metrics text
+    """
+    rows = stage_stats.summary()
+    lines = [
+        f"# HELP {METRIC_PREFIX}_stage_calls_total Calls per traced stage and cache result",
+        f"# TYPE {METRIC_PREFIX}_stage_calls_total counter"
+    ]
+    for row in rows:
+        stage = _label(row['stage'])
+        uncached = row['calls'] - row['hits'] - row['misses']
+        for result, count in (('hit', row['hits']), ('miss', row['misses']), ('none', uncached)):
+            if count:
+                lines.append(f'{METRIC_PREFIX}_stage_calls_total{{stage="{stage}",result="{result}"}} {count}')
+
+    lines += [
+        f"# HELP {METRIC_PREFIX}_stage_seconds Wall time per traced stage (quantiles over recent calls)",
+        f"# TYPE {METRIC_PREFIX}_stage_seconds summary"
+    ]
+    for row in rows:
+        stage = _label(row['stage'])
+        for pct in PERCENTILES:
+            lines.append(f'{METRIC_PREFIX}_stage_seconds{{stage="{stage}",quantile="{pct / 100}"}} {row[f"p{pct}"]:.6f}')
+        lines.append(f'{METRIC_PREFIX}_stage_seconds_sum{{stage="{stage}"}} {row["seconds_total"]:.6f}')
+        lines.append(f'{METRIC_PREFIX}_stage_seconds_count{{stage="{stage}"}} {row["calls"]}')
+
+    lines += [
+        f"# HELP {METRIC_PREFIX}_stage_cache_hit_ratio Cache hit ratio per cached stage",
+        f"# TYPE {METRIC_PREFIX}_stage_cache_hit_ratio gauge"
+    ]
+    for row in rows:
+        if row['hit_ratio'] is not None:
+            lines.append(f'{METRIC_PREFIX}_stage_cache_hit_ratio{{stage="{_label(row["stage"])}"}} {row["hit_ratio"]:.4f}')
+
+    lines += [
+        f"# HELP {METRIC_PREFIX}_stage_memory_delta_bytes Mean RSS change per call over recent calls",
+        f"# TYPE {METRIC_PREFIX}_stage_memory_delta_bytes gauge"
+    ]
+    for row in rows:
+        lines.append(f'{METRIC_PREFIX}_stage_memory_delta_bytes{{stage="{_label(row["stage"])}"}} {row["memory_delta_mean"]:.0f}')
+
+    caches = cache_stats()
+    for metric, field, kind, description in (
+        ('cache_bytes', 'bytes', 'gauge', "Estimated memory held by each in-memory cache"),
+        ('cache_max_bytes', 'max_bytes', 'gauge', "Byte budget of each in-memory cache"),
+        ('cache_entries', 'entries', 'gauge', "Entries in each in-memory cache"),
+        ('cache_evictions_total', 'evictions', 'counter', "Entries evicted from each in-memory cache")
+    ):
+        lines += [
+            f"# HELP {METRIC_PREFIX}_{metric} {description}",
+            f"# TYPE {METRIC_PREFIX}_{metric} {kind}"
+        ]
+        for cache in caches:
+            lines.append(f'{METRIC_PREFIX}_{metric}{{cache="{_label(cache["name"])}"}} {cache[field]}')
+
+    rss = _rss_bytes()
+    if rss is not None:
+        lines += [
+            f"# HELP {METRIC_PREFIX}_process_resident_memory_bytes Resident memory of the app process",
+            f"# TYPE {METRIC_PREFIX}_process_resident_memory_bytes gauge",
+            f"{METRIC_PREFIX}_process_resident_memory_bytes {rss}"
+        ]
+    return '\n'.join(lines) + '\n'
+
+def write_prometheus_file(path: str) -> None:
+    """
+    Atomically write the metrics text for a node_exporter-style textfile collector.
+
+    Args:
+        path: Target file path
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(f"{path}.tmp", 'w') as f:
+        f.write(prometheus_text())
+    os.replace(f"{path}.tmp", path)
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves prometheus_text() on /metrics."""
+
+    def do_GET(self) -> None:
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = prometheus_text().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        # Scrapes are frequent; keep them out of the app log
+        pass
+
+_exporters_lock = threading.Lock()
+_exporters_started = False
+
+def _textfile_loop(path: str, interval: int) -> None:
+    """
+    Rewrite the metrics file periodically.
+
+    Args:
+        path: Target file path
+        interval: Seconds between writes
+    """
+    while True:
+        try:
+            write_prometheus_file(path)
+        except OSError:
+            pass
+        time.sleep(interval)
+
+def start_exporters() -> None:
+    """
+    Start the configured Prometheus exporters once per process.
+
+    METRICS_PORT serves /metrics over HTTP and METRICS_TEXTFILE is rewritten
+    every METRICS_TEXTFILE_INTERVAL_SECONDS; both are off by default.
+    """
+    global _exporters_started
+    with _exporters_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+
+    if metrics_config['port']:
+        server = ThreadingHTTPServer(('0.0.0.0', metrics_config['port']), _MetricsHandler)
+        threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    if metrics_config['textfile_path']:
+        threading.Thread(
+            target=_textfile_loop,
+            args=(metrics_config['textfile_path'], metrics_config['textfile_interval_seconds']),
+            name='metrics-textfile', daemon=True
+        ).start()
+
+def debug_enabled() -> bool:
+    """
+    Check whether the section debug overlay is enabled.
+
+    Returns:
+        True if DEBUG_SECTIONS is set or the URL has ?debug=1
+    """
+    return app_config['debug_sections'] or st.query_params.get('debug') == '1'
+
+def _is_fragment_rerun() -> bool:
+    """
+    Check whether only fragments (not the whole page) are executing.
+
+    Returns:
+        True during a fragment-only rerun
+    """
+    ctx = get_script_run_ctx()
+    return bool(getattr(ctx, 'fragment_ids_this_run', None))
+
+def begin_run(scope: str, fragment: bool = False) -> None:
+    """
+    Mark the start of a full page run or a fragment run.
+
+    Fragment functions also execute as part of full page runs; in that case
+    their sections are recorded under the page run. The first run also starts
+    the metrics exporters and the background warm-up (unless the server
+    started it at boot).
+
+    Args:
+        scope: Name of the page or fragment being executed
+        fragment: Whether the caller is a fragment function
+    """
+    start_exporters()
+    start_background_warmup()
+    if fragment and not _is_fragment_rerun():
+        return
+    if RUNS_KEY not in st.session_state:
+        st.session_state[RUNS_KEY] = deque(maxlen=MAX_RUNS)
+    st.session_state[RUNS_KEY].append({'scope': scope, 'started': datetime.now(), 'sections': []})
+
+@contextmanager
+def section(name: str) -> Iterator[None]:
+    """
+    Time a page section and record it in the current run.
+
+    Sections are also recorded as ``section:<name>`` stages in stage_stats.
+
+    Args:
+        name: Section name shown in the debug overlay
+    """
+    rss_before = _rss_bytes()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        stage_stats.record(f"section:{name}", elapsed, _rss_delta(rss_before), None)
+        runs = st.session_state.get(RUNS_KEY)
+        if runs:
+            runs[-1]['sections'].append((name, elapsed))
+
+def _render_overlay() -> None:
+    """Render the recorded runs, newest first."""
+    runs = list(st.session_state.get(RUNS_KEY, []))
+    rows = [
+        {
+            'Time': run['started'].strftime('%H:%M:%S'),
+            'Run': run['scope'],
+            'Section': name,
+            'ms': round(seconds * 1000, 1)
+        }
+        for run in reversed(runs[-5:])
+        for name, seconds in run['sections']
+    ]
+    st.caption("Sections executed by the last 5 runs (full page or fragment)")
+    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+def render_debug_overlay() -> None:
+    """
+    Show the section timing overlay in the sidebar when debugging is enabled.
+
+    The overlay refreshes itself, so fragment reruns show up without a full rerun.
+    """
+    if not debug_enabled():
+        return
+    with st.sidebar:
+        with st.expander("🐞 Section Timings", expanded=True):
+            st.fragment(run_every=2)(_render_overlay)()
@@ -0,0 +1,249 @@
+"""
+In-memory caches bounded by bytes instead of entry counts.
+
+Entry sizes vary by orders of magnitude (a 20-year history vs. a 1-year one, a
+Prophet model with or without samples), so the large caches enforce a byte
+budget with least-recently-used eviction. Every cache registers itself here,
+so their current memory use can be reported on the Metrics page and in the
+Prometheus export.
+"""
+import functools
+import inspect
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Object attributes are followed this deep when estimating sizes
+MAX_ESTIMATE_DEPTH = 4
+
+_registry: List[Any] = []
+_registry_lock = threading.Lock()
+
+def estimate_bytes(obj: Any, _depth: int = 0, _seen: Optional[set] = None) -> int:
+    """
+    Estimate the memory held by an object.
+
+    DataFrames, Series and arrays report their buffer sizes; containers and
+    plain objects (e.g. a fitted Prophet model) are summed over their contents.
+
+    Args:
+        obj: Object to measure
+
+    Returns:
+        Approximate size in bytes
+    """
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        usage = obj.memory_usage(index=True, deep=True)
+        return int(usage.sum() if isinstance(obj, pd.DataFrame) else usage)
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, (str, bytes, int, float, bool)) or obj is None or _depth >= MAX_ESTIMATE_DEPTH:
+        return sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_bytes(value, _depth + 1, seen) for value in obj.values())
+    if isinstance(obj, (list, tuple, set)):
+        return sys.getsizeof(obj) + sum(estimate_bytes(item, _depth + 1, seen) for item in obj)
+    if hasattr(obj, '__dict__'):
+        return sys.getsizeof(obj) + sum(estimate_bytes(value, _depth + 1, seen) for value in vars(obj).values())
+    return sys.getsizeof(obj)
+
+def register(cache: Any) -> None:
+    """
+    Add a cache to the memory report.
+
+    Args:
+        cache: Object with a ``stats()`` method returning BudgetedCache-style stats
+    """
+    with _registry_lock:
+        _registry.append(cache)
+
+def cache_stats() -> List[Dict[str, Any]]:
+    """
+    Get the current size of every registered cache.
+
+    Returns:
+        One stats dictionary per cache
+    """
+    with _registry_lock:
+        caches = list(_registry)
+    return [cache.stats() for cache in caches]
+
+def clear_all() -> None:
+    """Drop the entries of every registered cache."""
+    with _registry_lock:
+        caches = list(_registry)
+    for cache in caches:
+        cache.clear()
+
+class BudgetedCache:
+    """
+    Thread-safe LRU cache bounded by total bytes and optionally by age.
+
+    Concurrent requests for the same missing key compute it once.
+    """
+
+    def __init__(self, name: str, max_bytes: int, ttl_seconds: Optional[int] = None):
+        """
+        Args:
+            name: Cache name used in reports
+            max_bytes: Byte budget; least recently used entries are evicted above it
+            ttl_seconds: Optional age after which entries are recomputed
+        """
+        self.name = name
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        register(self)
+
+    def _lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        Get an unexpired entry and mark it as recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Tuple of (found, value)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            value, size, stored_at = entry
+            if self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self._bytes -= size
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Get a cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None if missing or expired
+        """
+        return self._lookup(key)[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Store an entry and evict least recently used entries above the budget.
+
+        The newest entry is always kept, even if it alone exceeds the budget.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        size = estimate_bytes(value)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, size, time.time())
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                evicted_key, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+                logger.info(f"Evicted {evicted_key} from {self.name} cache ({evicted_size} bytes)")
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Get a cached value, computing and storing it on a miss.
+
+        Args:
+            key: Cache key
+            compute: Zero-argument callable producing the value
+
+        Returns:
+            Cached or newly computed value
+        """
+        found, value = self._lookup(key)
+        if found:
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            # Another thread may have computed it while we waited
+            found, value = self._lookup(key)
+            if not found:
+                value = compute()
+                self.put(key, value)
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return value
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the current size of the cache.
+
+        Returns:
+            Dictionary with name, entries, bytes, max_bytes and evictions
+        """
+        with self._lock:
+            return {
+                'name': self.name,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'evictions': self._evictions
+            }
+
+def budgeted_cache(name: str, max_bytes: int, ttl_seconds: Optional[int] = None) -> Callable:
+    """
+    Decorator caching a function's results in a BudgetedCache.
+
+    Like Streamlit's cache decorators, parameters whose names start with an
+    underscore are not part of the key.
+
+    Args:
+        name: Cache name used in reports
+        max_bytes: Byte budget of the cache
+        ttl_seconds: Optional age after which entries are recomputed
+
+    Returns:
+        Decorator; the wrapped function gains ``clear()`` and ``cache``
+    """
+    cache = BudgetedCache(name, max_bytes, ttl_seconds)
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            key = tuple((param, value) for param, value in bound.arguments.items() if not param.startswith('_'))
+            return cache.get_or_compute(key, lambda: func(*args, **kwargs))
+
+        wrapper.clear = cache.clear
+        wrapper.cache = cache
+        return wrapper
+    return decorator
@@ -0,0 +1,262 @@
+"""
+On-disk registry of fitted Prophet models.
+
+Models are serialized with Prophet's JSON serialization and keyed by symbol,
+training data hash and model configuration, so they survive restarts and are
+shared by every process using the same data directory. The registry is bounded
+by age and total size; the least recently used models are evicted first.
+
+Each model may carry a small metadata sidecar (``.meta``) describing its training
+data, which is used to find warm-start candidates.
+"""
+import glob
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from config import get_config
+
+if TYPE_CHECKING:
+    from prophet import Prophet
+
+storage_config = get_config('storage')
+
+MODEL_DIR = os.path.join(storage_config['data_dir'], 'models')
+
+logger = logging.getLogger(__name__)
+
+_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+_stats_lock = threading.Lock()
+
+def config_hash(params: Dict[str, Any]) -> str:
+    """
+    Hash a model configuration.
+
+    Args:
+        params: Prophet constructor parameters
+
+    Returns:
+        Short hash that is stable across processes
+    """
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:12]
+
+def model_path(symbol: str, data_hash: str, params: Dict[str, Any]) -> str:
+    """
+    Get the registry path of a model.
+
+    Args:
+        symbol: Stock ticker symbol
+        data_hash: Hash of the training data
+        params: Prophet constructor parameters
+
+    Returns:
+        Path of the serialized model
+    """
+    return os.path.join(MODEL_DIR, f"{symbol.upper()}_{data_hash}_{config_hash(params)}.json")
+
+def _record(event: str) -> Dict[str, int]:
+    """
+    Count a registry event.
+
+    Args:
+        event: One of 'hits', 'misses' or 'evictions'
+
+    Returns:
+        Copy of the updated counters
+    """
+    with _stats_lock:
+        _stats[event] += 1
+        return dict(_stats)
+
+def get_stats() -> Dict[str, int]:
+    """
+    Get registry hit, miss and eviction counters for this process.
+
+    Returns:
+        Dictionary of counters
+    """
+    with _stats_lock:
+        return dict(_stats)
+
+def load_model(symbol: str, data_hash: str, params: Dict[str, Any]) -> Optional['Prophet']:
+    """
+    Load a fitted model from the registry.
+
+    Args:
+        symbol: Stock ticker symbol
+        data_hash: Hash of the training data
+        params: Prophet constructor parameters
+
+    Returns:
+        Fitted Prophet model or None on a miss
+    """
+    if not storage_config['model_registry_enabled']:
+        return None
+
+    from prophet.serialize import model_from_json
+
+    path = model_path(symbol, data_hash, params)
+    try:
+        if time.time() - os.path.getmtime(path) > storage_config['model_max_age_seconds']:
+            stats = _record('misses')
+            logger.info(f"Model registry miss for {symbol.upper()} (expired) {stats}")
+            return None
+        with open(path) as f:
+            model = model_from_json(f.read())
+    except FileNotFoundError:
+        stats = _record('misses')
+        logger.info(f"Model registry miss for {symbol.upper()} {stats}")
+        return None
+    except Exception as e:
+        stats = _record('misses')
+        logger.warning(f"Model registry miss for {symbol.upper()} (unreadable: {e}) {stats}")
+        return None
+
+    # Refresh the access time so size-based eviction is least recently used
+    os.utime(path)
+    stats = _record('hits')
+    logger.info(f"Model registry hit for {symbol.upper()} {stats}")
+    return model
+
+def _meta_path(path: str) -> str:
+    """
+    Get the metadata sidecar path for a model file.
+
+    Args:
+        path: Path of the serialized model
+
+    Returns:
+        Path of the metadata file
+    """
+    return f"{path[:-len('.json')]}.meta"
+
+def load_model_file(path: str) -> Optional['Prophet']:
+    """
+    Load a serialized model by path.
+
+    Args:
+        path: Path of the serialized model
+
+    Returns:
+        Fitted Prophet model or None if unreadable
+    """
+    from prophet.serialize import model_from_json
+
+    try:
+        with open(path) as f:
+            return model_from_json(f.read())
+    except Exception as e:
+        logger.warning(f"Could not load model {os.path.basename(path)}: {e}")
+        return None
+
+def find_models(symbol: str, params: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    List registry models for a symbol and configuration that have metadata.
+
+    Args:
+        symbol: Stock ticker symbol
+        params: Prophet constructor parameters
+
+    Returns:
+        List of (model_path, metadata) tuples, most recently used first
+    """
+    pattern = os.path.join(MODEL_DIR, f"{symbol.upper()}_*_{config_hash(params)}.json")
+    cutoff = time.time() - storage_config['model_max_age_seconds']
+    candidates = []
+    for path in glob.glob(pattern):
+        try:
+            if os.path.getmtime(path) < cutoff:
+                continue
+            with open(_meta_path(path)) as f:
+                candidates.append((os.path.getmtime(path), path, json.load(f)))
+        except (FileNotFoundError, ValueError):
+            continue
+    return [(path, meta) for _, path, meta in sorted(candidates, key=lambda c: c[0], reverse=True)]
+
+def save_model(symbol: str, data_hash: str, params: Dict[str, Any], model: 'Prophet',
+               metadata: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Serialize a fitted model into the registry and enforce its limits.
+
+    Args:
+        symbol: Stock ticker symbol
+        data_hash: Hash of the training data
+        params: Prophet constructor parameters
+        model: Fitted Prophet model
+        metadata: Optional JSON-serializable description of the training run
+    """
+    if not storage_config['model_registry_enabled']:
+        return
+
+    from prophet.serialize import model_to_json
+
+    try:
+        os.makedirs(MODEL_DIR, exist_ok=True)
+        path = model_path(symbol, data_hash, params)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(model_to_json(model))
+        if metadata is not None:
+            with open(f"{tmp_path}.meta", 'w') as f:
+                json.dump(metadata, f)
+            os.replace(f"{tmp_path}.meta", _meta_path(path))
+        os.replace(tmp_path, path)
+        logger.info(f"Stored model for {symbol.upper()} in registry ({os.path.getsize(path)} bytes)")
+    except Exception as e:
+        logger.warning(f"Could not store model for {symbol.upper()}: {e}")
+        return
+
+    evict()
+
+def _list_models() -> List[Tuple[str, float, int]]:
+    """
+    List registry files.
+
+    Returns:
+        List of (path, mtime, size) tuples, least recently used first
+    """
+    entries = []
+    for name in os.listdir(MODEL_DIR):
+        if not name.endswith('.json'):
+            continue
+        path = os.path.join(MODEL_DIR, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        entries.append((path, stat.st_mtime, stat.st_size))
+    return sorted(entries, key=lambda entry: entry[1])
+
+def evict() -> int:
+    """
+    Remove expired models, then the least recently used ones until the
+    registry fits in its size budget.
+
+    Returns:
+        Number of models removed
+    """
+    if not os.path.isdir(MODEL_DIR):
+        return 0
+
+    entries = _list_models()
+    total_bytes = sum(size for _, _, size in entries)
+    cutoff = time.time() - storage_config['model_max_age_seconds']
+    removed = 0
+
+    for path, mtime, size in entries:
+        if mtime >= cutoff and total_bytes <= storage_config['model_max_bytes']:
+            continue
+        for stale_path in (path, _meta_path(path)):
+            try:
+                os.remove(stale_path)
+            except FileNotFoundError:
+                pass
+        total_bytes -= size
+        removed += 1
+        stats = _record('evictions')
+        logger.info(f"Evicted {os.path.basename(path)} from model registry {stats}")
+
+    return removed
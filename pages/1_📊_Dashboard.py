@@ -1,91 +1,223 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import date, timedelta
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from utils import format_market_cap, format_volume_dollars, logger, get_stock_data_cached
+from utils import format_market_cap, format_volume_dollars, logger, get_stock_data_cached, get_quote_cached, generate_data_hash
+from charts import RESOLUTIONS, choose_resolution, resample_ohlcv_cached
+from indicators import INDICATORS, compute_indicator
+from exports import EXPORT_FORMATS, export_file_name, export_frame_cached
+from instrumentation import begin_run, section, render_debug_overlay
+from config import get_config
 from typing import Optional
 
+chart_config = get_config('chart')
+
+# Visible range choices in calendar days (None shows the full range)
+VISIBLE_RANGES = {
+    "1M": 31,
+    "3M": 92,
+    "6M": 183,
+    "1Y": 365,
+    "2Y": 730,
+    "All": None
+}
+
 st.set_page_config(page_title="Stock Dashboard", layout="wide")
 
 st.title("📊 Stock Dashboard")
 
+def indicator_controls() -> dict:
+    """
+    Render the indicator picker and a popover with each indicator's parameters.
+
+    Returns:
+        Dictionary of selected indicator name to parameters
+    """
+    selected = st.multiselect("Indicators", list(INDICATORS), placeholder="Add technical indicators")
+    chosen = {}
+    if selected:
+        with st.popover("Indicator Settings"):
+            for name in selected:
+                defaults = INDICATORS[name][1]
+                st.markdown(f"**{name}**")
+                columns = st.columns(len(defaults))
+                chosen[name] = {
+                    param: column.number_input(
+                        param.replace('_', ' ').title(),
+                        min_value=0.5 if isinstance(default, float) else 2,
+                        value=default,
+                        step=0.5 if isinstance(default, float) else 1,
+                        key=f"indicator_{name}_{param}"
+                    )
+                    for column, (param, default) in zip(columns, defaults.items())
+                }
+    return chosen
+
+def render_chart(symbol: str, data: pd.DataFrame) -> None:
+    """
+    Render the candlestick and volume chart with its range and resolution controls.
+    
+    Runs as a fragment, so changing the controls only re-executes the chart.
+    
+    Args:
+        symbol: Stock ticker symbol
+        data: Daily OHLCV DataFrame
+    """
+    begin_run("chart fragment", fragment=True)
+    with section("chart"):
+        range_col, resolution_col = st.columns(2)
+        with range_col:
+            visible_range = st.segmented_control("Visible Range", list(VISIBLE_RANGES), default="All") or "All"
+        with resolution_col:
+            resolution_choice = st.segmented_control("Resolution", ["Auto"] + list(RESOLUTIONS), default="Auto") or "Auto"
+        selected_indicators = indicator_controls()
+    
+        visible = data
+        if VISIBLE_RANGES[visible_range] is not None:
+            visible = data[data.index >= data.index[-1] - pd.Timedelta(days=VISIBLE_RANGES[visible_range])]
+    
+        # Long ranges are aggregated so the browser gets at most max_chart_points bars
+        resolution = choose_resolution(len(visible)) if resolution_choice == "Auto" else resolution_choice
+        chart_data = resample_ohlcv_cached(symbol, generate_data_hash(visible), resolution, visible)
+        if resolution != "Daily":
+            st.caption(f"Showing {len(chart_data)} {resolution.lower()} bars aggregated from {len(visible)} daily bars. Narrow the visible range for full resolution.")
+    
+        # Indicators run on the full daily history (so warm-up periods are
+        # outside the visible range) and are sampled at the charted bars
+        overlays, panels = [], []
+        for name, params in selected_indicators.items():
+            values = compute_indicator(symbol, name, params, data).reindex(chart_data.index, method='ffill')
+            (overlays if INDICATORS[name][2] == 'price' else panels).append((name, values))
+
+        panel_height = 0.2
+        fig = make_subplots(
+            rows=2 + len(panels), cols=1,
+            shared_xaxes=True,
+            vertical_spacing=0.1 if not panels else 0.05,
+            subplot_titles=(f"{symbol.upper()} Candlestick Chart", "Volume") + tuple(name for name, _ in panels),
+            row_heights=[0.7, 0.3] + [panel_height] * len(panels)  # Relative; Plotly normalizes them
+        )
+    
+        fig.add_trace(
+            go.Candlestick(
+                x=chart_data.index,
+                open=chart_data['Open'],
+                high=chart_data['High'],
+                low=chart_data['Low'],
+                close=chart_data['Close'],
+                increasing_line_color=chart_config['candlestick_increasing_color'],
+                decreasing_line_color=chart_config['candlestick_decreasing_color'],
+                name=symbol.upper()
+            ),
+            row=1, col=1
+        )
+    
+        fig.add_trace(
+            go.Bar(
+                x=chart_data.index,
+                y=chart_data['Volume'],
+                name="Volume",
+                marker_color=f"rgba(255,165,0,{chart_config['volume_opacity']})"
+            ),
+            row=2, col=1
+        )
+    
+        for _, values in overlays:
+            for column in values.columns:
+                fig.add_trace(go.Scatter(x=values.index, y=values[column], name=column, mode='lines', line=dict(width=1)), row=1, col=1)
+
+        for row, (name, values) in enumerate(panels, start=3):
+            for column in values.columns:
+                if column == 'MACD Histogram':
+                    fig.add_trace(go.Bar(x=values.index, y=values[column], name=column), row=row, col=1)
+                else:
+                    fig.add_trace(go.Scatter(x=values.index, y=values[column], name=column, mode='lines', line=dict(width=1)), row=row, col=1)
+            fig.update_yaxes(title_text=name, row=row, col=1)
+            if name == 'RSI':
+                fig.update_yaxes(range=[0, 100], row=row, col=1)
+
+        fig.update_layout(
+            height=chart_config['dashboard_height'] + int(chart_config['dashboard_height'] * panel_height) * len(panels),
+            showlegend=bool(overlays or panels),
+            xaxis_rangeslider_visible=False
+        )
+    
+        fig.update_yaxes(title_text="Price ($)", row=1, col=1)
+        fig.update_yaxes(title_text="Volume", row=2, col=1)
+    
+        st.plotly_chart(fig, use_container_width=True)
+
+def render_export(symbol: str, data: pd.DataFrame) -> None:
+    """
+    Render the OHLCV download controls.
+    
+    Runs as a fragment, so switching the format only re-encodes the export.
+    
+    Args:
+        symbol: Stock ticker symbol
+        data: Stock data DataFrame from get_stock_data_cached
+    """
+    begin_run("export fragment", fragment=True)
+    with section("export"):
+        export_format = st.radio(
+            "Export Format",
+            list(EXPORT_FORMATS),
+            format_func=lambda fmt: EXPORT_FORMATS[fmt]['label'],
+            horizontal=True
+        )
+        # Encoded from the cached frame once per data and format
+        st.download_button(
+            "📥 Download OHLCV",
+            data=export_frame_cached(symbol, generate_data_hash(data), export_format, data),
+            file_name=export_file_name(f"{symbol.upper()}_{data.index[0]:%Y%m%d}_{data.index[-1]:%Y%m%d}", export_format),
+            mime=EXPORT_FORMATS[export_format]['mime']
+        )
+
 stock_symbol = st.session_state.get('stock_symbol', '')
-start_date = st.session_state.get('start_date', datetime.now() - timedelta(days=1825))
-end_date = st.session_state.get('end_date', datetime.now())
+start_date = st.session_state.get('start_date', date.today() - timedelta(days=1825))
+end_date = st.session_state.get('end_date', date.today())
+
+begin_run("dashboard page")
+render_debug_overlay()
 
 if stock_symbol:
     try:
         with st.spinner(f"Fetching data for {stock_symbol.upper()}..."):
-            # Use cached data fetching
-            data = get_stock_data_cached(stock_symbol, start_date, end_date)
+            with section("data"):
+                # Use cached data fetching
+                data = get_stock_data_cached(stock_symbol, start_date, end_date)
             
             if data is None:
                 st.error(f"No data found for symbol '{stock_symbol.upper()}'. Please check the ticker symbol.")
             else:
-                # Fetch company info separately (not cached due to frequent changes)
-                ticker = yf.Ticker(stock_symbol.upper())
-                info = ticker.info
-                
-                col1, col2, col3, col4 = st.columns(4)
-                
-                with col1:
-                    st.metric("Current Price", f"${data['Close'][-1]:.2f}")
-                with col2:
-                    change = data['Close'][-1] - data['Close'][-2]
-                    st.metric("Daily Change", f"${change:.2f}", f"{(change/data['Close'][-2]*100):.2f}%")
-                with col3:
-                    volume_str = format_volume_dollars(data['Volume'][-1], data['Close'][-1])
-                    st.metric("Volume", volume_str)
-                with col4:
-                    market_cap = info.get('marketCap', 0)
-                    market_cap_str = format_market_cap(market_cap)
-                    st.metric("Market Cap", market_cap_str)
-                
-                fig = make_subplots(
-                    rows=2, cols=1,
-                    shared_xaxes=True,
-                    vertical_spacing=0.1,
-                    subplot_titles=(f"{stock_symbol.upper()} Candlestick Chart", "Volume"),
-                    row_heights=[0.7, 0.3]
-                )
-                
-                fig.add_trace(
-                    go.Candlestick(
-                        x=data.index,
-                        open=data['Open'],
-                        high=data['High'],
-                        low=data['Low'],
-                        close=data['Close'],
-                        name=stock_symbol.upper()
-                    ),
-                    row=1, col=1
-                )
+                with section("metrics"):
+                    # Market cap changes intraday, so it comes from the short-TTL quote tier
+                    quote = get_quote_cached(stock_symbol) or {}
                 
-                fig.add_trace(
-                    go.Bar(
-                        x=data.index,
-                        y=data['Volume'],
-                        name="Volume",
-                        marker_color='rgba(255,165,0,0.8)'
-                    ),
-                    row=2, col=1
-                )
+                    col1, col2, col3, col4 = st.columns(4)
                 
-                fig.update_layout(
-                    height=700,
-                    showlegend=False,
-                    xaxis_rangeslider_visible=False
-                )
+                    with col1:
+                        st.metric("Current Price", f"${data['Close'].iloc[-1]:.2f}")
+                    with col2:
+                        change = data['Close'].iloc[-1] - data['Close'].iloc[-2]
+                        st.metric("Daily Change", f"${change:.2f}", f"{(change/data['Close'].iloc[-2]*100):.2f}%")
+                    with col3:
+                        volume_str = format_volume_dollars(data['Volume'].iloc[-1], data['Close'].iloc[-1])
+                        st.metric("Volume", volume_str)
+                    with col4:
+                        market_cap = quote.get('marketCap', 0)
+                        market_cap_str = format_market_cap(market_cap)
+                        st.metric("Market Cap", market_cap_str)
                 
-                fig.update_yaxes(title_text="Price ($)", row=1, col=1)
-                fig.update_yaxes(title_text="Volume", row=2, col=1)
+                # Only the chart reruns when its controls change
+                st.fragment(render_chart)(stock_symbol, data)
                 
-                st.plotly_chart(fig, use_container_width=True)
+                with section("recent data"):
+                    st.subheader("Recent Data")
+                    st.dataframe(data.tail(10), use_container_width=True)
                 
-                st.subheader("Recent Data")
-                st.dataframe(data.tail(10), use_container_width=True)
+                st.fragment(render_export)(stock_symbol, data)
                 
     except Exception as e:
         logger.error(f"Error fetching data for {stock_symbol.upper()}: {str(e)}")
@@ -1,137 +1,218 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
-from datetime import datetime, timedelta
-from prophet import Prophet
-from prophet.diagnostics import cross_validation, performance_metrics
-import matplotlib.pyplot as plt
+from datetime import date, timedelta
 import warnings
-from typing import Optional, Tuple
-from utils import MIN_DATA_POINTS, MIN_CV_DATA_POINTS, DAYS_5_YEARS, DEFAULT_FORECAST_DAYS, logger, get_stock_data_cached, generate_data_hash
+from concurrent.futures import Future
+from typing import Any
+from utils import MIN_DATA_POINTS, MIN_CV_DATA_POINTS, DAYS_5_YEARS, DEFAULT_FORECAST_DAYS, MIN_FORECAST_DAYS, MAX_FORECAST_DAYS, logger, get_stock_data_cached, generate_data_hash
+from forecasting import FORECAST_MODES, prepare_prophet_data, train_model, generate_forecast_cached, get_fit_reports, submit_cross_validation, model_config, forecast_model_key
+from tuning import TUNED_PARAMS, get_tuned_params, get_tuning_job, submit_tuning
+from training_service import TrainingQueueFull
+from charts import forecast_figures_cached, cv_residual_figure_cached, figure_from_json
+from exports import EXPORT_FORMATS, export_file_name, export_frame_cached
+from instrumentation import begin_run, section, render_debug_overlay
 from config import get_config
 
 warnings.filterwarnings('ignore')
 
-# Load cache configuration
-cache_config = get_config('cache')
+# Load configuration
+cv_config = get_config('cv')
+forecast_config = get_config('forecast')
 
 st.set_page_config(page_title="Stock Forecast", layout="wide")
 
 st.title("🔮 Stock Price Forecast")
 
-@st.cache_resource(
-    max_entries=cache_config['max_model_entries'], 
-    show_spinner=cache_config['show_cache_spinner']
-)
-def train_prophet_model(symbol: str, data_hash: str, prophet_data: pd.DataFrame) -> Prophet:
+def render_download(symbol: str, dataset: str, frame: pd.DataFrame, label: str, name: str, key: str) -> None:
     """
-    Train and cache Prophet model for stock forecasting.
+    Render a format choice and a download button for a cached frame.
     
     Args:
         symbol: Stock ticker symbol
-        data_hash: Hash of the training data for cache key
-        prophet_data: DataFrame formatted for Prophet
-        
-    Returns:
-        Trained Prophet model
+        dataset: Key identifying the frame's contents
+        frame: Frame to export
+        label: Download button label
+        name: File name without extension
+        key: Widget key prefix
     """
-    logger.info(f"Training Prophet model for {symbol.upper()} (cache miss)")
-    
-    model = Prophet(
-        weekly_seasonality=False,
-        daily_seasonality=False,
-        yearly_seasonality=True
+    export_format = st.radio(
+        "Export Format",
+        list(EXPORT_FORMATS),
+        format_func=lambda fmt: EXPORT_FORMATS[fmt]['label'],
+        horizontal=True,
+        key=f"{key}_format"
+    )
+    # Encoded from the cached frame once per dataset and format
+    st.download_button(
+        label,
+        data=export_frame_cached(symbol, dataset, export_format, frame),
+        file_name=export_file_name(name, export_format),
+        mime=EXPORT_FORMATS[export_format]['mime'],
+        key=f"{key}_download"
     )
-    model.fit(prophet_data)
-    
-    logger.info(f"Prophet model training completed for {symbol.upper()}")
-    return model
 
-@st.cache_data(
-    ttl=cache_config['forecast_ttl_seconds'], 
-    max_entries=cache_config['max_forecast_entries'], 
-    show_spinner=cache_config['show_cache_spinner']
-)
-def generate_forecast_cached(symbol: str, data_hash: str, forecast_days: int) -> pd.DataFrame:
+def render_cross_validation(symbol: str, data_hash: str, model_key: str, cv_job: Future, polling: bool) -> None:
     """
-    Generate cached forecast predictions.
+    Render cross validation results, or a placeholder while they are computed.
     
     Args:
         symbol: Stock ticker symbol
-        data_hash: Hash of the training data
-        forecast_days: Number of days to forecast
-        
-    Returns:
-        DataFrame with forecast predictions
+        data_hash: Content hash of the training data
+        model_key: forecast_model_key of the validated model
+        cv_job: Future returned by submit_cross_validation
+        polling: Whether this fragment is polling for the result
     """
-    logger.info(f"Generating forecast for {symbol.upper()}, {forecast_days} days (cache miss)")
+    begin_run("cv fragment", fragment=True)
+    if not cv_job.done():
+        st.info("⏳ Cross validation is running in the background. Results will appear here when ready.")
+        return
+    if polling:
+        # Rerun once so the section stops polling
+        st.rerun()
+    
+    cv_data = cv_job.result()
+    if cv_data is None:
+        st.error("Cross validation failed. Check the logs for details.")
+        if st.button("🔁 Retry Cross Validation", key="cv_retry_button"):
+            st.session_state.cv_retry = True
+            st.rerun()
+        return
     
-    # Note: This function would need the model and data passed differently
-    # in a real implementation, but for now we'll use it as a placeholder
-    # The actual caching will be handled in the main forecast logic
-    return pd.DataFrame()  # Placeholder
+    cv_results, performance = cv_data
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.write("**Cross Validation Performance**")
+        metrics_display = performance[['horizon', 'mae', 'mape', 'rmse']].round(4)
+        metrics_display.columns = ['Horizon', 'MAE', 'MAPE', 'RMSE']
+        st.dataframe(metrics_display, use_container_width=True)
+    
+    with col2:
+        fig_cv = figure_from_json(cv_residual_figure_cached(symbol, data_hash, model_key, cv_results))
+        st.plotly_chart(fig_cv, use_container_width=True)
+    
+    render_download(symbol, f"cv:{data_hash}:{model_key}", cv_results, "📥 Download CV Results", f"{symbol.upper()}_cv", "cv_export")
 
-def prepare_prophet_data(data: pd.DataFrame) -> pd.DataFrame:
+def render_tuning(tuning_job: Future, polling: bool) -> None:
     """
-    Prepare data for Prophet model by converting to required format.
+    Render hyperparameter search results, or a placeholder while it runs.
     
     Args:
-        data: Raw stock data DataFrame
-        
-    Returns:
-        DataFrame formatted for Prophet (ds, y columns)
+        tuning_job: Future returned by submit_tuning
+        polling: Whether this fragment is polling for the result
     """
-    df = data.reset_index()
-    return pd.DataFrame({
-        'ds': df['Date'].dt.tz_localize(None),
-        'y': df['Close']
-    })
+    begin_run("tuning fragment", fragment=True)
+    if not tuning_job.done():
+        st.info("⏳ Hyperparameter search is running in the background. The model is retrained with the best parameters when it finishes.")
+        return
+    if polling:
+        # Rerun the whole page so the model is retrained with the winning parameters
+        st.rerun(scope="app")
+    
+    try:
+        result = tuning_job.result()
+    except Exception as e:
+        st.warning(f"Hyperparameter search failed: {e}")
+        return
+    
+    st.write(
+        f"**Candidates by {result['metric'].upper()}** "
+        f"({len(result['results'])} candidates, {result['folds']} folds, {result['seconds']:.0f}s)"
+    )
+    results_display = result['results'].round(4)
+    results_display.columns = ['Seasonality Mode', 'Changepoint Prior', 'Seasonality Prior', 'RMSE', 'MAE', 'MAPE']
+    st.dataframe(results_display, use_container_width=True)
 
-def perform_cross_validation(model: Prophet, df: pd.DataFrame) -> Optional[Tuple[pd.DataFrame, pd.DataFrame]]:
+def render_forecast(symbol: str, data_hash: str, data: pd.DataFrame, df_prophet: pd.DataFrame, model: Any, mode: str) -> None:
     """
-    Perform cross validation on Prophet model to assess performance.
+    Render the horizon-dependent sections: metrics, charts and forecast table.
+    
+    Runs as a fragment, so moving the slider only re-executes this function.
     
     Args:
-        model: Fitted Prophet model
-        df: Prophet-formatted DataFrame
-        
-    Returns:
-        Tuple of (cross_validation_results, performance_metrics) or None if insufficient data
+        symbol: Stock ticker symbol
+        data_hash: Content hash of the training data
+        data: Raw stock data DataFrame
+        df_prophet: Prophet-formatted training data
+        model: Fitted model from train_model
+        mode: Forecast mode from FORECAST_MODES
     """
-    if len(df) < MIN_CV_DATA_POINTS:
-        logger.info(f"Insufficient data for cross validation: {len(df)} < {MIN_CV_DATA_POINTS}")
-        return None
+    begin_run("forecast fragment", fragment=True)
+    forecast_days = st.slider("Forecast Days", min_value=MIN_FORECAST_DAYS, max_value=MAX_FORECAST_DAYS, value=DEFAULT_FORECAST_DAYS)
     
-    try:
-        logger.info("Starting cross validation")
-        initial_days = min(365, len(df) // 2)
-        cv_results = cross_validation(
-            model,
-            initial=f'{initial_days} days',
-            period='90 days',
-            horizon='30 days'
+    with section("forecast"):
+        # Predicted once at the maximum horizon and sliced per slider value
+        forecast = generate_forecast_cached(symbol, data_hash, model, forecast_days, mode)
+    
+    with section("metrics"):
+        col1, col2 = st.columns(2)
+        with col1:
+            current_price = data['Close'].iloc[-1]
+            st.metric("Current Price", f"${current_price:.2f}")
+        with col2:
+            predicted_price = forecast['yhat'].iloc[-1]
+            price_change = predicted_price - current_price
+            change_pct = (price_change / current_price) * 100
+            st.metric(
+                f"Predicted Price ({forecast_days}d)", 
+                f"${predicted_price:.2f}",
+                f"{price_change:+.2f} ({change_pct:+.1f}%)"
+            )
+    
+    with section("charts"):
+        # Charts are built once per (data, horizon) and cached as JSON
+        forecast_json, components_json = forecast_figures_cached(
+            symbol, data_hash, forecast_days, mode, forecast_model_key(model, mode), df_prophet, forecast
+        )
+        st.plotly_chart(figure_from_json(forecast_json), use_container_width=True)
+        
+        st.subheader("Forecast Components")
+        st.plotly_chart(figure_from_json(components_json), use_container_width=True)
+    
+    with section("forecast table"):
+        st.subheader("Forecast Data")
+        forecast_display = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].tail(forecast_days).copy()
+        forecast_display.columns = ['Date', 'Forecast', 'Lower Bound', 'Upper Bound']
+        forecast_display['Date'] = forecast_display['Date'].dt.date
+        for col in ['Forecast', 'Lower Bound', 'Upper Bound']:
+            forecast_display[col] = forecast_display[col].round(2)
+        st.dataframe(forecast_display, use_container_width=True)
+    
+    with section("forecast export"):
+        # The full frame: history fit, forecast, intervals and components
+        render_download(
+            symbol, f"forecast:{data_hash}:{mode}:{forecast_model_key(model, mode)}:{forecast_days}", forecast,
+            "📥 Download Forecast", f"{symbol.upper()}_forecast_{mode}_{forecast_days}d", "forecast_export"
         )
-        performance = performance_metrics(cv_results)
-        logger.info("Cross validation completed successfully")
-        return cv_results, performance
-    except Exception as e:
-        logger.error(f"Cross validation failed: {str(e)}")
-        st.warning(f"Cross validation failed: {str(e)}")
-        return None
 
 # Initialize session state
 stock_symbol = st.session_state.get('stock_symbol', '')
-start_date = st.session_state.get('start_date', datetime.now() - timedelta(days=DAYS_5_YEARS))
-end_date = st.session_state.get('end_date', datetime.now())
+start_date = st.session_state.get('start_date', date.today() - timedelta(days=DAYS_5_YEARS))
+end_date = st.session_state.get('end_date', date.today())
 
+begin_run("forecast page")
+render_debug_overlay()
+
+modes = list(FORECAST_MODES)
 with st.sidebar:
     st.header("Forecast Settings")
-    forecast_days = st.slider("Forecast Days", min_value=7, max_value=90, value=DEFAULT_FORECAST_DAYS)
+    forecast_mode = st.radio(
+        "Forecast Mode",
+        modes,
+        index=modes.index(forecast_config['default_mode']) if forecast_config['default_mode'] in modes else 0,
+        format_func=lambda mode: f"{mode.capitalize()} ({FORECAST_MODES[mode]})",
+        help="Fast reuses the accurate Prophet fit but skips uncertainty sampling; baseline is a sub-second exponential smoothing model"
+    )
+    tune_clicked = forecast_mode != 'baseline' and st.button(
+        "🎯 Tune Hyperparameters",
+        help="Search seasonality mode and prior scales on the cross validation folds and retrain with the best combination"
+    )
 
 if stock_symbol:
     with st.spinner(f"Fetching data and generating forecast for {stock_symbol.upper()}..."):
-        # Use cached data fetching
-        data = get_stock_data_cached(stock_symbol, start_date, end_date)
+        with section("data"):
+            # Use cached data fetching
+            data = get_stock_data_cached(stock_symbol, start_date, end_date)
         
         if data is None:
             st.error(f"No data found for symbol '{stock_symbol.upper()}'. Please check the ticker symbol.")
@@ -139,81 +220,60 @@ if stock_symbol:
             st.error(f"Insufficient data for forecasting. Please select a longer date range (at least {MIN_DATA_POINTS} days).")
         else:
             try:
-                df_prophet = prepare_prophet_data(data)
-                data_hash = generate_data_hash(data)
-                
-                # Use cached model training
-                model = train_prophet_model(stock_symbol, data_hash, df_prophet)
-                
-                future = model.make_future_dataframe(periods=forecast_days)
-                forecast = model.predict(future)
-                
-                # Display metrics
-                col1, col2 = st.columns(2)
-                with col1:
-                    current_price = data['Close'].iloc[-1]
-                    st.metric("Current Price", f"${current_price:.2f}")
-                with col2:
-                    predicted_price = forecast['yhat'].iloc[-1]
-                    price_change = predicted_price - current_price
-                    change_pct = (price_change / current_price) * 100
-                    st.metric(
-                        f"Predicted Price ({forecast_days}d)", 
-                        f"${predicted_price:.2f}",
-                        f"{price_change:+.2f} ({change_pct:+.1f}%)"
+                with section("model"):
+                    df_prophet = prepare_prophet_data(data)
+                    data_hash = generate_data_hash(data)
+                    
+                    # Use cached model training
+                    model = train_model(stock_symbol, data_hash, df_prophet, forecast_mode)
+                fit_report = next((r for r in reversed(get_fit_reports()) if r['data_hash'] == data_hash), None)
+                if fit_report is not None and forecast_mode != 'baseline':
+                    st.caption(
+                        f"Model fitted in {fit_report['fit_seconds']:.2f}s "
+                        f"({'warm' if fit_report['warm_start'] else 'cold'} start, "
+                        f"{fit_report['iterations'] or 'unknown'} iterations)"
                     )
+                if forecast_mode != 'baseline':
+                    params = model_config(model)
+                    source = "tuned" if get_tuned_params(stock_symbol, data_hash) == params else "default"
+                    st.caption(f"Parameters ({source}): " + ", ".join(f"{name}={params[name]}" for name in TUNED_PARAMS))
                 
-                # Main forecast plot
-                fig = model.plot(forecast)
-                fig.suptitle(f'{stock_symbol.upper()} Stock Price Forecast', fontsize=16)
-                st.pyplot(fig)
-                
-                st.subheader("Forecast Components")
-                fig_components = model.plot_components(forecast)
-                st.pyplot(fig_components)
+                # Only the horizon-dependent sections rerun when the slider moves
+                st.fragment(render_forecast)(stock_symbol, data_hash, data, df_prophet, model, forecast_mode)
                 
                 # Cross validation analysis
                 st.subheader("Cross Validation Analysis")
-                cv_data = perform_cross_validation(model, df_prophet)
-                
-                if cv_data is not None:
-                    cv_results, performance = cv_data
-                    
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.write("**Cross Validation Performance**")
-                        metrics_display = performance[['horizon', 'mae', 'mape', 'rmse']].round(4)
-                        metrics_display.columns = ['Horizon', 'MAE', 'MAPE', 'RMSE']
-                        st.dataframe(metrics_display, use_container_width=True)
-                    
-                    with col2:
-                        fig_cv, ax = plt.subplots(figsize=(10, 6))
-                        cv_results_plot = cv_results.copy()
-                        cv_results_plot['residual'] = cv_results_plot['y'] - cv_results_plot['yhat']
-                        
-                        ax.scatter(cv_results_plot['ds'], cv_results_plot['residual'], 
-                                 alpha=0.6, s=30, color='blue')
-                        ax.axhline(y=0, color='red', linestyle='--', alpha=0.7)
-                        ax.set_xlabel('Date')
-                        ax.set_ylabel('Residual (Actual - Predicted)')
-                        ax.set_title('Cross Validation Residuals')
-                        ax.grid(True, alpha=0.3)
-                        plt.xticks(rotation=45)
-                        plt.tight_layout()
-                        st.pyplot(fig_cv)
-                        plt.close()
-                else:
+                if forecast_mode == 'baseline':
+                    st.info("Cross validation evaluates the Prophet model. Switch to the accurate or fast mode to run it.")
+                elif len(df_prophet) < MIN_CV_DATA_POINTS:
                     st.info(f"Cross validation requires at least {MIN_CV_DATA_POINTS} days of data for reliable results.")
+                else:
+                    with section("cv"):
+                        # Runs in the background so the rest of the page renders right away
+                        cv_job = submit_cross_validation(
+                            stock_symbol, data_hash, model, df_prophet, retry=st.session_state.pop('cv_retry', False)
+                        )
+                        poll_seconds = None if cv_job.done() else cv_config['poll_seconds']
+                        st.fragment(run_every=poll_seconds)(render_cross_validation)(
+                            stock_symbol, data_hash, forecast_model_key(model, forecast_mode), cv_job, poll_seconds is not None
+                        )
                 
-                # Forecast data table
-                st.subheader("Forecast Data")
-                forecast_display = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].tail(forecast_days).copy()
-                forecast_display.columns = ['Date', 'Forecast', 'Lower Bound', 'Upper Bound']
-                forecast_display['Date'] = forecast_display['Date'].dt.date
-                for col in ['Forecast', 'Lower Bound', 'Upper Bound']:
-                    forecast_display[col] = forecast_display[col].round(2)
-                st.dataframe(forecast_display, use_container_width=True)
+                # Hyperparameter search, started from the sidebar
+                if forecast_mode != 'baseline':
+                    tuning_job = get_tuning_job(stock_symbol, data_hash)
+                    if tune_clicked and len(df_prophet) < MIN_CV_DATA_POINTS:
+                        st.warning(f"Hyperparameter tuning requires at least {MIN_CV_DATA_POINTS} days of data.")
+                    elif tune_clicked:
+                        tuning_job = submit_tuning(stock_symbol, data_hash, df_prophet)
+                    if tuning_job is not None:
+                        st.subheader("Hyperparameter Tuning")
+                        with section("tuning"):
+                            poll_seconds = None if tuning_job.done() else cv_config['poll_seconds']
+                            st.fragment(run_every=poll_seconds)(render_tuning)(tuning_job, poll_seconds is not None)
                 
+            except (TrainingQueueFull, TimeoutError):
+                logger.warning(f"Training service busy while forecasting {stock_symbol.upper()}")
+                st.warning("The forecasting service is busy. Please try again in a moment.")
             except Exception as e:
                 st.error(f"Error generating forecast: {str(e)}")
                 st.info(f"Make sure you have enough historical data (at least {MIN_DATA_POINTS} days) for accurate forecasting.")
@@ -235,5 +295,14 @@ else:
         - Weekly seasonality: Disabled (markets closed on weekends)
         - Yearly seasonality: Enabled (captures annual patterns)
         
+        ### Forecast Modes
+        - **Accurate**: Prophet intervals from 1000 Monte Carlo samples
+        - **Fast**: The same Prophet fit with analytic intervals (residual noise plus expected trend changes), no sampling
+        - **Baseline**: Damped-trend exponential smoothing in NumPy, for sub-second forecasts and comparison
+        
+        ### Hyperparameter Tuning
+        **🎯 Tune Hyperparameters** scores seasonality mode and prior scale combinations on the cross validation
+        folds in parallel. The best combination is remembered for the symbol and used for every later forecast.
+        
         **⚠️ Important**: Forecasts are for educational purposes only and should not be used for investment decisions.
         """)
\ No newline at end of file
@@ -0,0 +1,125 @@
+import streamlit as st
+import pandas as pd
+from datetime import date, timedelta
+from utils import DAYS_5_YEARS, format_market_cap, format_volume_dollars, logger, parse_symbols, get_stock_data_cached, get_watchlist_data_cached
+from exports import EXPORT_FORMATS, new_export_path, read_export, stream_symbols
+from config import get_config
+
+watchlist_config = get_config('watchlist')
+
+st.set_page_config(page_title="Watchlist", layout="wide")
+
+st.title("📋 Watchlist")
+
+SORT_COLUMNS = {
+    "Symbol": "Symbol",
+    "Price": "Price",
+    "Daily Change %": "Change %",
+    "Volume ($)": "Volume $",
+    "Market Cap": "Market Cap"
+}
+
+def render_export(symbols: list) -> None:
+    """
+    Render the streamed OHLCV export of all watchlist symbols.
+    
+    History for the Home page date range is fetched and written one symbol
+    at a time, so the export never holds every symbol's frame at once.
+    
+    Args:
+        symbols: Upper-case ticker symbols
+    """
+    start_date = st.session_state.get('start_date', date.today() - timedelta(days=DAYS_5_YEARS))
+    end_date = st.session_state.get('end_date', date.today())
+    export_format = st.radio(
+        "Export Format",
+        list(EXPORT_FORMATS),
+        format_func=lambda fmt: EXPORT_FORMATS[fmt]['label'],
+        horizontal=True,
+        key="watchlist_export_format"
+    )
+    export_key = (tuple(symbols), start_date, end_date, export_format)
+    st.caption(f"Daily OHLCV from {start_date} to {end_date} (set on the Home page), one row per symbol and day.")
+    
+    if st.button(f"Prepare Export ({len(symbols)} symbols)"):
+        path = new_export_path('watchlist', export_format)
+        progress = st.progress(0.0, text="Writing history...")
+        failed = []
+        fetch = lambda symbol: get_stock_data_cached(symbol, start_date, end_date)
+        for done, (symbol, error) in enumerate(stream_symbols(symbols, fetch, export_format, path), start=1):
+            if error is not None:
+                failed.append(symbol)
+            progress.progress(done / len(symbols), text=f"Wrote {done} of {len(symbols)} symbols ({symbol})")
+        progress.empty()
+        if len(failed) == len(symbols):
+            st.warning("None of the symbols had data, so there is nothing to export.")
+            st.session_state.pop('watchlist_export', None)
+        else:
+            if failed:
+                st.warning(f"Not exported: {', '.join(failed)}")
+            st.session_state.watchlist_export = {'key': export_key, 'path': path}
+    
+    export = st.session_state.get('watchlist_export')
+    if export is not None and export['key'] == export_key:
+        contents = read_export(export['path'])
+        if contents is None:
+            st.info("The export expired. Prepare it again.")
+        else:
+            st.download_button(
+                "📥 Download History",
+                data=contents,
+                file_name=f"watchlist_{start_date:%Y%m%d}_{end_date:%Y%m%d}.{EXPORT_FORMATS[export_format]['extension']}",
+                mime=EXPORT_FORMATS[export_format]['mime']
+            )
+
+if 'watchlist' not in st.session_state:
+    st.session_state.watchlist = st.session_state.get('stock_symbol', '')
+
+with st.sidebar:
+    st.header("Watchlist Settings")
+    watchlist_text = st.text_area(
+        "Symbols",
+        value=st.session_state.watchlist,
+        placeholder="AAPL, MSFT, GOOGL ...",
+        help=f"Separate symbols with commas, spaces or new lines (max {watchlist_config['max_symbols']})"
+    )
+    st.session_state.watchlist = watchlist_text
+
+    sort_by = st.selectbox("Sort By", list(SORT_COLUMNS), index=2)
+    ascending = st.toggle("Ascending", value=False)
+
+symbols = parse_symbols(watchlist_text)
+
+if len(symbols) > watchlist_config['max_symbols']:
+    st.warning(f"Only the first {watchlist_config['max_symbols']} symbols are loaded.")
+    symbols = symbols[:watchlist_config['max_symbols']]
+
+if symbols:
+    try:
+        with st.spinner(f"Fetching data for {len(symbols)} symbols..."):
+            summary = get_watchlist_data_cached(tuple(symbols), date.today())
+
+        missing = sorted(set(symbols) - set(summary['Symbol'] if not summary.empty else []))
+        if missing:
+            st.warning(f"No data found for: {', '.join(missing)}")
+
+        if not summary.empty:
+            summary = summary.sort_values(SORT_COLUMNS[sort_by], ascending=ascending, na_position='last')
+
+            display = pd.DataFrame({
+                'Symbol': summary['Symbol'],
+                'Price': summary['Price'].map(lambda price: f"${price:.2f}"),
+                'Daily Change': summary['Change'].map(lambda change: f"${change:+.2f}"),
+                'Daily Change %': summary['Change %'].map(lambda pct: f"{pct:+.2f}%"),
+                'Volume ($)': [format_volume_dollars(volume, price) for volume, price in zip(summary['Volume'], summary['Price'])],
+                'Market Cap': summary['Market Cap'].map(lambda cap: format_market_cap(None if pd.isna(cap) else cap))
+            })
+            st.dataframe(display, use_container_width=True, hide_index=True)
+        
+        with st.expander("📥 Export History"):
+            render_export(symbols)
+    except Exception as e:
+        logger.error(f"Error fetching watchlist data: {str(e)}")
+        st.error("Error fetching watchlist data. Please try again.")
+else:
+    st.info("Enter one or more stock symbols to build a watchlist")
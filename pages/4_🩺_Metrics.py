@@ -0,0 +1,86 @@
+import streamlit as st
+import pandas as pd
+from instrumentation import begin_run, render_debug_overlay, stage_stats, prometheus_text
+from model_registry import get_stats
+from memory_cache import cache_stats
+from config import get_config
+
+metrics_config = get_config('metrics')
+
+st.set_page_config(page_title="Metrics", layout="wide")
+
+st.title("🩺 Metrics")
+
+begin_run("metrics page")
+render_debug_overlay()
+
+with st.sidebar:
+    st.header("Metrics Controls")
+    if st.button("🔄 Refresh"):
+        st.rerun()
+    if st.button("🧹 Reset Stage Metrics"):
+        stage_stats.reset()
+        st.rerun()
+
+rows = stage_stats.summary()
+
+if not rows:
+    st.info("No stages recorded yet. Use the other pages and come back here.")
+else:
+    stages = pd.DataFrame(rows)
+    cached = stages[stages['hit_ratio'].notna()]
+    lookups = cached['hits'].sum() + cached['misses'].sum()
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Traced Calls", f"{stages['calls'].sum():,}")
+    with col2:
+        st.metric("Overall Cache Hit Ratio", f"{cached['hits'].sum() / lookups:.1%}" if lookups else "N/A")
+    with col3:
+        st.metric("Total Time in Stages", f"{stages['seconds_total'].sum():.1f}s")
+
+    st.subheader("Stages")
+    st.caption(f"Percentiles over the last {metrics_config['max_samples']} calls per stage; counters since process start")
+    display = pd.DataFrame({
+        'Stage': stages['stage'],
+        'Calls': stages['calls'],
+        'Hit Ratio': stages['hit_ratio'].map(lambda ratio: "" if pd.isna(ratio) else f"{ratio:.1%}"),
+        'Misses': stages['misses'],
+        'p50 (ms)': (stages['p50'] * 1000).round(1),
+        'p95 (ms)': (stages['p95'] * 1000).round(1),
+        'p99 (ms)': (stages['p99'] * 1000).round(1),
+        'Total (s)': stages['seconds_total'].round(2),
+        'Mean RSS Δ (MB)': (stages['memory_delta_mean'] / 1024 / 1024).round(2)
+    })
+    st.dataframe(display, use_container_width=True, hide_index=True)
+
+st.subheader("Memory Caches")
+caches = pd.DataFrame(cache_stats())
+if not caches.empty:
+    st.dataframe(pd.DataFrame({
+        'Cache': caches['name'],
+        'Entries': caches['entries'],
+        'Size (MB)': (caches['bytes'] / 1024 / 1024).round(1),
+        'Budget (MB)': (caches['max_bytes'] / 1024 / 1024).round(1),
+        'Used': (caches['bytes'] / caches['max_bytes']).map(lambda used: f"{used:.0%}"),
+        'Evictions': caches['evictions']
+    }), use_container_width=True, hide_index=True)
+
+st.subheader("Model Registry")
+registry = get_stats()
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric("Hits", registry.get('hits', 0))
+with col2:
+    st.metric("Misses", registry.get('misses', 0))
+with col3:
+    st.metric("Evictions", registry.get('evictions', 0))
+
+with st.expander("Prometheus Export"):
+    if metrics_config['port']:
+        st.write(f"Served at `http://<host>:{metrics_config['port']}/metrics`")
+    if metrics_config['textfile_path']:
+        st.write(f"Written to `{metrics_config['textfile_path']}` every {metrics_config['textfile_interval_seconds']}s")
+    metrics_text = prometheus_text()
+    st.download_button("Download metrics.prom", metrics_text, file_name="metrics.prom", mime="text/plain")
+    st.code(metrics_text, language="text")
@@ -0,0 +1,177 @@
+import streamlit as st
+import pandas as pd
+from datetime import date, timedelta
+from utils import DAYS_5_YEARS, DEFAULT_FORECAST_DAYS, MIN_FORECAST_DAYS, MAX_FORECAST_DAYS, logger, parse_symbols
+from batch_forecast import load_forecast, run_batch
+from exports import EXPORT_FORMATS, new_export_path, read_export, stream_symbols
+from forecasting import FORECAST_MODES
+from instrumentation import begin_run, section, render_debug_overlay
+from config import get_config
+
+batch_config = get_config('batch')
+forecast_config = get_config('forecast')
+
+st.set_page_config(page_title="Batch Forecast", layout="wide")
+
+st.title("🏆 Batch Forecast")
+
+RANK_COLUMNS = {
+    "Predicted Change %": "Change %",
+    "Interval Width %": "Interval Width %",
+    "Symbol": "Symbol"
+}
+
+def format_results(rows: list, rank_by: str, ascending: bool) -> pd.DataFrame:
+    """
+    Rank forecast rows and format them for display.
+
+    Args:
+        rows: Successful rows from run_batch
+        rank_by: Display name from RANK_COLUMNS
+        ascending: Sort order
+
+    Returns:
+        Display DataFrame
+    """
+    results = pd.DataFrame(rows).sort_values(RANK_COLUMNS[rank_by], ascending=ascending, na_position='last')
+    return pd.DataFrame({
+        'Symbol': results['Symbol'],
+        'Price': results['Price'].map(lambda price: f"${price:.2f}"),
+        'Forecast': results['Forecast'].map(lambda price: f"${price:.2f}"),
+        'Predicted Change %': results['Change %'].map(lambda pct: f"{pct:+.2f}%"),
+        'Range': [f"${lower:.2f} - ${upper:.2f}" for lower, upper in zip(results['Lower'], results['Upper'])],
+        'Interval Width %': results['Interval Width %'].map(lambda pct: "N/A" if pd.isna(pct) else f"{pct:.1f}%"),
+        'Time (s)': results['Seconds'].round(2)
+    })
+
+def render_export(results: dict) -> None:
+    """
+    Render the streamed export of the full forecast frames of a batch.
+    
+    Forecasts come from the caches the batch filled and are written to the
+    file one symbol at a time.
+    
+    Args:
+        results: Batch results from session state
+    """
+    _, forecast_days, mode, start, end = results['key']
+    exported = [row['Symbol'] for row in results['rows']]
+    export_format = st.radio(
+        "Export Format",
+        list(EXPORT_FORMATS),
+        format_func=lambda fmt: EXPORT_FORMATS[fmt]['label'],
+        horizontal=True,
+        key="batch_export_format"
+    )
+    export_key = (results['key'], export_format)
+    
+    if st.button(f"Prepare Export ({len(exported)} symbols)"):
+        path = new_export_path('batch_forecast', export_format)
+        progress = st.progress(0.0, text="Writing forecasts...")
+        failed = []
+        with section("export"):
+            fetch = lambda symbol: load_forecast(symbol, start, end, forecast_days, mode)[1]
+            for done, (symbol, error) in enumerate(stream_symbols(exported, fetch, export_format, path), start=1):
+                if error is not None:
+                    failed.append(symbol)
+                progress.progress(done / len(exported), text=f"Wrote {done} of {len(exported)} symbols ({symbol})")
+        progress.empty()
+        if len(failed) == len(exported):
+            st.warning("None of the symbols had data, so there is nothing to export.")
+            st.session_state.pop('batch_export', None)
+        else:
+            if failed:
+                st.warning(f"Not exported: {', '.join(failed)}")
+            st.session_state.batch_export = {'key': export_key, 'path': path}
+    
+    export = st.session_state.get('batch_export')
+    if export is not None and export['key'] == export_key:
+        contents = read_export(export['path'])
+        if contents is None:
+            st.info("The export expired. Prepare it again.")
+        else:
+            st.download_button(
+                "📥 Download Forecasts",
+                data=contents,
+                file_name=f"batch_forecast_{mode}_{forecast_days}d.{EXPORT_FORMATS[export_format]['extension']}",
+                mime=EXPORT_FORMATS[export_format]['mime']
+            )
+
+begin_run("batch forecast page")
+render_debug_overlay()
+
+start_date = st.session_state.get('start_date', date.today() - timedelta(days=DAYS_5_YEARS))
+end_date = st.session_state.get('end_date', date.today())
+
+if 'batch_symbols' not in st.session_state:
+    st.session_state.batch_symbols = st.session_state.get('watchlist', '')
+
+with st.sidebar:
+    st.header("Batch Settings")
+    symbols_text = st.text_area(
+        "Symbols",
+        value=st.session_state.batch_symbols,
+        placeholder="AAPL, MSFT, GOOGL ...",
+        help=f"Separate symbols with commas, spaces or new lines (max {batch_config['max_symbols']})"
+    )
+    st.session_state.batch_symbols = symbols_text
+
+    forecast_days = st.slider("Forecast Days", min_value=MIN_FORECAST_DAYS, max_value=MAX_FORECAST_DAYS, value=DEFAULT_FORECAST_DAYS)
+    modes = list(FORECAST_MODES)
+    forecast_mode = st.selectbox(
+        "Forecast Mode",
+        modes,
+        index=modes.index(forecast_config['default_mode']) if forecast_config['default_mode'] in modes else 0,
+        format_func=lambda mode: f"{mode.capitalize()} ({FORECAST_MODES[mode]})",
+        help="Fast skips Prophet's uncertainty sampling; baseline forecasts large universes in well under a second per symbol"
+    )
+    rank_by = st.selectbox("Rank By", list(RANK_COLUMNS))
+    ascending = st.toggle("Ascending", value=rank_by == "Interval Width %")
+    run_clicked = st.button("🚀 Run Forecasts", type="primary")
+
+symbols = parse_symbols(symbols_text)
+if len(symbols) > batch_config['max_symbols']:
+    st.warning(f"Only the first {batch_config['max_symbols']} symbols are forecast.")
+    symbols = symbols[:batch_config['max_symbols']]
+
+st.caption(f"Training data from {start_date} to {end_date} (set on the Home page). Models already fitted for the same data are reused.")
+
+batch_key = (tuple(symbols), forecast_days, forecast_mode, start_date, end_date)
+previous = st.session_state.get('batch_results')
+
+if not symbols:
+    st.info("Enter symbols in the sidebar, then run the batch to rank them by predicted change and interval width")
+elif run_clicked:
+    rows, errors = [], []
+    progress = st.progress(0.0, text=f"Forecasting {len(symbols)} symbols...")
+    table = st.empty()
+
+    with section("batch"):
+        # Rows stream into the table as each symbol finishes
+        for done, row in enumerate(run_batch(symbols, start_date, end_date, forecast_days, forecast_mode), start=1):
+            if 'Error' in row:
+                errors.append(row)
+            else:
+                rows.append(row)
+                table.dataframe(format_results(rows, rank_by, ascending), use_container_width=True, hide_index=True)
+            progress.progress(done / len(symbols), text=f"Forecast {done} of {len(symbols)} symbols ({row['Symbol']})")
+
+    progress.empty()
+    logger.info(f"Batch forecast finished: {len(rows)} succeeded, {len(errors)} failed")
+    st.session_state.batch_results = {'key': batch_key, 'rows': rows, 'errors': errors}
+    previous = st.session_state.batch_results
+    table.empty()
+
+if symbols and previous is not None:
+    if previous['key'] != batch_key:
+        st.info("Settings changed since the last run. Showing the previous results; run the batch again to update them.")
+    if previous['rows']:
+        st.dataframe(format_results(previous['rows'], rank_by, ascending), use_container_width=True, hide_index=True)
+    if previous['errors']:
+        with st.expander(f"⚠️ {len(previous['errors'])} symbols could not be forecast"):
+            st.dataframe(pd.DataFrame(previous['errors']), use_container_width=True, hide_index=True)
+    if previous['rows']:
+        with st.expander("📥 Export Forecasts"):
+            render_export(previous)
+elif symbols and not run_clicked:
+    st.info(f"Click **Run Forecasts** to forecast {len(symbols)} symbols")
@@ -0,0 +1,481 @@
+"""
+Market data providers.
+
+All market data goes through ``provider``, selected by MARKET_DATA_PROVIDER:
+
+- ``yfinance`` (default): Yahoo Finance over one shared, pooled HTTP session,
+  with the configured timeout and retries with jittered exponential backoff.
+- ``local``: Parquet or CSV files in LOCAL_DATA_DIR (``<SYMBOL>.parquet`` or
+  ``<SYMBOL>.csv`` with a Date index, plus an optional ``<SYMBOL>.json`` with
+  company fields), for offline runs and capacity testing. Files recorded with
+  ``python -m benchmarks.record_fixtures`` can be used as they are.
+"""
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+import pandas as pd
+from config import get_config
+
+logger = logging.getLogger(__name__)
+
+api_config = get_config('api')
+
+# Exchange time zone used for bars from local files
+MARKET_TZ = 'America/New_York'
+
+# Columns yfinance.download returns with auto_adjust=True
+DOWNLOAD_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+class SymbolNotFound(LookupError):
+    """Raised when the provider reports that a symbol does not exist."""
+
+class MarketDataProvider:
+    """Interface shared by all market data backends."""
+
+    name = 'base'
+
+    def history(self, symbol: str, start, end) -> pd.DataFrame:
+        """
+        Get daily bars for [start, end).
+
+        Args:
+            symbol: Upper-case stock ticker symbol
+            start: First date to fetch
+            end: First date not to fetch
+
+        Returns:
+            DataFrame shaped like yfinance's Ticker.history output (may be empty)
+        """
+        raise NotImplementedError
+
+    def info(self, symbol: str) -> dict:
+        """
+        Get company information fields.
+
+        Args:
+            symbol: Upper-case stock ticker symbol
+
+        Returns:
+            Dictionary of yfinance-style info fields
+
+        Raises:
+            SymbolNotFound: If the provider reports the symbol does not exist
+        """
+        raise NotImplementedError
+
+    def quote(self, symbol: str, fields: tuple) -> dict:
+        """
+        Get fast-changing quote fields.
+
+        Args:
+            symbol: Upper-case stock ticker symbol
+            fields: fast_info field names to return
+
+        Returns:
+            Dictionary with every requested field (None when unavailable)
+        """
+        raise NotImplementedError
+
+    def download(self, symbols: List[str], start, end) -> pd.DataFrame:
+        """
+        Get adjusted daily bars for many symbols in one request.
+
+        Args:
+            symbols: Upper-case ticker symbols
+            start: First date to fetch
+            end: First date not to fetch
+
+        Returns:
+            DataFrame with (symbol, field) column MultiIndex
+        """
+        raise NotImplementedError
+
+def _create_session(pool_size: int):
+    """
+    Create the HTTP session shared by all yfinance requests.
+
+    yfinance requires a curl_cffi session when curl_cffi is installed (it
+    reuses connections internally); otherwise a requests session with a
+    connection pool of ``pool_size`` is used.
+
+    Args:
+        pool_size: Connections kept open per host
+
+    Returns:
+        Session object accepted by yfinance
+    """
+    try:
+        from curl_cffi import requests as curl_requests
+        return curl_requests.Session(impersonate='chrome')
+    except ImportError:
+        import requests
+        from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+def _is_retryable(error: Exception) -> bool:
+    """
+    Check whether a failed request is worth retrying.
+
+    Rate limiting and network errors are transient; unknown symbols and
+    malformed responses are not.
+
+    Args:
+        error: Exception raised by the request
+
+    Returns:
+        True if the request should be retried
+    """
+    try:
+        from yfinance.exceptions import YFException, YFRateLimitError
+    except ImportError:  # Older yfinance releases have no exception hierarchy
+        YFException = YFRateLimitError = ()
+
+    if isinstance(error, YFRateLimitError):
+        return True
+    return not isinstance(error, (YFException, KeyError, ValueError))
+
+def _is_not_found(error: Exception) -> bool:
+    """
+    Check whether a failed request means the symbol does not exist.
+
+    Only an explicit signal counts: yfinance's missing ticker error or an
+    HTTP 404; anything else may be transient.
+
+    Args:
+        error: Exception raised by the request
+
+    Returns:
+        True if the symbol is unknown to the provider
+    """
+    try:
+        from yfinance.exceptions import YFTickerMissingError
+    except ImportError:  # Older yfinance releases have no exception hierarchy
+        YFTickerMissingError = ()
+
+    if isinstance(error, YFTickerMissingError):
+        return True
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None) == 404
+
+class YFinanceProvider(MarketDataProvider):
+    """
+    Yahoo Finance backend with a pooled session, timeout and retry policy.
+
+    yfinance and the HTTP session are loaded on the first request, so pages
+    that only read cached data never pay for importing them.
+    """
+
+    name = 'yfinance'
+
+    def __init__(self, timeout: int, max_retries: int, retry_delay: float, pool_size: int):
+        """
+        Args:
+            timeout: Request timeout in seconds
+            max_retries: Retries after the first failed attempt
+            retry_delay: Base delay in seconds, doubled on every retry
+            pool_size: Connections kept open per host
+        """
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.pool_size = pool_size
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """Shared HTTP session, created on first use."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = _create_session(self.pool_size)
+        return self._session
+
+    def _call(self, description: str, func: Callable[[], Any]) -> Any:
+        """
+        Run a request, retrying transient failures with jittered backoff.
+
+        Args:
+            description: Request description for log messages
+            func: Zero-argument callable performing the request
+
+        Returns:
+            Result of func
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                return func()
+            except Exception as e:
+                if attempt == self.max_retries or not _is_retryable(e):
+                    raise
+                # Jitter spreads out retries from concurrent sessions
+                delay = self.retry_delay * 2 ** attempt * random.uniform(0.5, 1.5)
+                logger.warning(f"{description} failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _ticker(self, symbol: str):
+        """
+        Create a yfinance Ticker on the shared session.
+
+        Args:
+            symbol: Upper-case stock ticker symbol
+
+        Returns:
+            yfinance Ticker
+        """
+        import yfinance as yf
+
+        return yf.Ticker(symbol, session=self.session)
+
+    def history(self, symbol: str, start, end) -> pd.DataFrame:
+        """
+        Get daily bars for [start, end) from Ticker.history.
+
+        Args:
+            symbol: Upper-case stock ticker symbol
+            start: First date to fetch
+            end: First date not to fetch
+
+        Returns:
+            Ticker.history output (may be empty)
+        """
+        return self._call(
+            f"History request for {symbol}",
+            lambda: self._ticker(symbol).history(start=start, end=end, timeout=self.timeout)
+        )
+
+    def info(self, symbol: str) -> dict:
+        """
+        Get company information fields from Ticker.info.
+
+        Args:
+            symbol: Upper-case stock ticker symbol
+
+        Returns:
+            Dictionary of info fields
+
+        Raises:
+            SymbolNotFound: If the response is empty, or Yahoo reports the
+                ticker missing or returns 404
+        """
+        try:
+            info = self._call(f"Info request for {symbol}", lambda: self._ticker(symbol).info)
+        except Exception as e:
+            if _is_not_found(e):
+                raise SymbolNotFound(symbol) from e
+            raise
+        if not info:
+            raise SymbolNotFound(symbol)
+        return info
+
+    def quote(self, symbol: str, fields: tuple) -> dict:
+        """
+        Get quote fields from Ticker.fast_info.
+
+        fast_info fetches lazily when a field is read, so the reads happen
+        inside the retried request; only fields fast_info does not provide
+        become None.
+
+        Args:
+            symbol: Upper-case stock ticker symbol
+            fields: fast_info keys to read
+
+        Returns:
+            Dictionary of field -> value (None if unavailable)
+        """
+        def read_fields() -> dict:
+            fast_info = self._ticker(symbol).fast_info
+            quote = {}
+            for field in fields:
+                try:
+                    quote[field] = fast_info[field]
+                except KeyError:
+                    quote[field] = None
+            return quote
+
+        return self._call(f"Quote request for {symbol}", read_fields)
+
+    def download(self, symbols: List[str], start, end) -> pd.DataFrame:
+        """
+        Get daily bars for many symbols in one yf.download request.
+
+        Args:
+            symbols: Upper-case stock ticker symbols
+            start: First date to fetch
+            end: First date not to fetch
+
+        Returns:
+            yf.download output with (symbol, field) columns (may be empty)
+        """
+        import yfinance as yf
+
+        return self._call(
+            f"Download of {len(symbols)} symbols",
+            lambda: yf.download(
+                symbols,
+                start=start,
+                end=end,
+                group_by='ticker',
+                auto_adjust=True,
+                threads=False,
+                progress=False,
+                timeout=self.timeout,
+                session=self.session
+            )
+        )
+
+class LocalProvider(MarketDataProvider):
+    """Backend reading Parquet or CSV files from a directory."""
+
+    name = 'local'
+
+    def __init__(self, data_dir: str):
+        """
+        Args:
+            data_dir: Directory with <SYMBOL>.parquet/.csv and optional <SYMBOL>.json files
+        """
+        self.data_dir = data_dir
+
+    def _load(self, symbol: str) -> Optional[pd.DataFrame]:
+        """
+        Read the full history file for a symbol.
+
+        Args:
+            symbol: Upper-case stock ticker symbol
+
+        Returns:
+            History with a sorted, exchange-local DatetimeIndex, or None if no file exists
+        """
+        base = os.path.join(self.data_dir, symbol)
+        if os.path.exists(f"{base}.parquet"):
+            data = pd.read_parquet(f"{base}.parquet")
+        elif os.path.exists(f"{base}.csv"):
+            data = pd.read_csv(f"{base}.csv", index_col=0)
+        else:
+            return None
+        # Daily bars: the date part is the trading day, whatever the stored offset
+        data.index = pd.DatetimeIndex(pd.to_datetime(data.index.astype(str).str.slice(0, 10)), name='Date').tz_localize(MARKET_TZ)
+        return data.sort_index()
+
+    def _load_info(self, symbol: str) -> Dict[str, Any]:
+        """
+        Read the company fields file for a symbol.
+
+        Args:
+            symbol: Upper-case stock ticker symbol
+
+        Returns:
+            Info fields, or an empty dictionary if no file exists
+        """
+        path = os.path.join(self.data_dir, f"{symbol}.json")
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def history(self, symbol: str, start, end) -> pd.DataFrame:
+        """
+        Get daily bars for [start, end) from the symbol's file.
+
+        Args:
+            symbol: Upper-case stock ticker symbol
+            start: First date to return
+            end: First date not to return
+
+        Returns:
+            Bars in the range (empty if the symbol has no file)
+        """
+        data = self._load(symbol)
+        if data is None:
+            return pd.DataFrame()
+        lower = data.index.searchsorted(pd.Timestamp(start).tz_localize(MARKET_TZ))
+        upper = data.index.searchsorted(pd.Timestamp(end).tz_localize(MARKET_TZ))
+        return data.iloc[lower:upper].copy()
+
+    def info(self, symbol: str) -> dict:
+        """
+        Get company fields from the symbol's JSON file.
+
+        Args:
+            symbol: Upper-case stock ticker symbol
+
+        Returns:
+            Info fields; just shortName if only a history file exists
+
+        Raises:
+            SymbolNotFound: If the symbol has neither file
+        """
+        info = self._load_info(symbol)
+        if not info and self._load(symbol) is not None:
+            info = {'shortName': symbol}
+        if not info:
+            raise SymbolNotFound(symbol)
+        return info
+
+    def quote(self, symbol: str, fields: tuple) -> dict:
+        """
+        Get quote fields from the JSON file, with prices from the last bars.
+
+        Args:
+            symbol: Upper-case stock ticker symbol
+            fields: Keys to return
+
+        Returns:
+            Dictionary of field -> value (None if unavailable)
+        """
+        data = self._load(symbol)
+        values = dict(self._load_info(symbol))
+        if data is not None and not data.empty:
+            values['lastPrice'] = float(data['Close'].iloc[-1])
+            values['previousClose'] = float(data['Close'].iloc[-2]) if len(data) > 1 else values['lastPrice']
+        return {field: values.get(field) for field in fields}
+
+    def download(self, symbols: List[str], start, end) -> pd.DataFrame:
+        """
+        Get daily bars for many symbols, shaped like yf.download output.
+
+        Args:
+            symbols: Upper-case stock ticker symbols
+            start: First date to return
+            end: First date not to return
+
+        Returns:
+            Bars with (symbol, field) columns; symbols without data are omitted
+        """
+        frames = {}
+        for symbol in symbols:
+            data = self.history(symbol, start, end)
+            if not data.empty:
+                frames[symbol] = data[[col for col in DOWNLOAD_COLUMNS if col in data.columns]]
+        return pd.concat(frames, axis=1) if frames else pd.DataFrame()
+
+def create_provider(name: str) -> MarketDataProvider:
+    """
+    Create the configured market data provider.
+
+    Args:
+        name: Backend name, 'yfinance' or 'local'
+
+    Returns:
+        Provider instance
+    """
+    if name == 'local':
+        return LocalProvider(api_config['local_data_dir'])
+    if name != 'yfinance':
+        raise ValueError(f"Unknown market data provider: {name}")
+    return YFinanceProvider(
+        timeout=api_config['yfinance_timeout'],
+        max_retries=api_config['max_retries'],
+        retry_delay=api_config['retry_delay'],
+        pool_size=api_config['pool_size']
+    )
+
+provider = create_provider(api_config['provider'])
@@ -0,0 +1,255 @@
+"""
+Cache shared by all replicas of the app.
+
+``st.cache_data`` and ``st.cache_resource`` are per process, so every replica
+would refetch the same history and retrain the same models. ``shared_cache``
+sits behind them as a second tier, selected by SHARED_CACHE_BACKEND:
+
+- ``sqlite`` (default): one SQLite file (WAL mode) on the shared DATA_DIR
+  volume; each write is a single transaction, so readers never see partial
+  entries. Suitable for replicas on one host.
+- ``redis``: any Redis-protocol server (Redis, Valkey, a local stand-in),
+  for replicas on several hosts. Needs the optional ``redis`` package.
+- ``none``: disabled.
+
+Values are bytes; DataFrames are stored as compressed Parquet and other
+objects as zlib-compressed JSON. Entries expire after the TTL given on write.
+"""
+import io
+import json
+import logging
+import os
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Optional, Tuple
+import pandas as pd
+from config import get_config
+
+logger = logging.getLogger(__name__)
+
+shared_cache_config = get_config('shared_cache')
+
+# Expired SQLite rows are purged after this many writes
+PURGE_EVERY_WRITES = 200
+
+# Prefix of every Redis key
+REDIS_PREFIX = 'stock_hub'
+
+def dumps_frame(data: pd.DataFrame) -> bytes:
+    """
+    Serialize a DataFrame (index included) to compressed Parquet.
+
+    Args:
+        data: DataFrame to serialize
+
+    Returns:
+        Parquet bytes
+    """
+    buffer = io.BytesIO()
+    data.to_parquet(buffer, compression='zstd')
+    return buffer.getvalue()
+
+def loads_frame(value: bytes) -> pd.DataFrame:
+    """
+    Restore a DataFrame serialized with dumps_frame.
+
+    Args:
+        value: Parquet bytes
+
+    Returns:
+        DataFrame
+    """
+    return pd.read_parquet(io.BytesIO(value))
+
+def dumps_json(obj: Any) -> bytes:
+    """
+    Serialize a JSON-compatible object to zlib-compressed JSON.
+
+    Args:
+        obj: Object to serialize
+
+    Returns:
+        Compressed bytes
+    """
+    return zlib.compress(json.dumps(obj, separators=(',', ':')).encode())
+
+def loads_json(value: bytes) -> Any:
+    """
+    Restore an object serialized with dumps_json.
+
+    Args:
+        value: Compressed bytes
+
+    Returns:
+        Deserialized object
+    """
+    return json.loads(zlib.decompress(value))
+
+class SharedCache:
+    """Interface of the shared cache backends; this base class never hits."""
+
+    name = 'none'
+
+    def get(self, namespace: str, key: str) -> Optional[Tuple[bytes, float]]:
+        """
+        Get an unexpired entry.
+
+        Args:
+            namespace: Entry kind, e.g. 'history' or 'model'
+            key: Entry key within the namespace
+
+        Returns:
+            Tuple of (value, stored_at timestamp) or None on a miss
+        """
+        return None
+
+    def set(self, namespace: str, key: str, value: bytes, ttl_seconds: int) -> None:
+        """
+        Store an entry, replacing any previous value atomically.
+
+        Args:
+            namespace: Entry kind, e.g. 'history' or 'model'
+            key: Entry key within the namespace
+            value: Serialized value
+            ttl_seconds: Seconds until the entry expires
+        """
+
+    def clear(self) -> None:
+        """Drop all entries."""
+
+class SQLiteCache(SharedCache):
+    """Shared cache in a SQLite file, safe for concurrent processes on one host."""
+
+    name = 'sqlite'
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Get this thread's connection, creating the database on first use.
+
+        Returns:
+            SQLite connection in autocommit mode
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                'namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, '
+                'stored_at REAL NOT NULL, expires_at REAL NOT NULL, '
+                'PRIMARY KEY (namespace, key))'
+            )
+            self._local.connection = connection
+        return connection
+
+    def get(self, namespace: str, key: str) -> Optional[Tuple[bytes, float]]:
+        try:
+            row = self._connection().execute(
+                'SELECT value, stored_at FROM entries WHERE namespace = ? AND key = ? AND expires_at > ?',
+                (namespace, key, time.time())
+            ).fetchone()
+            return (row[0], row[1]) if row else None
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache read failed for {namespace}/{key}: {e}")
+            return None
+
+    def set(self, namespace: str, key: str, value: bytes, ttl_seconds: int) -> None:
+        now = time.time()
+        try:
+            connection = self._connection()
+            connection.execute(
+                'INSERT OR REPLACE INTO entries (namespace, key, value, stored_at, expires_at) VALUES (?, ?, ?, ?, ?)',
+                (namespace, key, sqlite3.Binary(value), now, now + ttl_seconds)
+            )
+            self._writes += 1
+            if self._writes % PURGE_EVERY_WRITES == 0:
+                connection.execute('DELETE FROM entries WHERE expires_at <= ?', (now,))
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache write failed for {namespace}/{key}: {e}")
+
+    def clear(self) -> None:
+        try:
+            self._connection().execute('DELETE FROM entries')
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache clear failed: {e}")
+
+class RedisCache(SharedCache):
+    """Shared cache on a Redis-protocol server."""
+
+    name = 'redis'
+
+    def __init__(self, url: str):
+        """
+        Args:
+            url: Server URL, e.g. redis://cache:6379/0
+        """
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self._error = redis.RedisError
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{REDIS_PREFIX}:{namespace}:{key}"
+
+    def get(self, namespace: str, key: str) -> Optional[Tuple[bytes, float]]:
+        try:
+            raw = self.client.get(self._key(namespace, key))
+        except self._error as e:
+            logger.warning(f"Shared cache read failed for {namespace}/{key}: {e}")
+            return None
+        if raw is None:
+            return None
+        # Values are prefixed with their store time
+        return raw[8:], struct.unpack('<d', raw[:8])[0]
+
+    def set(self, namespace: str, key: str, value: bytes, ttl_seconds: int) -> None:
+        try:
+            # SET replaces the whole value in one step; EX lets the server expire it
+            self.client.set(self._key(namespace, key), struct.pack('<d', time.time()) + value, ex=max(1, ttl_seconds))
+        except self._error as e:
+            logger.warning(f"Shared cache write failed for {namespace}/{key}: {e}")
+
+    def clear(self) -> None:
+        try:
+            keys = list(self.client.scan_iter(match=f"{REDIS_PREFIX}:*"))
+            if keys:
+                self.client.delete(*keys)
+        except self._error as e:
+            logger.warning(f"Shared cache clear failed: {e}")
+
+def create_shared_cache(backend: str) -> SharedCache:
+    """
+    Create the configured shared cache backend.
+
+    Args:
+        backend: 'sqlite', 'redis' or 'none'
+
+    Returns:
+        Shared cache instance (a never-hitting SharedCache when disabled)
+    """
+    if backend == 'sqlite':
+        return SQLiteCache(shared_cache_config['sqlite_path'])
+    if backend == 'redis':
+        try:
+            return RedisCache(shared_cache_config['redis_url'])
+        except ImportError:
+            logger.warning("SHARED_CACHE_BACKEND=redis needs the redis package; shared cache disabled")
+            return SharedCache()
+    if backend != 'none':
+        raise ValueError(f"Unknown shared cache backend: {backend}")
+    return SharedCache()
+
+shared_cache = create_shared_cache(shared_cache_config['backend'])
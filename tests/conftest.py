@@ -0,0 +1,13 @@
+"""
+Shared test setup.
+
+Configuration is read when modules are imported, so on-disk caches are
+pointed at a temporary directory, and the shared cache and network provider
+are switched off, before any test module imports the app.
+"""
+import os
+import tempfile
+
+os.environ.setdefault('DATA_DIR', tempfile.mkdtemp(prefix='stock-analysis-tests-'))
+os.environ.setdefault('SHARED_CACHE_BACKEND', 'none')
+os.environ.setdefault('MARKET_DATA_PROVIDER', 'local')
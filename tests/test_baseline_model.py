@@ -0,0 +1,123 @@
+"""
+Tests for the exponential smoothing baseline: fitting, business-day steps
+and the analytic ETS(A,Ad,N) forecast variance.
+"""
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+import pytest
+from baseline_model import ExponentialSmoothingModel
+
+def make_history(y: np.ndarray) -> pd.DataFrame:
+    """
+    Build Prophet-formatted training data on business days ending on a Friday.
+
+    Args:
+        y: Observations
+
+    Returns:
+        DataFrame with ds and y columns
+    """
+    return pd.DataFrame({'ds': pd.bdate_range(end='2024-03-29', periods=len(y)), 'y': y})
+
+def fitted_model(damping: float, alpha: float, beta: float, sigma: float) -> ExponentialSmoothingModel:
+    """
+    Fit a model on a random walk, then fix its weights and error scale.
+
+    Args:
+        damping: Trend damping factor
+        alpha: Level weight
+        beta: Trend weight
+        sigma: One-step error standard deviation
+
+    Returns:
+        Fitted model with the given parameters
+    """
+    y = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, 250))
+    model = ExponentialSmoothingModel(damping=damping).fit(make_history(y))
+    model.params.update(alpha=alpha, beta=beta, sigma=sigma)
+    return model
+
+def forecast_std(model: ExponentialSmoothingModel, horizon: int) -> np.ndarray:
+    """
+    Get the predicted standard deviation for 1..horizon business days ahead.
+
+    Args:
+        model: Fitted model
+        horizon: Business days to forecast
+
+    Returns:
+        Standard deviations, one per step
+    """
+    last = model.history['ds'].max()
+    dates = pd.bdate_range(last + pd.Timedelta(days=1), periods=horizon)
+    forecast = model.predict(pd.DataFrame({'ds': dates}))
+    z = NormalDist().inv_cdf(0.5 + model.interval_width / 2)
+    return ((forecast['yhat_upper'] - forecast['yhat']) / z).to_numpy()
+
+def test_linear_series_is_forecast_exactly():
+    y = np.arange(50, dtype='float64') + 10
+    model = ExponentialSmoothingModel(damping=1.0).fit(make_history(y))
+
+    future = model.predict(model.make_future_dataframe(periods=7, include_history=False))
+
+    assert model.params['sigma'] == pytest.approx(0.0, abs=1e-9)
+    # Fri 2024-03-29 + 7 calendar days: Sat/Sun share Monday's step
+    assert future['yhat'].tolist() == pytest.approx([60, 60, 60, 61, 62, 63, 64])
+
+def test_weekend_dates_share_the_next_trading_day_step():
+    model = fitted_model(damping=0.95, alpha=0.5, beta=0.05, sigma=1.5)
+    forecast = model.predict(pd.DataFrame({'ds': pd.to_datetime(['2024-03-30', '2024-03-31', '2024-04-01'])}))
+
+    assert forecast['yhat'].nunique() == 1
+    assert forecast['yhat_upper'].nunique() == 1
+
+@pytest.mark.parametrize('damping, alpha, beta', [(1.0, 0.4, 0.0), (0.9, 0.6, 0.1), (0.98, 0.2, 0.05)])
+def test_variance_matches_closed_form(damping, alpha, beta):
+    sigma, horizon = 2.0, 30
+    model = fitted_model(damping, alpha, beta, sigma)
+
+    # Var(h) = sigma^2 * (1 + sum_{j=1}^{h-1} (alpha + beta * (phi + ... + phi^j))^2)
+    expected = []
+    for h in range(1, horizon + 1):
+        effects = [alpha + beta * sum(damping ** i for i in range(1, j + 1)) for j in range(1, h)]
+        expected.append(sigma * np.sqrt(1 + sum(c ** 2 for c in effects)))
+
+    np.testing.assert_allclose(forecast_std(model, horizon), expected, rtol=1e-9)
+
+def test_without_trend_weight_variance_is_simple_exponential_smoothing():
+    sigma, alpha, horizon = 1.0, 0.3, 20
+    model = fitted_model(damping=0.98, alpha=alpha, beta=0.0, sigma=sigma)
+
+    expected = sigma * np.sqrt(1 + np.arange(horizon) * alpha ** 2)
+
+    np.testing.assert_allclose(forecast_std(model, horizon), expected, rtol=1e-9)
+
+def test_variance_matches_simulated_paths():
+    damping, alpha, beta, sigma, horizon = 0.9, 0.5, 0.1, 1.0, 20
+    model = fitted_model(damping, alpha, beta, sigma)
+
+    rng = np.random.default_rng(1)
+    paths = 200_000
+    level = np.full(paths, model.params['level'])
+    trend = np.full(paths, model.params['trend'])
+    for _ in range(horizon):
+        forecast = level + damping * trend
+        error = rng.normal(0, sigma, paths)
+        observed = forecast + error
+        level = forecast + alpha * error
+        trend = damping * trend + beta * error
+
+    assert observed.std() == pytest.approx(forecast_std(model, horizon)[-1], rel=0.01)
+
+def test_history_intervals_use_the_one_step_error():
+    model = fitted_model(damping=0.98, alpha=0.5, beta=0.05, sigma=1.5)
+    forecast = model.predict(model.history[['ds']])
+    z = NormalDist().inv_cdf(0.9)
+
+    np.testing.assert_allclose(forecast['yhat'], model.fitted)
+    np.testing.assert_allclose(forecast['yhat_upper'] - forecast['yhat'], z * 1.5)
+
+def test_fit_needs_three_observations():
+    with pytest.raises(ValueError):
+        ExponentialSmoothingModel().fit(make_history(np.array([1.0, 2.0])))
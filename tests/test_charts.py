@@ -0,0 +1,81 @@
+"""
+Tests for OHLCV resampling and chart resolution selection.
+"""
+import pandas as pd
+import pytest
+from charts import choose_resolution, downcast_prices, resample_ohlcv
+
+def make_bars(start: str, end: str) -> pd.DataFrame:
+    """
+    Build daily bars whose values encode their position.
+
+    Args:
+        start: First date
+        end: Last date
+
+    Returns:
+        OHLCV DataFrame with an exchange-local Date index
+    """
+    index = pd.bdate_range(start, end, name='Date').tz_localize('America/New_York')
+    position = pd.Series(range(len(index)), index=index, dtype='float64')
+    return pd.DataFrame({
+        'Open': 100 + position,
+        'High': 110 + position,
+        'Low': 90 - position,
+        'Close': 105 + position,
+        'Volume': (1000 + position).astype('int64')
+    })
+
+def test_daily_returns_the_input():
+    bars = make_bars('2024-01-01', '2024-01-12')
+    assert resample_ohlcv(bars, 'Daily') is bars
+
+def test_weekly_bars_end_on_friday():
+    bars = make_bars('2024-01-01', '2024-01-12')
+
+    weekly = resample_ohlcv(bars, 'Weekly')
+
+    assert [ts.date().isoformat() for ts in weekly.index] == ['2024-01-05', '2024-01-12']
+    first_week = bars.iloc[:5]
+    assert weekly.iloc[0].to_dict() == {
+        'Open': first_week['Open'].iloc[0],
+        'High': first_week['High'].max(),
+        'Low': first_week['Low'].min(),
+        'Close': first_week['Close'].iloc[-1],
+        'Volume': first_week['Volume'].sum()
+    }
+
+def test_weekly_drops_weeks_without_bars():
+    bars = make_bars('2024-01-01', '2024-01-19').drop(pd.bdate_range('2024-01-08', '2024-01-12').tz_localize('America/New_York'))
+
+    weekly = resample_ohlcv(bars, 'Weekly')
+
+    assert [ts.date().isoformat() for ts in weekly.index] == ['2024-01-05', '2024-01-19']
+
+def test_monthly_bars_end_on_month_end():
+    bars = make_bars('2024-01-15', '2024-03-08')
+
+    monthly = resample_ohlcv(bars, 'Monthly')
+
+    assert [ts.date().isoformat() for ts in monthly.index] == ['2024-01-31', '2024-02-29', '2024-03-31']
+    february = bars.loc['2024-02']
+    assert monthly.iloc[1]['Open'] == february['Open'].iloc[0]
+    assert monthly.iloc[1]['Close'] == february['Close'].iloc[-1]
+    assert monthly.iloc[1]['Volume'] == february['Volume'].sum()
+
+def test_missing_columns_are_skipped():
+    bars = make_bars('2024-01-01', '2024-01-12')[['Close']]
+    assert list(resample_ohlcv(bars, 'Weekly').columns) == ['Close']
+
+@pytest.mark.parametrize('n_bars, expected', [(100, 'Daily'), (2000, 'Weekly'), (10000, 'Monthly'), (10 ** 6, 'Monthly')])
+def test_choose_resolution_respects_point_budget(n_bars, expected):
+    assert choose_resolution(n_bars, max_points=500) == expected
+
+def test_downcast_prices_only_touches_prices():
+    bars = make_bars('2024-01-01', '2024-01-12')
+
+    chart_data = downcast_prices(bars)
+
+    assert (chart_data[['Open', 'High', 'Low', 'Close']].dtypes == 'float32').all()
+    assert chart_data['Volume'].dtype == 'int64'
+    assert bars['Close'].dtype == 'float64'
@@ -0,0 +1,125 @@
+"""
+Tests for single-frame and streamed multi-symbol exports.
+"""
+import io
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from exports import EXPORT_FORMATS, encode_frame, export_file_name, read_export, stream_symbols
+
+def make_history(periods: int = 5, close: float = 100.0) -> pd.DataFrame:
+    """
+    Build a small daily history frame.
+
+    Args:
+        periods: Number of bars
+        close: First close
+
+    Returns:
+        OHLCV DataFrame with a Date index
+    """
+    index = pd.bdate_range('2024-01-01', periods=periods, name='Date')
+    return pd.DataFrame({'Close': [close + i for i in range(periods)], 'Volume': [1000] * periods}, index=index)
+
+def read_table(path: str, fmt: str) -> pa.Table:
+    """
+    Read an export file back.
+
+    Args:
+        path: Export file
+        fmt: Key of EXPORT_FORMATS
+
+    Returns:
+        Arrow table
+    """
+    if fmt == 'parquet':
+        return pq.read_table(path)
+    if fmt == 'arrow':
+        with pa.memory_map(path) as source:
+            return pa.ipc.open_file(source).read_all()
+    import pyarrow.csv as pa_csv
+    return pa_csv.read_csv(path)
+
+@pytest.mark.parametrize('fmt', list(EXPORT_FORMATS))
+def test_stream_symbols_writes_every_symbol(tmp_path, fmt):
+    frames = {'AAA': make_history(3), 'BBB': None, 'CCC': make_history(2, close=200.0)}
+    path = str(tmp_path / export_file_name('export', fmt))
+
+    results = list(stream_symbols(list(frames), frames.get, fmt, path))
+
+    assert results == [('AAA', None), ('BBB', 'No data found'), ('CCC', None)]
+    table = read_table(path, fmt)
+    assert table.column_names == ['Symbol', 'Close', 'Volume', 'Date']
+    assert table.column('Symbol').to_pylist() == ['AAA'] * 3 + ['CCC'] * 2
+    assert table.column('Close').to_pylist() == [100.0, 101.0, 102.0, 200.0, 201.0]
+
+@pytest.mark.parametrize('fmt', list(EXPORT_FORMATS))
+def test_stream_symbols_removes_an_export_without_data(tmp_path, fmt):
+    path = tmp_path / export_file_name('empty', fmt)
+    path.touch()
+
+    results = list(stream_symbols(['AAA', 'BBB'], lambda symbol: pd.DataFrame(), fmt, str(path)))
+
+    assert results == [('AAA', 'No data found'), ('BBB', 'No data found')]
+    assert not os.path.exists(path)
+
+def test_stream_symbols_records_fetch_errors(tmp_path):
+    def fetch(symbol):
+        if symbol == 'BAD':
+            raise RuntimeError("provider down")
+        return make_history(2)
+
+    path = str(tmp_path / 'errors.parquet')
+    results = list(stream_symbols(['BAD', 'GOOD'], fetch, 'parquet', path))
+
+    assert results == [('BAD', 'provider down'), ('GOOD', None)]
+    assert pq.read_table(path).column('Symbol').to_pylist() == ['GOOD', 'GOOD']
+
+def test_stream_symbols_conforms_later_frames_to_the_first_schema(tmp_path):
+    frames = {'AAA': make_history(2), 'BBB': make_history(2)[['Close']].assign(Extra=1.0)}
+    path = str(tmp_path / 'conformed.parquet')
+
+    list(stream_symbols(list(frames), frames.get, 'parquet', path))
+
+    table = pq.read_table(path)
+    assert table.column_names == ['Symbol', 'Close', 'Volume', 'Date']
+    assert table.column('Volume').to_pylist() == [1000, 1000, None, None]
+
+def test_abandoned_export_is_removed(tmp_path):
+    path = str(tmp_path / 'abandoned.parquet')
+    stream = stream_symbols(['AAA', 'BBB'], lambda symbol: make_history(2), 'parquet', path)
+
+    next(stream)
+    stream.close()
+
+    assert not os.path.exists(path)
+
+def test_encode_frame_round_trips_the_index():
+    frame = make_history(4)
+
+    table = pq.read_table(io.BytesIO(encode_frame(frame, 'parquet')))
+
+    # The Date index becomes a column; pandas index metadata is dropped
+    assert table.column_names == ['Close', 'Volume', 'Date']
+    assert b'pandas' not in (table.schema.metadata or {})
+    assert table.column('Close').to_pylist() == frame['Close'].tolist()
+
+def test_unknown_format_is_rejected(tmp_path):
+    path = tmp_path / 'export.xlsx'
+    path.touch()
+
+    with pytest.raises(ValueError):
+        list(stream_symbols(['AAA'], lambda symbol: make_history(2), 'xlsx', str(path)))
+    assert not os.path.exists(path)
+
+def test_read_export_reads_the_file_once(tmp_path):
+    path = tmp_path / 'once.parquet'
+    list(stream_symbols(['AAA'], lambda symbol: make_history(2), 'parquet', str(path)))
+    contents = read_export(str(path))
+
+    path.unlink()
+
+    assert read_export(str(path)) == contents
+    assert read_export(str(tmp_path / 'missing.parquet')) is None
@@ -0,0 +1,117 @@
+"""
+Tests for the on-disk history store: range normalization, gap detection and
+merging newly fetched bars into stored history.
+"""
+from datetime import date, datetime
+import pandas as pd
+import pytest
+import history_store
+from history_store import _missing_ranges, get_history, normalize_range, slice_history
+
+def make_bars(start: str, end: str) -> pd.DataFrame:
+    """
+    Build daily bars for the business days in [start, end].
+
+    Args:
+        start: First date
+        end: Last date
+
+    Returns:
+        OHLCV DataFrame with an exchange-local Date index, as providers return it
+    """
+    index = pd.bdate_range(start, end, name='Date').tz_localize('America/New_York')
+    close = pd.Series(range(len(index)), index=index, dtype='float64') + 100.0
+    return pd.DataFrame({
+        'Open': close - 0.5,
+        'High': close + 1.0,
+        'Low': close - 1.0,
+        'Close': close,
+        'Volume': 1000.0
+    })
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """
+    Point the store at a temporary directory and serve fetches from fixed bars.
+
+    Returns:
+        List of (start, end) ranges the store fetched
+    """
+    truth = make_bars('2024-01-01', '2024-03-29')
+    fetched = []
+
+    def fake_fetch(symbol, start, end):
+        fetched.append((start, end))
+        return slice_history(truth, start, end).copy()
+
+    monkeypatch.setattr(history_store, 'HISTORY_DIR', str(tmp_path))
+    monkeypatch.setattr(history_store, '_fetch_range', fake_fetch)
+    return fetched
+
+class TestNormalizeRange:
+    def test_weekend_end_rolls_to_next_trading_day(self):
+        saturday = normalize_range(date(2024, 3, 1), date(2024, 3, 9))
+        sunday = normalize_range(date(2024, 3, 1), date(2024, 3, 10))
+        assert saturday == sunday == (date(2024, 3, 1), date(2024, 3, 11))
+
+    def test_holiday_rolls_forward(self):
+        assert normalize_range(date(2024, 7, 4), date(2024, 7, 4)) == (date(2024, 7, 5), date(2024, 7, 5))
+
+    def test_accepts_datetimes_and_strings(self):
+        assert normalize_range(datetime(2024, 3, 1, 15, 30), '2024-03-08') == (date(2024, 3, 1), date(2024, 3, 8))
+
+    def test_end_before_start_is_empty(self):
+        assert normalize_range(date(2024, 3, 11), date(2024, 3, 9)) == (date(2024, 3, 11), date(2024, 3, 11))
+
+class TestMissingRanges:
+    def test_nothing_stored(self):
+        assert _missing_ranges((date(2024, 1, 1), date(2024, 2, 1)), None) == [(date(2024, 1, 1), date(2024, 2, 1))]
+
+    def test_contained(self):
+        assert _missing_ranges((date(2024, 1, 10), date(2024, 1, 20)), (date(2024, 1, 1), date(2024, 2, 1))) == []
+
+    def test_newer_bars(self):
+        gaps = _missing_ranges((date(2024, 1, 10), date(2024, 2, 10)), (date(2024, 1, 1), date(2024, 2, 1)))
+        assert gaps == [(date(2024, 2, 1), date(2024, 2, 10))]
+
+    def test_both_sides(self):
+        gaps = _missing_ranges((date(2023, 12, 1), date(2024, 2, 10)), (date(2024, 1, 1), date(2024, 2, 1)))
+        assert gaps == [(date(2023, 12, 1), date(2024, 1, 1)), (date(2024, 2, 1), date(2024, 2, 10))]
+
+class TestGetHistory:
+    def test_partial_overlap_fetches_only_the_gap(self, store):
+        first = get_history('TEST', date(2024, 1, 2), date(2024, 2, 1))
+        second = get_history('TEST', date(2024, 1, 15), date(2024, 3, 1))
+
+        assert store == [(date(2024, 1, 2), date(2024, 2, 1)), (date(2024, 2, 1), date(2024, 3, 1))]
+        expected = slice_history(make_bars('2024-01-01', '2024-03-29'), date(2024, 1, 15), date(2024, 3, 1))
+        pd.testing.assert_frame_equal(second, expected, check_freq=False)
+        assert first.index.is_unique and second.index.is_unique
+
+    def test_earlier_and_later_gaps_are_merged_in_order(self, store):
+        get_history('TEST', date(2024, 2, 1), date(2024, 2, 15))
+        data = get_history('TEST', date(2024, 1, 15), date(2024, 3, 1))
+
+        assert store[1:] == [(date(2024, 1, 15), date(2024, 2, 1)), (date(2024, 2, 15), date(2024, 3, 1))]
+        assert data.index.is_monotonic_increasing and data.index.is_unique
+        assert data.index[0].date() == date(2024, 1, 15)
+        assert data.index[-1].date() == date(2024, 2, 29)
+
+    def test_contained_request_is_served_from_disk(self, store):
+        get_history('TEST', date(2024, 1, 2), date(2024, 3, 1))
+        data = get_history('TEST', date(2024, 1, 10), date(2024, 1, 20))
+
+        assert len(store) == 1
+        assert data.index[0].date() == date(2024, 1, 10)
+        assert data.index[-1].date() == date(2024, 1, 19)
+
+    def test_refetched_bars_replace_stored_ones(self, store, monkeypatch):
+        get_history('TEST', date(2024, 1, 2), date(2024, 2, 1))
+        revised = make_bars('2024-01-31', '2024-02-09')
+        revised['Close'] += 1000.0
+        monkeypatch.setattr(history_store, '_fetch_range', lambda symbol, start, end: revised)
+        data = get_history('TEST', date(2024, 1, 2), date(2024, 2, 10))
+
+        overlap = pd.Timestamp('2024-01-31', tz='America/New_York')
+        assert data.index.is_unique
+        assert data.loc[overlap, 'Close'] == revised.loc[overlap, 'Close']
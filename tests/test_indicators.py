@@ -0,0 +1,89 @@
+"""
+Tests that incremental indicator updates match a full recompute.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from indicators import INDICATORS, compute_indicator
+
+def make_bars(periods: int = 300, seed: int = 0) -> pd.DataFrame:
+    """
+    Build a random-walk OHLCV frame.
+
+    Args:
+        periods: Number of daily bars
+        seed: Random seed
+
+    Returns:
+        OHLCV DataFrame with a business-day Date index
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, periods))
+    spread = np.abs(rng.normal(0, 1, periods))
+    return pd.DataFrame({
+        'Open': close + rng.normal(0, 0.5, periods),
+        'High': close + spread,
+        'Low': close - spread,
+        'Close': close,
+        'Volume': rng.integers(1000, 5000, periods)
+    }, index=pd.bdate_range('2023-01-02', periods=periods, name='Date'))
+
+def run_in_chunks(name: str, bars: pd.DataFrame, splits: list) -> pd.DataFrame:
+    """
+    Compute an indicator chunk by chunk, carrying the state between chunks.
+
+    Args:
+        name: Indicator name from INDICATORS
+        bars: OHLCV bars
+        splits: Positions where a new chunk starts
+
+    Returns:
+        Concatenated indicator values
+    """
+    func, params, _ = INDICATORS[name]
+    state, chunks = None, []
+    for start, end in zip([0] + splits, splits + [len(bars)]):
+        values, state = func(bars.iloc[start:end], params, state)
+        chunks.append(values)
+    return pd.concat(chunks)
+
+@pytest.mark.parametrize('name', list(INDICATORS))
+@pytest.mark.parametrize('splits', [
+    [250],            # A few new bars after a long history
+    [5, 10, 299],     # Chunks shorter than the indicator windows
+    list(range(1, 300))  # One bar at a time
+], ids=['append', 'short-chunks', 'bar-by-bar'])
+def test_incremental_matches_full_recompute(name, splits):
+    bars = make_bars()
+    func, params, _ = INDICATORS[name]
+    full, _ = func(bars, params, None)
+
+    incremental = run_in_chunks(name, bars, splits)
+
+    pd.testing.assert_frame_equal(incremental, full, check_exact=False, rtol=1e-9, atol=1e-9, check_freq=False)
+
+@pytest.mark.parametrize('name', list(INDICATORS))
+def test_compute_indicator_extends_and_slices_cached_values(name):
+    bars = make_bars(seed=1)
+    symbol = f"EXTEND-{name}"
+    func, params, _ = INDICATORS[name]
+    full, _ = func(bars, params, None)
+
+    compute_indicator(symbol, name, params, bars.iloc[:200])
+    extended = compute_indicator(symbol, name, params, bars)
+    prefix = compute_indicator(symbol, name, params, bars.iloc[:100])
+
+    pd.testing.assert_frame_equal(extended, full, check_exact=False, rtol=1e-9, atol=1e-9, check_freq=False)
+    pd.testing.assert_frame_equal(prefix, full.iloc[:100], check_exact=False, rtol=1e-9, atol=1e-9, check_freq=False)
+
+def test_compute_indicator_recomputes_when_the_last_bar_changed():
+    bars = make_bars(seed=2)
+    params = INDICATORS['EMA'][1]
+    compute_indicator('REVISED', 'EMA', params, bars.iloc[:200])
+
+    revised = bars.copy()
+    revised.iloc[199, revised.columns.get_loc('Close')] += 10.0
+    values = compute_indicator('REVISED', 'EMA', params, revised)
+
+    expected, _ = INDICATORS['EMA'][0](revised, params, None)
+    pd.testing.assert_frame_equal(values, expected, check_exact=False, rtol=1e-9, atol=1e-9, check_freq=False)
@@ -0,0 +1,116 @@
+"""
+Tests for the byte-budgeted LRU caches and the compact history form they hold.
+"""
+import numpy as np
+import pandas as pd
+import memory_cache
+from history_store import compact_ohlcv
+from memory_cache import BudgetedCache, budgeted_cache, estimate_bytes
+
+def block(size: int) -> np.ndarray:
+    """
+    Build a value whose estimated size is exactly ``size`` bytes.
+
+    Args:
+        size: Bytes
+
+    Returns:
+        uint8 array
+    """
+    return np.zeros(size, dtype='uint8')
+
+class TestBudgetedCache:
+    def test_evicts_least_recently_used_above_budget(self):
+        cache = BudgetedCache('test_lru', max_bytes=250)
+        cache.put('a', block(100))
+        cache.put('b', block(100))
+        cache.get('a')
+        cache.put('c', block(100))
+
+        assert cache.get('b') is None
+        assert cache.get('a') is not None and cache.get('c') is not None
+        stats = cache.stats()
+        assert stats['entries'] == 2 and stats['bytes'] == 200 and stats['evictions'] == 1
+
+    def test_evicts_as_many_entries_as_needed(self):
+        cache = BudgetedCache('test_lru_many', max_bytes=300)
+        for key in 'abc':
+            cache.put(key, block(100))
+        cache.put('d', block(250))
+
+        assert [key for key in 'abcd' if cache.get(key) is not None] == ['d']
+        assert cache.stats()['evictions'] == 3
+
+    def test_keeps_newest_entry_above_budget(self):
+        cache = BudgetedCache('test_oversized', max_bytes=50)
+        cache.put('a', block(10))
+        cache.put('big', block(100))
+
+        assert cache.get('a') is None
+        assert cache.get('big') is not None
+        assert cache.stats()['bytes'] == 100
+
+    def test_replacing_an_entry_updates_bytes(self):
+        cache = BudgetedCache('test_replace', max_bytes=1000)
+        cache.put('a', block(100))
+        cache.put('a', block(300))
+
+        assert cache.stats() == {'name': 'test_replace', 'entries': 1, 'bytes': 300, 'max_bytes': 1000, 'evictions': 0}
+
+    def test_expired_entries_are_dropped(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(memory_cache.time, 'time', lambda: now[0])
+        cache = BudgetedCache('test_ttl', max_bytes=1000, ttl_seconds=60)
+        cache.put('a', block(100))
+        now[0] += 61
+
+        assert cache.get('a') is None
+        assert cache.stats()['bytes'] == 0
+
+    def test_get_or_compute_computes_once(self):
+        cache = BudgetedCache('test_compute', max_bytes=1000)
+        calls = []
+        compute = lambda: calls.append(1) or block(10)
+
+        first = cache.get_or_compute('a', compute)
+        second = cache.get_or_compute('a', compute)
+
+        assert first is second
+        assert len(calls) == 1
+
+def test_budgeted_cache_ignores_underscore_arguments():
+    calls = []
+
+    @budgeted_cache('test_decorator', max_bytes=1000)
+    def double(key: str, _value: int) -> int:
+        calls.append(key)
+        return _value * 2
+
+    assert double('x', 1) == 2
+    assert double('x', 5) == 2
+    assert double('y', 5) == 10
+    assert calls == ['x', 'y']
+
+def test_estimate_bytes_counts_frame_buffers():
+    frame = pd.DataFrame({'a': np.zeros(1000)}, index=pd.RangeIndex(1000))
+    assert estimate_bytes(frame) >= 8000
+    assert estimate_bytes({'frame': frame}) > estimate_bytes(frame)
+
+def test_compact_ohlcv_keeps_float64_prices():
+    index = pd.bdate_range('2024-01-01', periods=3, name='Date')
+    data = pd.DataFrame({
+        'Open': [100.123456789] * 3,
+        'High': [101.0] * 3,
+        'Low': [99.0] * 3,
+        'Close': [123456.789] * 3,
+        'Volume': [1000.0, None, 3000.0],
+        'Dividends': [0.0] * 3,
+        'Stock Splits': [0.0] * 3
+    }, index=index)
+
+    compact = compact_ohlcv(data)
+
+    assert list(compact.columns) == ['Open', 'High', 'Low', 'Close', 'Volume']
+    assert compact['Close'].dtype == 'float64' and compact['Volume'].dtype == 'int64'
+    assert compact['Close'].iloc[0] == 123456.789
+    assert compact['Volume'].tolist() == [1000, 0, 3000]
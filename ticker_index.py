@@ -0,0 +1,313 @@
+"""
+Local ticker index and negative symbol cache.
+
+The Home sidebar resolves the typed symbol on every rerun, and partial input
+("A", "AA", "AAP") used to cost a provider request each. ``ticker_index``
+answers symbol lookups and prefix searches (autocomplete) from sorted
+in-memory arrays instead, without network calls. It is loaded from a CSV file
+with ``symbol`` and ``name`` columns and reloaded when the file changes;
+build or refresh the file with:
+
+    python ticker_index.py            # NASDAQ Trader symbol directories
+    python ticker_index.py --local    # Files in LOCAL_DATA_DIR (offline)
+
+Symbols the provider confirmed do not exist go into ``invalid_symbols``, a
+negative cache with its own TTL kept in memory and in the shared cache, so
+repeated bad input never reaches the provider.
+"""
+import argparse
+import csv
+import glob
+import json
+import logging
+import os
+import threading
+import time
+import urllib.request
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from config import get_config
+from shared_cache import dumps_json, shared_cache
+
+ticker_config = get_config('ticker_index')
+cache_config = get_config('cache')
+api_config = get_config('api')
+
+logger = logging.getLogger(__name__)
+
+# NASDAQ Trader symbol directories: (URL, symbol column) for Nasdaq and other US listings
+SYMBOL_DIRECTORIES = [
+    ('https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqlisted.txt', 'Symbol'),
+    ('https://www.nasdaqtrader.com/dynamic/SymDir/otherlisted.txt', 'ACT Symbol')
+]
+
+# Symbols in the negative cache kept in memory per process
+MAX_INVALID_SYMBOLS = 10000
+
+class TickerIndex:
+    """
+    Sorted symbol -> name index with prefix search.
+
+    The arrays are replaced as a whole on reload, so readers never lock.
+    """
+
+    def __init__(self, path: str, reload_check_seconds: float):
+        """
+        Args:
+            path: CSV file with symbol and name columns
+            reload_check_seconds: Minimum seconds between file change checks
+        """
+        self.path = path
+        self.reload_check_seconds = reload_check_seconds
+        self._entries: Tuple[List[str], List[str]] = ([], [])
+        self._mtime: Optional[float] = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        self._maybe_reload()
+        return len(self._entries[0])
+
+    def _maybe_reload(self) -> None:
+        """Reload the index if the file changed since it was last read."""
+        if time.time() - self._checked < self.reload_check_seconds:
+            return
+        with self._lock:
+            if time.time() - self._checked < self.reload_check_seconds:
+                return
+            self._checked = time.time()
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                return
+            if mtime != self._mtime:
+                self._load(mtime)
+
+    def _load(self, mtime: float) -> None:
+        """
+        Read the index file, keeping the current index if it is unreadable.
+
+        Args:
+            mtime: Modification time of the file
+        """
+        try:
+            with open(self.path, newline='', encoding='utf-8') as f:
+                rows = {
+                    row['symbol'].strip().upper(): (row['name'] or '').strip()
+                    for row in csv.DictReader(f) if (row['symbol'] or '').strip()
+                }
+        except (OSError, KeyError, csv.Error) as e:
+            logger.warning(f"Could not load ticker index from {self.path}: {e}")
+            return
+        symbols = sorted(rows)
+        self._entries = (symbols, [rows[symbol] for symbol in symbols])
+        self._mtime = mtime
+        logger.info(f"Loaded ticker index with {len(symbols)} symbols from {self.path}")
+
+    def refresh(self) -> int:
+        """
+        Reload the index file now.
+
+        Returns:
+            Number of indexed symbols
+        """
+        with self._lock:
+            self._checked = 0.0
+        self._maybe_reload()
+        return len(self._entries[0])
+
+    def lookup(self, symbol: str) -> Optional[str]:
+        """
+        Get the name of an indexed symbol.
+
+        Args:
+            symbol: Stock ticker symbol
+
+        Returns:
+            Company name, or None if the symbol is not indexed
+        """
+        self._maybe_reload()
+        symbols, names = self._entries
+        symbol = symbol.strip().upper()
+        position = bisect_left(symbols, symbol)
+        if position < len(symbols) and symbols[position] == symbol:
+            return names[position]
+        return None
+
+    def search(self, prefix: str, limit: int) -> List[Tuple[str, str]]:
+        """
+        Find indexed symbols starting with a prefix.
+
+        Args:
+            prefix: Beginning of a ticker symbol
+            limit: Maximum number of matches
+
+        Returns:
+            (symbol, name) pairs in symbol order, an exact match first
+        """
+        self._maybe_reload()
+        symbols, names = self._entries
+        prefix = prefix.strip().upper()
+        if not prefix:
+            return []
+        matches = []
+        position = bisect_left(symbols, prefix)
+        while position < len(symbols) and len(matches) < limit and symbols[position].startswith(prefix):
+            matches.append((symbols[position], names[position]))
+            position += 1
+        return matches
+
+    def add(self, symbol: str, name: str) -> None:
+        """
+        Add a symbol confirmed by the provider to the in-memory index.
+
+        Args:
+            symbol: Stock ticker symbol
+            name: Company name
+        """
+        symbol = symbol.strip().upper()
+        with self._lock:
+            symbols, names = self._entries
+            position = bisect_left(symbols, symbol)
+            if position < len(symbols) and symbols[position] == symbol:
+                return
+            self._entries = (
+                symbols[:position] + [symbol] + symbols[position:],
+                names[:position] + [name] + names[position:]
+            )
+
+class InvalidSymbolCache:
+    """Symbols the provider confirmed do not exist, with their own TTL."""
+
+    def __init__(self, ttl_seconds: int):
+        """
+        Args:
+            ttl_seconds: How long a symbol stays marked invalid
+        """
+        self.ttl_seconds = ttl_seconds
+        self._expiry: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, symbol: str) -> bool:
+        symbol = symbol.strip().upper()
+        with self._lock:
+            expiry = self._expiry.get(symbol)
+            if expiry is not None and expiry > time.time():
+                return True
+        # Another replica may have confirmed it
+        entry = shared_cache.get('invalid_symbol', symbol)
+        if entry is None:
+            return False
+        self._remember(symbol, entry[1] + self.ttl_seconds)
+        return True
+
+    def _remember(self, symbol: str, expiry: float) -> None:
+        with self._lock:
+            self._expiry[symbol] = expiry
+            self._expiry.move_to_end(symbol)
+            while len(self._expiry) > MAX_INVALID_SYMBOLS:
+                self._expiry.popitem(last=False)
+
+    def add(self, symbol: str) -> None:
+        """
+        Mark a symbol as invalid.
+
+        Args:
+            symbol: Stock ticker symbol
+        """
+        symbol = symbol.strip().upper()
+        logger.info(f"Caching {symbol} as an invalid symbol for {self.ttl_seconds}s")
+        self._remember(symbol, time.time() + self.ttl_seconds)
+        shared_cache.set('invalid_symbol', symbol, dumps_json(True), self.ttl_seconds)
+
+ticker_index = TickerIndex(ticker_config['path'], ticker_config['reload_check_seconds'])
+invalid_symbols = InvalidSymbolCache(cache_config['negative_ttl_seconds'])
+
+def known_invalid(symbol: str) -> bool:
+    """
+    Check whether a symbol was confirmed invalid; indexed symbols never are.
+
+    Args:
+        symbol: Stock ticker symbol
+
+    Returns:
+        True if the provider should not be asked about the symbol
+    """
+    return ticker_index.lookup(symbol) is None and symbol in invalid_symbols
+
+def fetch_symbol_directories() -> Dict[str, str]:
+    """
+    Download US listed symbols from the NASDAQ Trader symbol directories.
+
+    Test issues are skipped, and share class separators are converted to
+    Yahoo's format (BRK.B -> BRK-B).
+
+    Returns:
+        Dictionary of symbol to security name
+    """
+    entries = {}
+    for url, column in SYMBOL_DIRECTORIES:
+        with urllib.request.urlopen(url, timeout=api_config['yfinance_timeout']) as response:
+            lines = response.read().decode('utf-8').splitlines()
+        # The last line is a "File Creation Time" footer
+        for row in csv.DictReader(lines[:-1], delimiter='|'):
+            if row.get('Test Issue') == 'Y' or not row.get(column):
+                continue
+            entries[row[column].replace('.', '-')] = row['Security Name']
+    return entries
+
+def scan_local_data(data_dir: str) -> Dict[str, str]:
+    """
+    Collect the symbols available to the local provider.
+
+    Args:
+        data_dir: Directory with <SYMBOL>.parquet/.csv and optional <SYMBOL>.json files
+
+    Returns:
+        Dictionary of symbol to company name (the symbol if no profile exists)
+    """
+    entries = {}
+    for path in glob.glob(os.path.join(data_dir, '*.parquet')) + glob.glob(os.path.join(data_dir, '*.csv')):
+        symbol = os.path.splitext(os.path.basename(path))[0].upper()
+        name = symbol
+        try:
+            with open(os.path.join(data_dir, f"{symbol}.json")) as f:
+                profile = json.load(f)
+            name = profile.get('longName') or profile.get('shortName') or symbol
+        except (OSError, ValueError):
+            pass
+        entries[symbol] = name
+    return entries
+
+def write_index(entries: Dict[str, str], path: str) -> None:
+    """
+    Atomically write an index file; running apps pick it up on their next check.
+
+    Args:
+        entries: Dictionary of symbol to name
+        path: Index file path
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['symbol', 'name'])
+        writer.writerows(sorted(entries.items()))
+    os.replace(tmp_path, path)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the local ticker index")
+    parser.add_argument('--local', action='store_true', help="Index LOCAL_DATA_DIR instead of downloading")
+    parser.add_argument('--if-missing', action='store_true', help="Only build if the index file does not exist")
+    parser.add_argument('--output', default=ticker_config['path'], help="Index file path")
+    args = parser.parse_args()
+
+    if args.if_missing and os.path.exists(args.output):
+        return
+    entries = scan_local_data(api_config['local_data_dir']) if args.local else fetch_symbol_directories()
+    write_index(entries, args.output)
+    print(f"Wrote {len(entries)} symbols to {args.output}")
+
+if __name__ == '__main__':
+    main()
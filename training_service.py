@@ -0,0 +1,321 @@
+"""
+Out-of-process Prophet training service.
+
+Fits run on a process pool so they neither block the Streamlit script thread
+nor contend for the GIL. Requests are deduplicated (single flight): concurrent
+requests for the same (symbol, data hash, config) key share one fit and its
+result. Worker count, queue depth and timeouts come from TRAINING_CONFIG.
+
+Workers are started with forkserver (spawn where it is unavailable) rather
+than forked from the multi-threaded server. The native thread limits are
+passed only to the pool: the forkserver starts with them in its environment,
+since OpenMP/BLAS read them when they load, and each worker sets them again
+in its initializer for the CmdStan processes it launches. The server's own
+environment is left unchanged.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+import pandas as pd
+from config import get_config
+
+if TYPE_CHECKING:
+    from prophet import Prophet
+
+training_config = get_config('training')
+
+logger = logging.getLogger(__name__)
+
+class TrainingQueueFull(RuntimeError):
+    """Raised when too many distinct fits are already queued or running."""
+
+# Native thread pools (and CmdStan) size themselves from these when they load
+THREAD_LIMIT_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS', 'STAN_NUM_THREADS')
+
+def limit_worker_threads(threads: int) -> None:
+    """
+    Set the native thread limits in a worker process (pool initializer).
+
+    Covers libraries the worker loads later and the CmdStan processes it
+    launches, which inherit the worker's environment.
+
+    Args:
+        threads: Threads each worker may use
+    """
+    for var in THREAD_LIMIT_VARS:
+        os.environ[var] = str(threads)
+
+@contextmanager
+def worker_thread_limits(threads: int) -> Iterator[None]:
+    """
+    Set the native thread limits only while worker processes are started.
+
+    The previous values are restored afterwards, so subprocesses the server
+    launches later (e.g. CmdStan for cross validation) are not throttled.
+
+    Args:
+        threads: Threads each worker may use
+
+    Yields:
+        None while the limits are set
+    """
+    saved = {var: os.environ.get(var) for var in THREAD_LIMIT_VARS}
+    limit_worker_threads(threads)
+    try:
+        yield
+    finally:
+        for var, value in saved.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+
+def pool_context() -> multiprocessing.context.BaseContext:
+    """
+    Get the start method for worker pools.
+
+    Forking the Streamlit server would copy its threads' locks in whatever
+    state they are in, so workers come from a forkserver, or are spawned
+    where forkserver is unavailable.
+
+    Returns:
+        Multiprocessing context
+    """
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method)
+
+def _fit_worker(prophet_data: pd.DataFrame, params: Dict[str, Any],
+                init: Optional[Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+    """
+    Fit a model in a worker process.
+
+    Args:
+        prophet_data: DataFrame formatted for Prophet
+        params: Prophet constructor parameters
+        init: Optional Stan initialization (warm start)
+
+    Returns:
+        Tuple of (serialized_model, fit_report)
+    """
+    # Imported here to avoid a circular import with forecasting
+    from forecasting import fit_prophet_model
+    from prophet.serialize import model_to_json
+
+    try:
+        model, report = fit_prophet_model(prophet_data, params, init)
+    except Exception as e:
+        if init is None:
+            raise
+        # e.g. a different number of changepoints than the previous fit
+        logger.warning(f"Warm start failed, fitting from scratch: {e}")
+        model, report = fit_prophet_model(prophet_data, params)
+    return model_to_json(model), report
+
+def _load_fit(fit: Tuple[str, Dict[str, Any]]) -> Tuple['Prophet', Dict[str, Any]]:
+    """
+    Deserialize a fit returned by _fit_worker.
+
+    Args:
+        fit: Tuple of (serialized_model, fit_report)
+
+    Returns:
+        Tuple of (fitted_model, fit_report)
+    """
+    from prophet.serialize import model_from_json
+
+    model_json, report = fit
+    return model_from_json(model_json), report
+
+class TrainingService:
+    """
+    Process-pool training service with single-flight request deduplication.
+    """
+
+    def __init__(self, max_workers: int, threads_per_worker: int, max_queue_depth: int):
+        """
+        Initialize the service. The pool is created on first use.
+
+        Args:
+            max_workers: Number of fit processes (0 fits in the calling thread)
+            threads_per_worker: Native threads each worker may use
+            max_queue_depth: Maximum distinct fits queued or running
+        """
+        self.max_workers = max_workers
+        self.threads_per_worker = threads_per_worker
+        self.max_queue_depth = max_queue_depth
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """
+        Get the process pool, creating it on first use.
+
+        Returns:
+            Process pool executor
+        """
+        if self._executor is None:
+            logger.info(f"Starting training pool with {self.max_workers} workers")
+            context = pool_context()
+            with worker_thread_limits(self.threads_per_worker):
+                if context.get_start_method() == 'forkserver':
+                    # Workers fork from the forkserver and share its environment
+                    from multiprocessing import forkserver
+                    forkserver.ensure_running()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=context,
+                    initializer=limit_worker_threads, initargs=(self.threads_per_worker,)
+                )
+        return self._executor
+
+    def _complete(self, key: Hashable, result: Future, job: Future,
+                  decode: Optional[Callable[[Any], Any]]) -> None:
+        """
+        Resolve the shared result future from a finished worker job.
+
+        Args:
+            key: Deduplication key
+            result: Future handed out to all waiters
+            job: Finished process pool future
+            decode: Optional conversion of the worker's return value
+        """
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if isinstance(job.exception(), BrokenProcessPool):
+                # Let the next request start a fresh pool
+                self._executor = None
+        try:
+            value = job.result()
+            result.set_result(decode(value) if decode is not None else value)
+        except Exception as e:
+            logger.error(f"Training job {key} failed: {e}")
+            result.set_exception(e)
+
+    def _submit(self, key: Hashable, func: Callable[..., Any], args: Tuple,
+                decode: Optional[Callable[[Any], Any]]) -> Future:
+        """
+        Queue a job, joining an identical job that is already in flight.
+
+        Args:
+            key: Deduplication key
+            func: Picklable module-level function run in a worker
+            args: Picklable arguments for func
+            decode: Optional conversion of func's return value
+
+        Returns:
+            Future resolving to the (decoded) result
+
+        Raises:
+            TrainingQueueFull: If max_queue_depth distinct jobs are in flight
+        """
+        with self._lock:
+            shared = self._in_flight.get(key)
+            if shared is not None:
+                logger.info(f"Joining in-flight training job {key}")
+                return shared
+            if len(self._in_flight) >= self.max_queue_depth:
+                raise TrainingQueueFull(f"Training queue is full ({self.max_queue_depth} jobs)")
+
+            result = Future()
+            if self.max_workers > 0:
+                try:
+                    job = self._get_executor().submit(func, *args)
+                except BrokenProcessPool:
+                    self._executor = None
+                    job = self._get_executor().submit(func, *args)
+                logger.info(f"Queued training job {key} ({len(self._in_flight) + 1} in flight)")
+            self._in_flight[key] = result
+
+        if self.max_workers > 0:
+            job.add_done_callback(lambda done: self._complete(key, result, done, decode))
+        else:
+            job = Future()
+            try:
+                job.set_result(func(*args))
+            except Exception as e:
+                job.set_exception(e)
+            self._complete(key, result, job, decode)
+        return result
+
+    def submit(self, key: Hashable, prophet_data: pd.DataFrame, params: Dict[str, Any],
+               init: Optional[Dict[str, Any]] = None) -> Future:
+        """
+        Request a fit, joining an identical fit that is already in flight.
+
+        Args:
+            key: Deduplication key, e.g. (symbol, data_hash, config_hash)
+            prophet_data: DataFrame formatted for Prophet
+            params: Prophet constructor parameters
+            init: Optional Stan initialization (warm start)
+
+        Returns:
+            Future resolving to (fitted_model, fit_report)
+
+        Raises:
+            TrainingQueueFull: If max_queue_depth distinct fits are in flight
+        """
+        return self._submit(key, _fit_worker, (prophet_data, params, init), _load_fit)
+
+    def submit_task(self, key: Hashable, func: Callable[..., Any], *args: Any) -> Future:
+        """
+        Run other fitting work (e.g. tuning candidates) on the training pool.
+
+        The job shares the pool, the queue depth limit and single-flight
+        deduplication with model fits.
+
+        Args:
+            key: Deduplication key, distinct from fit keys
+            func: Picklable module-level function
+            *args: Picklable arguments for func
+
+        Returns:
+            Future resolving to func's return value
+
+        Raises:
+            TrainingQueueFull: If max_queue_depth distinct jobs are in flight
+        """
+        return self._submit(key, func, args, None)
+
+    def fit(self, key: Hashable, prophet_data: pd.DataFrame, params: Dict[str, Any],
+            init: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Tuple['Prophet', Dict[str, Any]]:
+        """
+        Fit a model and wait for the result.
+
+        Args:
+            key: Deduplication key, e.g. (symbol, data_hash, config_hash)
+            prophet_data: DataFrame formatted for Prophet
+            params: Prophet constructor parameters
+            init: Optional Stan initialization (warm start)
+            timeout: Seconds to wait; defaults to TRAINING_CONFIG['timeout_seconds']
+
+        Returns:
+            Tuple of (fitted_model, fit_report)
+
+        Raises:
+            TrainingQueueFull: If the queue is full
+            TimeoutError: If the fit does not finish in time (it keeps running
+                for other waiters)
+        """
+        future = self.submit(key, prophet_data, params, init)
+        return future.result(timeout=training_config['timeout_seconds'] if timeout is None else timeout)
+
+    def in_flight(self) -> int:
+        """
+        Get the number of distinct fits queued or running.
+
+        Returns:
+            Number of in-flight jobs
+        """
+        with self._lock:
+            return len(self._in_flight)
+
+training_service = TrainingService(
+    max_workers=training_config['max_workers'],
+    threads_per_worker=training_config['threads_per_worker'],
+    max_queue_depth=training_config['max_queue_depth']
+)
@@ -0,0 +1,284 @@
+"""
+Per-symbol Prophet hyperparameter search.
+
+Candidates combine the tunable PROPHET_CONFIG parameters (seasonality mode,
+changepoint and seasonality prior scales) from the configured search space,
+as a full grid or a random sample; the default MODEL_PARAMS are always a
+candidate. Every candidate is scored on the same cutoffs as
+``perform_cross_validation``; evaluations run on the training service's pool
+a few at a time, under its queue depth limit, so a search cannot crowd out
+interactive fits. The winning parameters are cached per (symbol, data hash) in
+memory and in the shared cache, and ``train_prophet_model`` uses them
+automatically.
+"""
+import itertools
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from config import get_config
+from forecasting import MODEL_PARAMS, cv_cutoffs, cv_settings
+from instrumentation import mark_miss, traced
+from model_registry import config_hash
+from shared_cache import dumps_json, loads_json, shared_cache
+from training_service import training_service
+from utils import logger
+
+prophet_config = get_config('prophet')
+storage_config = get_config('storage')
+cv_config = get_config('cv')
+
+# Parameters the search varies; everything else comes from MODEL_PARAMS
+TUNED_PARAMS = ('seasonality_mode', 'changepoint_prior_scale', 'seasonality_prior_scale')
+
+METRICS = ('rmse', 'mae', 'mape')
+
+# How long a symbol without tuned parameters is not looked up again in the shared cache
+TUNED_RECHECK_SECONDS = 60
+
+# Winning parameters (or None with the time of the last lookup) per (symbol, data hash)
+_tuned: "OrderedDict[Tuple[str, str], Tuple[Optional[Dict[str, Any]], float]]" = OrderedDict()
+_tuned_lock = threading.Lock()
+
+# One search at a time per process; each search fans out to the training pool
+_tuning_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='tuning')
+_tuning_jobs: "OrderedDict[Tuple, Future]" = OrderedDict()
+_tuning_jobs_lock = threading.Lock()
+
+def tuning_candidates(symbol: str) -> List[Dict[str, Any]]:
+    """
+    Build the parameter sets to evaluate.
+
+    Random search samples with a per-symbol seed, so repeated searches over
+    the same data evaluate the same candidates.
+
+    Args:
+        symbol: Stock ticker symbol
+
+    Returns:
+        Full Prophet constructor parameter sets, the defaults included
+    """
+    space = itertools.product(
+        prophet_config['tuning_seasonality_modes'],
+        prophet_config['tuning_changepoint_prior_scales'],
+        prophet_config['tuning_seasonality_prior_scales']
+    )
+    candidates = [{**MODEL_PARAMS, **dict(zip(TUNED_PARAMS, values))} for values in space]
+    if prophet_config['tuning_search'] == 'random' and len(candidates) > prophet_config['tuning_max_candidates']:
+        candidates = random.Random(symbol.upper()).sample(candidates, prophet_config['tuning_max_candidates'])
+    if MODEL_PARAMS not in candidates:
+        candidates.append(dict(MODEL_PARAMS))
+    return candidates
+
+def _evaluate_candidate(df: pd.DataFrame, params: Dict[str, Any], cutoffs: List[pd.Timestamp],
+                        horizon: pd.Timedelta) -> Dict[str, float]:
+    """
+    Score one parameter set on the given cross validation folds.
+
+    Runs in a training service worker. Folds are predicted without uncertainty
+    sampling, since only point forecasts are scored.
+
+    Args:
+        df: Prophet-formatted training data
+        params: Prophet constructor parameters
+        cutoffs: Cross validation cutoff dates
+        horizon: Forecast horizon after each cutoff
+
+    Returns:
+        Dictionary with rmse, mae and mape over all folds
+    """
+    from prophet import Prophet
+
+    errors, actuals = [], []
+    for cutoff in cutoffs:
+        train = df[df['ds'] <= cutoff]
+        test = df[(df['ds'] > cutoff) & (df['ds'] <= cutoff + horizon)]
+        if test.empty:
+            continue
+        model = Prophet(**params, uncertainty_samples=0)
+        model.fit(train)
+        predicted = model.predict(test[['ds']])['yhat'].to_numpy()
+        errors.append(test['y'].to_numpy() - predicted)
+        actuals.append(test['y'].to_numpy())
+
+    errors, actuals = np.concatenate(errors), np.concatenate(actuals)
+    return {
+        'rmse': float(np.sqrt(np.mean(errors ** 2))),
+        'mae': float(np.mean(np.abs(errors))),
+        'mape': float(np.mean(np.abs(errors / actuals)))
+    }
+
+def _score(params: Dict[str, Any], evaluate: Callable[[], Dict[str, float]]) -> Dict[str, Any]:
+    """
+    Run a candidate evaluation, recording a failure as missing scores.
+
+    Args:
+        params: Candidate parameters
+        evaluate: Zero-argument callable returning the scores
+
+    Returns:
+        Result row with the tuned parameters and scores
+    """
+    try:
+        scores = evaluate()
+    except Exception as e:
+        logger.warning(f"Tuning candidate {params} failed: {e}")
+        scores = {metric: np.nan for metric in METRICS}
+    return {**{name: params[name] for name in TUNED_PARAMS}, **scores}
+
+def _remember(key: Tuple[str, str], params: Optional[Dict[str, Any]]) -> None:
+    """
+    Store tuned parameters (or their absence) in memory.
+
+    Args:
+        key: (symbol, data hash)
+        params: Winning parameters, or None if there are none
+    """
+    with _tuned_lock:
+        _tuned[key] = (params, time.time())
+        _tuned.move_to_end(key)
+        while len(_tuned) > cv_config['max_cached_results']:
+            _tuned.popitem(last=False)
+
+def get_tuned_params(symbol: str, data_hash: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the parameters a search selected for this symbol and data.
+
+    Args:
+        symbol: Stock ticker symbol
+        data_hash: Hash of the training data
+
+    Returns:
+        Prophet constructor parameters, or None if no search ran
+    """
+    key = (symbol.upper(), data_hash)
+    with _tuned_lock:
+        entry = _tuned.get(key)
+    if entry is not None and (entry[0] is not None or time.time() - entry[1] < TUNED_RECHECK_SECONDS):
+        return entry[0]
+
+    # Another replica may have run the search
+    stored = shared_cache.get('tuning', f"{symbol.upper()}:{data_hash}")
+    params = loads_json(stored[0])['params'] if stored is not None else None
+    _remember(key, params)
+    return params
+
+@traced('tune_hyperparameters', cached=False)
+def tune_hyperparameters(symbol: str, data_hash: str, df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Evaluate all candidates and cache the winner for this symbol and data.
+
+    Args:
+        symbol: Stock ticker symbol
+        data_hash: Hash of the training data
+        df: Prophet-formatted training data
+
+    Returns:
+        Dictionary with the winning params, a results DataFrame sorted by the
+        tuning metric, the metric, the number of folds and the elapsed seconds
+
+    Raises:
+        RuntimeError: If every candidate failed
+        TrainingQueueFull: If the training queue is full; submit again later
+    """
+    started = time.perf_counter()
+    metric = prophet_config['tuning_metric']
+    candidates = tuning_candidates(symbol)
+    cutoffs = cv_cutoffs(df)
+    horizon = pd.Timedelta(cv_settings(len(df))[2])
+    logger.info(f"Tuning {symbol.upper()}: {len(candidates)} candidates x {len(cutoffs)} folds, by {metric}")
+
+    workers = prophet_config['tuning_workers']
+    if workers > 0:
+        # Keep at most `workers` candidates queued so fits requested meanwhile are not stuck behind the search
+        pending = iter(candidates)
+        jobs: Dict[Future, Dict[str, Any]] = {}
+        rows = []
+        while True:
+            for params in itertools.islice(pending, workers - len(jobs)):
+                key = ('tuning', symbol.upper(), data_hash, config_hash(params))
+                jobs[training_service.submit_task(key, _evaluate_candidate, df, params, cutoffs, horizon)] = params
+            if not jobs:
+                break
+            done, _ = wait(jobs, return_when=FIRST_COMPLETED)
+            rows.extend(_score(jobs.pop(job), job.result) for job in done)
+    else:
+        rows = [_score(params, lambda: _evaluate_candidate(df, params, cutoffs, horizon)) for params in candidates]
+
+    results = pd.DataFrame(rows).sort_values(metric, na_position='last').reset_index(drop=True)
+    if results[metric].isna().all():
+        raise RuntimeError(f"All {len(candidates)} tuning candidates failed")
+
+    best = {**MODEL_PARAMS, **{name: results.loc[0, name] for name in TUNED_PARAMS}}
+    # Plain Python types keep config_hash stable across the shared cache round trip
+    best = {name: value.item() if isinstance(value, np.generic) else value for name, value in best.items()}
+    _remember((symbol.upper(), data_hash), best)
+    shared_cache.set(
+        'tuning', f"{symbol.upper()}:{data_hash}",
+        dumps_json({'params': best, 'metric': metric, 'score': float(results.loc[0, metric])}),
+        storage_config['model_max_age_seconds']
+    )
+
+    seconds = time.perf_counter() - started
+    logger.info(f"Tuned {symbol.upper()} in {seconds:.1f}s: {best} ({metric} {results.loc[0, metric]:.4f})")
+    return {'params': best, 'results': results, 'metric': metric, 'folds': len(cutoffs), 'seconds': seconds}
+
+def _job_key(symbol: str, data_hash: str) -> Tuple:
+    """
+    Build the cache key of a search job.
+
+    Args:
+        symbol: Stock ticker symbol
+        data_hash: Hash of the training data
+
+    Returns:
+        Key covering the data and the search space
+    """
+    space = {name: prophet_config[name] for name in prophet_config if name.startswith('tuning_') and name != 'tuning_workers'}
+    return (symbol.upper(), data_hash, config_hash(MODEL_PARAMS), config_hash(space))
+
+def get_tuning_job(symbol: str, data_hash: str) -> Optional[Future]:
+    """
+    Get a search started in this process for this symbol and data.
+
+    Args:
+        symbol: Stock ticker symbol
+        data_hash: Hash of the training data
+
+    Returns:
+        Future resolving to the tune_hyperparameters result, or None
+    """
+    with _tuning_jobs_lock:
+        return _tuning_jobs.get(_job_key(symbol, data_hash))
+
+@traced('submit_tuning')
+def submit_tuning(symbol: str, data_hash: str, df: pd.DataFrame) -> Future:
+    """
+    Start a hyperparameter search in the background, or reuse a started one.
+
+    Args:
+        symbol: Stock ticker symbol
+        data_hash: Hash of the training data
+        df: Prophet-formatted training data
+
+    Returns:
+        Future resolving to the tune_hyperparameters result
+    """
+    key = _job_key(symbol, data_hash)
+    with _tuning_jobs_lock:
+        job = _tuning_jobs.get(key)
+        if job is not None and not (job.done() and job.exception() is not None):
+            _tuning_jobs.move_to_end(key)
+            return job
+
+        mark_miss()
+        logger.info(f"Scheduling hyperparameter search for {symbol.upper()} (cache miss)")
+        job = _tuning_executor.submit(tune_hyperparameters, symbol, data_hash, df)
+        _tuning_jobs[key] = job
+        while len(_tuning_jobs) > cv_config['max_cached_results']:
+            _tuning_jobs.popitem(last=False)
+        return job
@@ -1,22 +1,39 @@
-from typing import Union, Optional
+from typing import Union, Optional, List, Tuple
 import logging
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
-import yfinance as yf
 import pandas as pd
-from datetime import datetime
+from datetime import date, datetime, timedelta
 import hashlib
 from config import get_config
+from history_store import history_cache
+from providers import SymbolNotFound, provider
+from shared_cache import dumps_json, loads_json, shared_cache
+from ticker_index import invalid_symbols, known_invalid, ticker_index
+from instrumentation import mark_miss, traced
 
 # Load configuration
 data_config = get_config('data')
 logging_config = get_config('logging')
 cache_config = get_config('cache')
+storage_config = get_config('storage')
+watchlist_config = get_config('watchlist')
 
 # Constants from configuration
 DAYS_5_YEARS = data_config['default_lookback_days']
 MIN_DATA_POINTS = data_config['min_data_points']
 MIN_CV_DATA_POINTS = data_config['min_cv_data_points']
 DEFAULT_FORECAST_DAYS = data_config['default_forecast_days']
+MIN_FORECAST_DAYS = data_config['min_forecast_days']
+MAX_FORECAST_DAYS = data_config['max_forecast_days']
+
+# Company metadata tiers: static profile fields vs. fast-changing quote fields
+PROFILE_DIR = os.path.join(storage_config['data_dir'], 'profiles')
+PROFILE_FIELDS = ('longName', 'shortName', 'sector', 'industry', 'country', 'currency', 'exchange', 'website')
+QUOTE_FIELDS = ('lastPrice', 'previousClose', 'marketCap')
 
 # Configure logging
 logging.basicConfig(
@@ -92,44 +109,157 @@ def format_volume_dollars(volume: Union[float, int], price: Union[float, int]) -
         logger.error(f"Error calculating volume dollars: volume={volume}, price={price}, error={e}")
         return "N/A"
 
+def _profile_path(symbol: str) -> str:
+    """
+    Get the on-disk path of a symbol's company profile.
+    
+    Args:
+        symbol: Upper-case stock ticker symbol
+        
+    Returns:
+        Path of the profile JSON file
+    """
+    return os.path.join(PROFILE_DIR, f"{symbol}.json")
+
+def _load_profile(symbol: str) -> Optional[dict]:
+    """
+    Load a company profile from disk if it has not expired.
+    
+    Args:
+        symbol: Upper-case stock ticker symbol
+        
+    Returns:
+        Profile dictionary or None if missing, expired or unreadable
+    """
+    path = _profile_path(symbol)
+    try:
+        if time.time() - os.path.getmtime(path) > cache_config['profile_ttl_seconds']:
+            return None
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable profile for {symbol}: {e}")
+        return None
+
+def _save_profile(symbol: str, profile: dict) -> None:
+    """
+    Atomically write a company profile to disk.
+    
+    Args:
+        symbol: Upper-case stock ticker symbol
+        profile: Profile dictionary to store
+    """
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = _profile_path(symbol)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(profile, f)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"Could not store profile for {symbol}: {e}")
+
+@traced('get_company_info_cached')
 @st.cache_data(
-    ttl=cache_config['data_ttl_seconds'], 
+    ttl=cache_config['profile_ttl_seconds'], 
     max_entries=cache_config['max_data_entries'], 
     show_spinner=cache_config['show_cache_spinner']
 )
-def get_company_info_cached(symbol: str) -> Optional[dict]:
+def get_company_info_cached(symbol: str) -> dict:
     """
-    Get cached company information from Yahoo Finance.
+    Get cached static company information (name, sector, ...).
+    
+    This is the slow tier of company metadata: it only holds fields that
+    rarely change, is cached in memory, in the shared cache and on disk for
+    days, and is shared by all pages and replicas. Fast-changing fields come
+    from get_quote_cached.
     
     Args:
         symbol: Stock ticker symbol
         
     Returns:
-        Dictionary with company info or None if error
+        Dictionary with company profile fields
+        
+    Raises:
+        SymbolNotFound: If the symbol is in the negative cache or the provider
+            reported it does not exist
+        Exception: If the provider request failed
+        
+    Failures are raised rather than returned so st.cache_data does not keep
+    them for the profile TTL; negatives live in ``invalid_symbols`` with
+    their own, shorter TTL.
     """
+    mark_miss()
+    symbol = symbol.upper()
+    entry = shared_cache.get('profile', symbol)
+    if entry is not None:
+        logger.info(f"Loaded company profile for {symbol} from shared cache")
+        return loads_json(entry[0])
+    
+    profile = _load_profile(symbol)
+    if profile is not None:
+        logger.info(f"Loaded company profile for {symbol} from disk")
+        return profile
+    
+    if known_invalid(symbol):
+        logger.info(f"Skipping company info for {symbol}: cached as invalid")
+        raise SymbolNotFound(symbol)
+    
+    logger.info(f"Fetching company info for {symbol} (cache miss)")
     try:
-        logger.info(f"Fetching company info for {symbol.upper()} (cache miss)")
-        ticker = yf.Ticker(symbol.upper())
-        info = ticker.info
-        
-        if not info:
-            logger.warning(f"No company info found for symbol {symbol.upper()}")
-            return None
-            
-        logger.info(f"Successfully fetched company info for {symbol.upper()}")
-        return info
-    except Exception as e:
-        logger.error(f"Error fetching company info for {symbol}: {str(e)}")
-        return None
+        info = provider.info(symbol)
+    except SymbolNotFound:
+        logger.warning(f"No company info found for symbol {symbol}")
+        invalid_symbols.add(symbol)
+        raise
+    
+    profile = {field: info[field] for field in PROFILE_FIELDS if info.get(field) is not None}
+    if not profile:
+        # Partial responses happen for valid symbols too, so this is not cached as invalid
+        raise ValueError(f"No company profile fields found for symbol {symbol}")
+    
+    ticker_index.add(symbol, profile.get('longName', profile.get('shortName', symbol)))
+    _save_profile(symbol, profile)
+    shared_cache.set('profile', symbol, dumps_json(profile), cache_config['profile_ttl_seconds'])
+    logger.info(f"Successfully fetched company info for {symbol}")
+    return profile
 
+@traced('get_quote_cached')
 @st.cache_data(
-    ttl=cache_config['data_ttl_seconds'], 
+    ttl=cache_config['quote_ttl_seconds'], 
     max_entries=cache_config['max_data_entries'], 
     show_spinner=cache_config['show_cache_spinner']
 )
-def get_stock_data_cached(symbol: str, start_date: datetime, end_date: datetime) -> Optional[pd.DataFrame]:
+def get_quote_cached(symbol: str) -> Optional[dict]:
+    """
+    Get cached fast-changing quote fields from the lightweight fast_info endpoint.
+    
+    Args:
+        symbol: Stock ticker symbol
+        
+    Returns:
+        Dictionary with lastPrice, previousClose and marketCap (values may be
+        None) or None if error
+    """
+    mark_miss()
+    try:
+        logger.info(f"Fetching quote for {symbol.upper()} (cache miss)")
+        return provider.quote(symbol.upper(), QUOTE_FIELDS)
+    except Exception as e:
+        logger.error(f"Error fetching quote for {symbol}: {str(e)}")
+        return None
+
+@traced('get_stock_data_cached')
+def get_stock_data_cached(symbol: str, start_date: Union[date, datetime], end_date: Union[date, datetime]) -> Optional[pd.DataFrame]:
     """
-    Cached version of stock data fetching from Yahoo Finance.
+    Cached version of stock data fetching from the market data provider.
+    
+    Dates are normalized to trading days and served from a range-aware cache
+    that keeps one merged interval per symbol, so any contained range is a
+    slice of data already in memory. Uncovered gaps go through the on-disk
+    history store, which only fetches the dates it does not already have.
     
     Args:
         symbol: Stock ticker symbol
@@ -137,40 +267,177 @@ def get_stock_data_cached(symbol: str, start_date: datetime, end_date: datetime)
         end_date: End date for data retrieval
         
     Returns:
-        DataFrame with stock data or None if error/no data
+        DataFrame with stock data (read-only view) or None if error/no data
         
     Note:
-        Cache TTL: 5 minutes, Max entries: 100 stocks
+        Cache TTL (for ranges reaching recent days): 1 hour, Max entries: 100 stocks
     """
+    if known_invalid(symbol):
+        logger.warning(f"Skipping data for {symbol.upper()}: cached as invalid")
+        return None
+    
     try:
-        logger.info(f"Fetching stock data for {symbol.upper()} from {start_date} to {end_date} (cache miss)")
-        ticker = yf.Ticker(symbol.upper())
-        data = ticker.history(start=start_date, end=end_date)
+        data = history_cache.get(symbol, start_date, end_date)
         
-        if data.empty:
+        if data is None:
             logger.warning(f"No data found for symbol {symbol.upper()}")
             return None
         
-        logger.info(f"Successfully fetched {len(data)} data points for {symbol.upper()}")
+        logger.info(f"Served {len(data)} data points for {symbol.upper()}")
         return data
     except Exception as e:
         logger.error(f"Error fetching data for {symbol}: {str(e)}")
         return None
 
+def parse_symbols(text: str) -> List[str]:
+    """
+    Parse a free-form list of ticker symbols.
+    
+    Args:
+        text: Symbols separated by commas, spaces or newlines
+        
+    Returns:
+        Upper-case symbols in input order without duplicates
+    """
+    symbols = text.replace(',', ' ').upper().split()
+    return list(dict.fromkeys(symbols))
+
+@traced('provider_download', cached=False)
+def _download_batch(symbols: List[str], start_date: date, end_date: date) -> pd.DataFrame:
+    """
+    Download recent bars for a batch of symbols in a single request.
+    
+    Args:
+        symbols: Ticker symbols in the batch
+        start_date: Start date for data retrieval
+        end_date: End date for data retrieval
+        
+    Returns:
+        DataFrame with (symbol, field) column MultiIndex
+    """
+    logger.info(f"Downloading {len(symbols)} symbols from {start_date} to {end_date}")
+    return provider.download(symbols, start_date, end_date)
+
+def _fetch_market_cap(symbol: str) -> Optional[float]:
+    """
+    Get market cap straight from the provider.
+    
+    Runs on worker threads, so it does not go through the st.cache_data quote
+    tier; the watchlist result as a whole is cached instead.
+    
+    Args:
+        symbol: Stock ticker symbol
+        
+    Returns:
+        Market cap or None if unavailable
+    """
+    try:
+        return provider.quote(symbol, ('marketCap',)).get('marketCap')
+    except Exception as e:
+        logger.warning(f"Error fetching market cap for {symbol}: {str(e)}")
+        return None
+
+def _summarize_symbol(symbol: str, bars: pd.DataFrame) -> Optional[dict]:
+    """
+    Build the watchlist row for one symbol from its recent bars.
+    
+    Args:
+        symbol: Stock ticker symbol
+        bars: Recent OHLCV bars for the symbol
+        
+    Returns:
+        Dictionary with price, change and volume fields, or None if no data
+    """
+    bars = bars.dropna(subset=['Close'])
+    if bars.empty:
+        return None
+    
+    price = float(bars['Close'].iloc[-1])
+    previous = float(bars['Close'].iloc[-2]) if len(bars) > 1 else price
+    change = price - previous
+    return {
+        'Symbol': symbol,
+        'Price': price,
+        'Change': change,
+        'Change %': change / previous * 100 if previous else 0.0,
+        'Volume': float(bars['Volume'].iloc[-1]),
+        'Volume $': float(bars['Volume'].iloc[-1]) * price
+    }
+
+@traced('get_watchlist_data_cached')
+@st.cache_data(
+    ttl=cache_config['data_ttl_seconds'], 
+    max_entries=cache_config['max_data_entries'], 
+    show_spinner=cache_config['show_cache_spinner']
+)
+def get_watchlist_data_cached(symbols: Tuple[str, ...], as_of: date) -> pd.DataFrame:
+    """
+    Fetch summary quotes for many symbols with batched, concurrent requests.
+    
+    Symbols are split into batches for a single download request each and the batches run on a
+    bounded thread pool. Market caps are looked up on a separate, smaller pool as each batch
+    arrives, only for symbols that returned data, so they never hold up the downloads.
+    
+    Args:
+        symbols: Tuple of upper-case ticker symbols
+        as_of: Trading date the summary is for (part of the cache key)
+        
+    Returns:
+        DataFrame with one row per symbol that returned data
+    """
+    mark_miss()
+    logger.info(f"Fetching watchlist data for {len(symbols)} symbols (cache miss)")
+    start_date = as_of - timedelta(days=watchlist_config['lookback_days'])
+    end_date = as_of + timedelta(days=1)
+    batch_size = watchlist_config['batch_size']
+    batches = [list(symbols[i:i + batch_size]) for i in range(0, len(symbols), batch_size)]
+    
+    with ThreadPoolExecutor(max_workers=watchlist_config['max_workers']) as executor, \
+            ThreadPoolExecutor(max_workers=watchlist_config['market_cap_workers']) as cap_executor:
+        batch_futures = [executor.submit(_download_batch, batch, start_date, end_date) for batch in batches]
+        
+        rows, cap_futures = [], {}
+        for batch, future in zip(batches, batch_futures):
+            try:
+                frame = future.result()
+            except Exception as e:
+                logger.error(f"Error downloading batch starting with {batch[0]}: {str(e)}")
+                continue
+            
+            for symbol in batch:
+                if symbol not in frame.columns.get_level_values(0):
+                    logger.warning(f"No watchlist data found for symbol {symbol}")
+                    continue
+                row = _summarize_symbol(symbol, frame[symbol])
+                if row is not None:
+                    rows.append(row)
+                    cap_futures[symbol] = cap_executor.submit(_fetch_market_cap, symbol)
+        
+        for row in rows:
+            row['Market Cap'] = cap_futures[row['Symbol']].result()
+    
+    logger.info(f"Fetched watchlist data for {len(rows)} of {len(symbols)} symbols")
+    return pd.DataFrame(rows)
+
+@traced('generate_data_hash', cached=False)
 def generate_data_hash(data: pd.DataFrame) -> str:
     """
     Generate a hash for DataFrame to use as cache key.
     
+    Every row (values and index) contributes to the hash, so any change to the
+    data, not just to its first or last row, produces a new key.
+    
     Args:
         data: DataFrame to hash
         
     Returns:
-        SHA-256 hash string of the data
+        SHA-256 hash string of the data (128-bit prefix)
     """
     try:
-        # Create hash from data shape and a sample of values
-        data_str = f"{data.shape}_{data.iloc[0].to_string()}_{data.iloc[-1].to_string()}"
-        return hashlib.sha256(data_str.encode()).hexdigest()[:16]
+        row_hashes = pd.util.hash_pandas_object(data, index=True).values
+        digest = hashlib.sha256(row_hashes.tobytes())
+        digest.update(str(list(data.columns)).encode())
+        return digest.hexdigest()[:32]
     except Exception as e:
         logger.error(f"Error generating data hash: {e}")
         return "default_hash"
\ No newline at end of file
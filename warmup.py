@@ -0,0 +1,202 @@
+"""
+Startup warm-up for heavy modules and the Stan backend.
+
+Prophet (with cmdstanpy), yfinance and Plotly take seconds to import, and the
+first Prophet fit in a process also loads the compiled Stan model. The app
+imports these on first use; this module moves that cost ahead of user
+requests:
+
+- ``start_background_warmup()`` loads every heavy module, fits a tiny model
+  in-process and one on each training worker on a background thread, once
+  per server process. Warming up in a separate process before the server
+  starts would only prime the OS page cache; the server would still pay for
+  its imports.
+- ``python warmup.py serve <script> [streamlit options]`` starts the warm-up
+  and then runs the Streamlit server in the same process, so the server is
+  warm before the first session connects (the Docker image starts this way).
+  Under a plain ``streamlit run`` the warm-up starts on the first script run
+  instead, and that first request still pays for part of the cold start.
+- ``python warmup.py`` runs the same steps once from a shell, to check the
+  Stan backend and time the warm-up.
+
+Import times are tracked with ``python -m benchmarks.import_times``.
+"""
+import importlib
+import logging
+import sys
+import threading
+import time
+from typing import Dict, List
+from config import get_config
+
+warmup_config = get_config('warmup')
+
+logger = logging.getLogger(__name__)
+
+# Modules the app imports lazily or that only some pages need, slowest first
+HEAVY_MODULES = [
+    'prophet',
+    'prophet.diagnostics',
+    'prophet.serialize',
+    'yfinance',
+    'plotly.graph_objects',
+    'forecasting',
+    'charts',
+    'indicators'
+]
+
+# Bars in the synthetic series fitted to load the Stan backend
+WARMUP_ROWS = 60
+
+_started = False
+_started_lock = threading.Lock()
+
+def preload_modules(modules: List[str] = HEAVY_MODULES) -> Dict[str, float]:
+    """
+    Import modules and measure how long each took.
+
+    Modules already imported (e.g. as a dependency of an earlier one) take
+    close to zero.
+
+    Args:
+        modules: Module names to import
+
+    Returns:
+        Dictionary of module name to import seconds
+    """
+    timings = {}
+    for module in modules:
+        started = time.perf_counter()
+        importlib.import_module(module)
+        timings[module] = round(time.perf_counter() - started, 3)
+    return timings
+
+def _warmup_data():
+    """
+    Build a small synthetic Prophet training set.
+
+    Returns:
+        DataFrame with ds and y columns
+    """
+    import numpy as np
+    import pandas as pd
+
+    return pd.DataFrame({
+        'ds': pd.date_range('2020-01-01', periods=WARMUP_ROWS, freq='D'),
+        'y': 100 + np.sin(np.arange(WARMUP_ROWS) / 5)
+    })
+
+def load_stan_backend() -> float:
+    """
+    Fit a tiny model so the compiled Stan model is loaded in this process.
+
+    Returns:
+        Seconds taken by the fit
+
+    Raises:
+        Exception: If the Stan backend cannot fit a model
+    """
+    from forecasting import MODEL_PARAMS, fit_prophet_model
+
+    _, report = fit_prophet_model(_warmup_data(), MODEL_PARAMS)
+    return report['fit_seconds']
+
+def warm_training_workers() -> int:
+    """
+    Fit a tiny model on every training worker so each loads Prophet and Stan.
+
+    One job per worker is submitted at once, which makes the pool start all
+    of its workers.
+
+    Returns:
+        Number of warm-up fits that completed
+    """
+    from forecasting import MODEL_PARAMS
+    from training_service import training_service
+
+    if training_service.max_workers == 0:
+        return 0
+    data = _warmup_data()
+    jobs = [
+        training_service.submit(('warmup', worker), data, MODEL_PARAMS)
+        for worker in range(training_service.max_workers)
+    ]
+    completed = 0
+    for job in jobs:
+        try:
+            job.result()
+            completed += 1
+        except Exception as e:
+            logger.warning(f"Training worker warm-up failed: {e}")
+    return completed
+
+def warm_up(training_workers: bool = False) -> Dict[str, float]:
+    """
+    Preload heavy modules and the Stan backend.
+
+    Args:
+        training_workers: Also warm up the training service's worker processes
+
+    Returns:
+        Dictionary of step name to seconds
+    """
+    started = time.perf_counter()
+    timings = {f"import {module}": seconds for module, seconds in preload_modules().items()}
+    timings['stan backend'] = load_stan_backend()
+    if training_workers:
+        worker_started = time.perf_counter()
+        warm_training_workers()
+        timings['training workers'] = round(time.perf_counter() - worker_started, 3)
+    logger.info(f"Warm-up finished in {time.perf_counter() - started:.1f}s: {timings}")
+    return timings
+
+def _background_warm_up() -> None:
+    """Run the warm-up on a background thread, logging instead of raising."""
+    try:
+        warm_up(training_workers=warmup_config['training_workers'])
+    except Exception as e:
+        logger.warning(f"Background warm-up failed: {e}")
+
+def start_background_warmup() -> None:
+    """Start the warm-up once per process on a background thread (if enabled)."""
+    global _started
+    if not warmup_config['enabled']:
+        return
+    with _started_lock:
+        if _started:
+            return
+        _started = True
+    threading.Thread(target=_background_warm_up, name='warmup', daemon=True).start()
+
+def serve(streamlit_args: List[str]) -> None:
+    """
+    Start the background warm-up, then run the Streamlit server in this process.
+
+    Streamlit executes page scripts in the server process, so the modules,
+    Stan backend and training workers loaded here are the ones the pages use.
+
+    Args:
+        streamlit_args: Arguments for ``streamlit run`` (script path and options)
+    """
+    from streamlit.web import cli as stcli
+
+    start_background_warmup()
+    sys.argv = ['streamlit', 'run'] + streamlit_args
+    sys.exit(stcli.main())
+
+def main() -> None:
+    """Run the warm-up from a shell; exits non-zero if the Stan backend is broken."""
+    if sys.argv[1:2] == ['serve']:
+        serve(sys.argv[2:])
+    if not warmup_config['enabled']:
+        return
+    try:
+        timings = warm_up()
+    except Exception as e:
+        logger.error(f"Warm-up failed: {e}")
+        sys.exit(1)
+    for step, seconds in timings.items():
+        print(f"{step:<32} {seconds * 1000:9.1f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -1,56 +1,107 @@
 import streamlit as st
-from datetime import datetime, timedelta
+from datetime import date, timedelta
+from providers import SymbolNotFound
 from utils import DAYS_5_YEARS, logger, get_company_info_cached
+from ticker_index import known_invalid, ticker_index
+from instrumentation import begin_run, section, render_debug_overlay
+from config import get_config
 from typing import Any
 
+ticker_config = get_config('ticker_index')
+
 st.set_page_config(
     page_title="Stock Analysis Hub",
     page_icon="📈",
     layout="wide"
 )
 
+def render_date_range() -> None:
+    """
+    Render the date range inputs and store them in session state.
+    
+    Runs as a fragment, so changing dates does not re-resolve the company name.
+    """
+    begin_run("date range fragment", fragment=True)
+    with section("date range"):
+        col1, col2 = st.columns(2)
+        with col1:
+            start_date = st.date_input("Start Date", value=date.today() - timedelta(days=DAYS_5_YEARS))
+        with col2:
+            end_date = st.date_input("End Date", value=date.today())
+        
+        st.session_state.start_date = start_date
+        st.session_state.end_date = end_date
+
+def choose_symbol(symbol: str) -> None:
+    """
+    Put an autocomplete suggestion into the symbol input.
+    
+    Args:
+        symbol: Suggested ticker symbol
+    """
+    st.session_state.symbol_input = symbol
+
+begin_run("home page")
+
+if 'stock_symbol' not in st.session_state:
+    st.session_state.stock_symbol = ""
+if 'start_date' not in st.session_state:
+    st.session_state.start_date = date.today() - timedelta(days=DAYS_5_YEARS)
+if 'end_date' not in st.session_state:
+    st.session_state.end_date = date.today()
+
 with st.sidebar:
     st.header("Stock Controls")
     
-    stock_symbol = st.text_input("Stock Symbol", placeholder="Enter stock ticker (e.g., AAPL)")
+    stock_symbol = st.text_input("Stock Symbol", placeholder="Enter stock ticker (e.g., AAPL)", key="symbol_input")
+    st.session_state.stock_symbol = stock_symbol
+    
+    # Autocomplete from the local ticker index, no network calls
+    with section("suggestions"):
+        suggestions = [
+            (symbol, name) for symbol, name in ticker_index.search(stock_symbol, ticker_config['max_suggestions'])
+            if symbol != stock_symbol.strip().upper()
+        ]
+        if suggestions:
+            st.caption("Suggestions")
+            for symbol, name in suggestions:
+                st.button(f"{symbol} · {name}", key=f"suggest_{symbol}", on_click=choose_symbol, args=(symbol,), use_container_width=True)
     
     # Display company name if symbol is entered
-    if stock_symbol:
-        try:
-            company_info = get_company_info_cached(stock_symbol)
-            if company_info:
+    with section("company name"):
+        indexed_name = ticker_index.lookup(stock_symbol) if stock_symbol else None
+        if indexed_name:
+            st.markdown("**Company Name**")
+            st.markdown(f"**{indexed_name}**")
+        elif stock_symbol and suggestions:
+            # A prefix of indexed symbols is still being typed
+            st.markdown("**Company Name**")
+            st.markdown("*Pick a suggestion or keep typing*")
+        elif stock_symbol and known_invalid(stock_symbol):
+            st.markdown("**Company Name**")
+            st.markdown("*Company not found*")
+        elif stock_symbol:
+            try:
+                company_info = get_company_info_cached(stock_symbol)
                 company_name = company_info.get('longName', company_info.get('shortName', 'N/A'))
                 st.markdown("**Company Name**")
                 st.markdown(f"**{company_name}**")
-            else:
+            except SymbolNotFound:
                 st.markdown("**Company Name**")
                 st.markdown("*Company not found*")
-        except:
+            except Exception as e:
+                logger.warning(f"Company info for {stock_symbol} unavailable: {e}")
+                st.markdown("**Company Name**")
+                st.markdown("*Company info unavailable, try again shortly*")
+        else:
             st.markdown("**Company Name**")
-            st.markdown("*Loading...*")
-    else:
-        st.markdown("**Company Name**")
-        st.markdown("*Enter a symbol above*")
+            st.markdown("*Enter a symbol above*")
     
     st.divider()
     
-    col1, col2 = st.columns(2)
-    with col1:
-        start_date = st.date_input("Start Date", value=datetime.now() - timedelta(days=DAYS_5_YEARS))
-    with col2:
-        end_date = st.date_input("End Date", value=datetime.now())
-    
-    if 'stock_symbol' not in st.session_state:
-        st.session_state.stock_symbol = ""
-    if 'start_date' not in st.session_state:
-        st.session_state.start_date = datetime.now() - timedelta(days=DAYS_5_YEARS)
-    if 'end_date' not in st.session_state:
-        st.session_state.end_date = datetime.now()
-    
-    st.session_state.stock_symbol = stock_symbol
-    st.session_state.start_date = start_date
-    st.session_state.end_date = end_date
-    
+    st.fragment(render_date_range)()
+
+render_debug_overlay()
 
 st.title("📈 Stock Analysis Hub")
 
@@ -87,4 +138,20 @@ st.markdown("""
 - Intelligent model caching for instant predictions
 
 *Note: All forecasts are for educational purposes only and should not be used for investment decisions.*
+""")
+
+st.markdown("### 📋 Watchlist")
+st.page_link("pages/3_📋_Watchlist.py", label="→ Go to Watchlist")
+st.markdown("""
+- Track dozens to hundreds of symbols at once
+- Batched, concurrent data fetching
+- Sortable summary of price, daily change, dollar volume and market cap
+""")
+
+st.markdown("### 🏆 Batch Forecast")
+st.page_link("pages/5_🏆_Batch_Forecast.py", label="→ Go to Batch Forecast")
+st.markdown("""
+- Forecast 100+ symbols in one run with parallel Prophet fits
+- Results stream into the table as each symbol finishes
+- Rank by predicted change or forecast interval width
 """)
\ No newline at end of file